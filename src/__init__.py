@@ -15,3 +15,7 @@ PATH_TEMP = Path(os.getenv("XDG_CACHE_HOME",
 PATH_TEMP_TTS = PATH_TEMP / "tts"
 
 os.makedirs(PATH_TEMP_TTS, exist_ok=True)
+
+PATH_TEMP_LEGADO = PATH_TEMP / "legado"
+
+os.makedirs(PATH_TEMP_LEGADO, exist_ok=True)
@@ -1,12 +1,9 @@
 """命令行朗读流程。"""
 
 import argparse
-import shutil
-import subprocess
 from collections.abc import Callable
 from dataclasses import dataclass
 from gettext import gettext as _
-from pathlib import Path
 
 from .entity import LibraryDB
 from .entity.book import Book
@@ -15,11 +12,12 @@ from .servers.legado import LegadoServer
 from .servers.txt import TxtServer
 from .tts import THS
 from .tts.backends import apply_active_tts_overrides, create_active_tts_backend
-from .tts.cache import AudioPrefetchSlot
+from .tts.player import (PacatAudioPlayer, PaplayAudioPlayer,
+                         create_audio_player)
+from .tts.prefetch import AudioPrefetchQueue
 from .tts.read_runner import (TtsReadContext, TtsReadRunnerHooks,
                               run_tts_read_loop)
-from .utils.reader import (advance_to_next_chapter, create_reader_server,
-                           prefetch_next_chapter_async)
+from .utils.reader import advance_to_next_chapter, create_reader_server
 
 
 @dataclass(slots=True)
@@ -28,7 +26,8 @@ class CliReadContext:
 
     server: LegadoServer | TxtServer
     tts: THS
-    prefetch_slot: AudioPrefetchSlot
+    prefetch_queue: AudioPrefetchQueue
+    player: PacatAudioPlayer | PaplayAudioPlayer
     preview_chars: int
 
 
@@ -49,9 +48,10 @@ def run_read_book_cli(
     Returns:
         int: 命令执行返回码
     """
-    code = _ensure_cli_audio_player()
-    if code is not None:
-        return code
+    player = create_audio_player()
+    if player is None:
+        print(_("Neither pacat nor paplay is installed."))
+        return 1
 
     server = _build_reader_server(book_idx, print_bookshelf)
     if server is None:
@@ -65,14 +65,15 @@ def run_read_book_cli(
         index=book_idx, name=server.book.name))
     print(_("Chapter: {chapter}").format(
         chapter=server.get_chap_name(server.get_chap_n())))
-    prefetch_slot = AudioPrefetchSlot(tts)
+    prefetch_queue = AudioPrefetchQueue(tts)
     context = CliReadContext(
         server=server,
         tts=tts,
-        prefetch_slot=prefetch_slot,
+        prefetch_queue=prefetch_queue,
+        player=player,
         preview_chars=preview_chars,
     )
-    prefetch_next_chapter_async(context.server)
+    context.server.schedule_read_ahead()
 
     try:
         while True:
@@ -84,23 +85,13 @@ def run_read_book_cli(
                 print(_("Finished all chapters"))
                 return 0
 
-            prefetch_next_chapter_async(context.server)
+            context.server.schedule_read_ahead()
             print(_("Chapter: {chapter}").format(
                 chapter=context.server.get_chap_name(context.server.get_chap_n())))
     finally:
-        prefetch_slot.clear()
-
-
-def _ensure_cli_audio_player() -> int | None:
-    """检查命令行朗读所需的音频播放器是否可用。
-
-    Returns:
-        int | None: 出错时返回命令退出码，否则返回 None
-    """
-    if shutil.which("paplay"):
-        return None
-    print(_("paplay is not installed."))
-    return 1
+        player.close()
+        prefetch_queue.clear()
+        context.server.close()
 
 
 def _build_reader_server(book_idx: int, print_bookshelf: Callable[[], None]):
@@ -167,10 +158,10 @@ def _read_current_chapter_cli(context: CliReadContext) -> int | None:
         TtsReadContext(
             server=context.server,
             tts=context.tts,
-            prefetch_slot=context.prefetch_slot,
+            prefetch_queue=context.prefetch_queue,
             chap_txts=chap_txts,
             hooks=TtsReadRunnerHooks(
-                play_audio=_play_audio_cli,
+                play_audio=context.player.play,
                 should_stop=lambda: False,
                 before_paragraph=lambda idx, text: _before_cli_tts_paragraph(
                     context, idx, len(chap_txts), text
@@ -211,20 +202,6 @@ def _get_book_by_index(idx: int) -> Book | None:
         db.close()
 
 
-def _play_audio_cli(audio_path) -> bool:
-    """播放单个音频文件。
-
-    Args:
-        audio_path (Path | str): 音频文件路径
-
-    Returns:
-        bool: 是否播放成功
-    """
-    if not Path(audio_path).exists():
-        return False
-    return subprocess.run(["paplay", str(audio_path)], check=False).returncode == 0
-
-
 def _print_paragraph_preview(
     context: CliReadContext,
     idx: int,
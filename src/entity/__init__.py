@@ -6,13 +6,19 @@ import time
 from datetime import date, datetime, timedelta
 from gettext import gettext as _
 from pathlib import Path
-from sqlite3 import OperationalError
 from typing import Iterator, List, Optional
 
 from .. import PATH_CONFIG
 from ..utils import sec2str
 from .book import Book
+from .connection import db_connections
+from .migrations import LIBRARY_MIGRATIONS, migrate
 from .time_read import TimeRead
+from .time_read_totals import (TOTALS_ALL, TOTALS_DAY, TOTALS_MONTH,
+                               TOTALS_WEEK, TOTALS_YEAR, add_time_read_totals,
+                               day_key, get_time_read_totals, month_key,
+                               rebuild_time_read_totals, week_key)
+from .txt_index import TxtChapIndex
 
 
 def _format_words_compact(total_words: int) -> str:
@@ -30,225 +36,136 @@ def _format_words_compact(total_words: int) -> str:
     return f"{value:.1f}{suffix}"
 
 
-def _data2str(trs: list[TimeRead]):
-    total_seconds = int(sum(tr.seconds for tr in trs))
-    total_words = sum(tr.words for tr in trs)
-    return f"{sec2str(total_seconds)}/{_format_words_compact(total_words)}"
+def _totals2str(total_words: int, total_seconds: float) -> str:
+    return f"{sec2str(int(total_seconds))}/{_format_words_compact(total_words)}"
+
+
+# 每个新连接的性能参数
+LIBRARY_DB_PRAGMAS = {
+    # 读写互不阻塞，书架、朗读和预读线程可以同时访问
+    "journal_mode": "WAL",
+    # WAL 下只在检查点时 fsync，断电最多丢失最后几个事务，数据库不会损坏
+    "synchronous": "NORMAL",
+    # 被其他连接锁住时最多等待的毫秒数，而不是立即报 database is locked
+    "busy_timeout": 10000,
+    # 页缓存大小，负数表示 KiB
+    "cache_size": -16000,
+    # 内存映射读取的字节数
+    "mmap_size": 64 << 20,
+}
+
+# save_books 中每本书的保存结果
+BOOK_SAVE_INSERTED = "inserted"
+BOOK_SAVE_UPDATED = "updated"
+# IN (...) 查询每批的参数个数，避免超过 SQLite 的参数数量上限
+_SQL_IN_BATCH = 500
+
+_SAVE_BOOK_SQL = """
+INSERT INTO books(
+    md5, path, name, author, fmt, chap_n, chap_name, chap_all, chap_txt_pos,
+    txt_all, txt_pos, encoding, txt_volume_pattern, txt_chapter_pattern,
+    sort, update_date, create_date
+)
+VALUES(
+    :md5, :path, :name, :author, :fmt, :chap_n, :chap_name, :chap_all, :chap_txt_pos,
+    :txt_all, :txt_pos, :encoding, :txt_volume_pattern, :txt_chapter_pattern,
+    :sort, :update_date, :create_date
+)
+ON CONFLICT(md5) DO UPDATE SET
+    path=excluded.path,
+    name=excluded.name,
+    author=excluded.author,
+    chap_n=excluded.chap_n,
+    chap_name=excluded.chap_name,
+    chap_all=excluded.chap_all,
+    txt_all=excluded.txt_all,
+    encoding=excluded.encoding,
+    txt_volume_pattern=excluded.txt_volume_pattern,
+    txt_chapter_pattern=excluded.txt_chapter_pattern,
+    sort=excluded.sort,
+    fmt=excluded.fmt,
+    update_date=excluded.update_date,
+    create_date=excluded.create_date
+"""
+
+
+def _book2params(b: Book) -> dict:
+    return {
+        "md5": b.md5,
+        "path": b.path,
+        "name": b.name,
+        "author": b.author,
+        "fmt": b.fmt,
+        "chap_n": b.chap_n,
+        "chap_name": b.chap_name,
+        "chap_all": b.chap_all,
+        "chap_txt_pos": b.chap_txt_pos,
+        "txt_all": b.txt_all,
+        "txt_pos": b.txt_pos,
+        "encoding": b.encoding,
+        "txt_volume_pattern": b.txt_volume_pattern,
+        "txt_chapter_pattern": b.txt_chapter_pattern,
+        "sort": b.sort,
+        "update_date": b.update_date,
+        "create_date": b.create_date,
+    }
+
+
+def _keep_local_book_fields(b: Book, old: Book) -> None:
+    """重新保存已有的书时，保留本地的阅读进度、排序和创建时间
+
+    Args:
+        b (Book): 待保存的书
+        old (Book): 数据库中已有的记录
+    """
+    b.create_date = old.create_date
+    b.chap_name = old.chap_name
+    b.chap_n = old.chap_n
+    b.chap_txt_pos = old.chap_txt_pos
+    b.txt_pos = old.txt_pos
+    b.sort = old.sort
 
 
 class LibraryDB:
-    """_summary_
+    """书架数据库
+
+    同一线程中的 LibraryDB 共用一个连接。打开时连接上没有未提交的事务，
+    这个实例才负责提交或回滚；在别人的事务中间打开的实例（例如外层
+    ``with db.conn:`` 中调用的辅助函数）close() 时不提交，出错时也不回滚，
+    由外层决定。
     """
 
     def __init__(self, db_path: Path = PATH_CONFIG / "heartale.db"):
 
         self.db_path = str(db_path)
-        self.conn = sqlite3.connect(
-            self.db_path, detect_types=sqlite3.PARSE_DECLTYPES)
-        self.conn.row_factory = sqlite3.Row
-        self._init_tables()
-        self._ensure_book_txt_parse_columns()
-
-        # self._ensure_columns_and_renames()  # <- 调用迁移函数
-
-    def _ensure_book_txt_parse_columns(self) -> None:
-        """确保 books 表存在 txt 解析规则覆盖字段。
-
-        新增列：
-        - txt_volume_pattern
-        - txt_chapter_pattern
-        """
-        cur = self.conn.cursor()
-        cur.execute("PRAGMA table_info(books)")
-        cols = {r["name"] for r in cur.fetchall()}
-
-        stmts = []
-        if "txt_volume_pattern" not in cols:
-            stmts.append(
-                "ALTER TABLE books ADD COLUMN txt_volume_pattern TEXT NOT NULL DEFAULT ''"
-            )
-        if "txt_chapter_pattern" not in cols:
-            stmts.append(
-                "ALTER TABLE books ADD COLUMN txt_chapter_pattern TEXT NOT NULL DEFAULT ''"
-            )
-
-        for stmt in stmts:
-            cur.execute(stmt)
-        if stmts:
-            self.conn.commit()
+        # 借用当前线程的长连接，结构迁移只在进程内第一次打开时检查
+        self.conn = db_connections.get(self.db_path, self._init_schema,
+                                       LIBRARY_DB_PRAGMAS)
+        # 打开时已有未提交的事务，说明是嵌套使用，事务归外层所有
+        self._owns_transaction = not self.conn.in_transaction
 
-    def _ensure_columns_and_renames(self):
-        """
-        检查并添加缺失列，同时尝试把旧列重命名为新列：
-          books.type -> books.fmt
-          timereads.type -> timereads.way
-        兼容旧版 SQLite（退化为 ADD COLUMN + COPY）。
-        可重复执行且安全。
-        """
-        cur = self.conn.cursor()
+    def __enter__(self):
+        return self
 
-        # 常规列检查（你原先的需要列）
-        cur.execute("PRAGMA table_info(books)")
-        book_cols = {r["name"] for r in cur.fetchall()}
-
-        # 保证存在 chap_all, author 等（同你之前的逻辑）
-        stmts = []
-        if "chap_name" not in book_cols:
-            stmts.append(
-                "ALTER TABLE books ADD COLUMN chap_name TEXT NOT NULL DEFAULT ''")
-        if "create_date" not in book_cols:
-            stmts.append(
-                "ALTER TABLE books ADD COLUMN create_date INTEGER NOT NULL DEFAULT 0")
-        if "sort" not in book_cols:
-            stmts.append(
-                "ALTER TABLE books ADD COLUMN sort REAL NOT NULL DEFAULT 0")
-        if "chap_all" not in book_cols:
-            stmts.append(
-                "ALTER TABLE books ADD COLUMN chap_all INTEGER NOT NULL DEFAULT 0")
-        if "author" not in book_cols:
-            stmts.append(
-                "ALTER TABLE books ADD COLUMN author TEXT NOT NULL DEFAULT ''")
-        for s in stmts:
-            cur.execute(s)
-
-        # 常规列检查（你原先的需要列）
-        cur.execute("PRAGMA table_info(timereads)")
-        td_cols = {r["name"] for r in cur.fetchall()}
-        if "chap_n" not in td_cols:
-            cur.execute(
-                "ALTER TABLE timereads ADD COLUMN chap_n INTEGER NOT NULL DEFAULT 0")
-
-        # 尝试重命名列的通用函数
-
-        def rename_column_if_needed(table: str, old: str, new: str):
-            cur.execute(f"PRAGMA table_info({table})")
-            cols = {r["name"] for r in cur.fetchall()}
-            if new in cols:
-                return  # 已存在目标列，跳过
-            if old not in cols:
-                return  # 旧列不存在，也跳过
-
-            # 检查 sqlite 版本是否支持 RENAME COLUMN
-            ver = tuple(int(x) for x in sqlite3.sqlite_version.split("."))
-            # SQLite >= 3.25.0 支持 RENAME COLUMN
-            supports_rename = ver >= (3, 25, 0)
-
-            if supports_rename:
-                try:
-                    cur.execute(
-                        f"ALTER TABLE {table} RENAME COLUMN {old} TO {new}")
-                    return
-                except OperationalError:
-                    # 回退到 add+copy
-                    pass
-
-            # 退化方案：新增目标列，然后把旧列的数据复制过去
-            # 目标列以 TEXT 类型和默认值添加；你可按需改类型/默认值
-            cur.execute(
-                f"ALTER TABLE {table} ADD COLUMN {new} INTEGER NOT NULL DEFAULT 0")
-            cur.execute(
-                f"UPDATE {table} SET {new} = {old} WHERE {old} IS NOT NULL")
-            # 此时旧列仍存在。完全移除旧列需要重建表，操作复杂，风险较高，
-            # 因此仅在确实需要时再实现表重建逻辑。
-            return
-
-        # 执行重命名（或复制）
-        rename_column_if_needed("books", "type", "fmt")
-        rename_column_if_needed("timereads", "type", "way")
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None and self._owns_transaction:
+            self.conn.rollback()
+        self.close()
+        return False
 
-        # 提交事务
-        self.conn.commit()
+    def _init_schema(self, conn: sqlite3.Connection) -> None:
+        """执行尚未执行的结构迁移，由连接管理器在进程内只调用一次"""
+        migrate(conn, LIBRARY_MIGRATIONS)
 
     def close(self):
-        """关闭
+        """提交本实例开始的事务，连接留给当前线程之后的 LibraryDB 复用
+
+        嵌套在外层事务中打开的实例不提交，避免把外层事务提交一半。
         """
-        self.conn.commit()
-        self.conn.close()
+        if self._owns_transaction:
+            self.conn.commit()
 
     # 初始化表
-    def _init_tables(self):
-        cur = self.conn.cursor()
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS books (
-            id INTEGER PRIMARY KEY,             -- 自增 ID（rowid）
-            md5 TEXT NOT NULL UNIQUE,           -- 仍保证唯一
-            path TEXT NOT NULL,
-            name TEXT NOT NULL,
-            author TEXT NOT NULL,
-            fmt INTEGER NOT NULL DEFAULT 0,
-            chap_n INTEGER NOT NULL DEFAULT 0,
-            chap_name INTEGER NOT NULL DEFAULT '',
-            chap_all INTEGER NOT NULL DEFAULT 0,
-            chap_txt_pos INTEGER NOT NULL DEFAULT 0,
-            txt_pos INTEGER NOT NULL DEFAULT 0,
-            txt_all INTEGER NOT NULL DEFAULT 0,
-            sort REAL NOT NULL DEFAULT 0,
-            encoding TEXT,
-            txt_volume_pattern TEXT NOT NULL DEFAULT '',
-            txt_chapter_pattern TEXT NOT NULL DEFAULT '',
-            update_date INTEGER NOT NULL,
-            create_date INTEGER NOT NULL
-        )
-        """)
-        cur.execute("""
-        CREATE INDEX IF NOT EXISTS idx_books_name ON books(name);
-        """)
-        cur.execute("""
-        CREATE INDEX IF NOT EXISTS idx_books_update_date ON books(update_date);
-        """)
-        cur.execute("""
-        CREATE INDEX IF NOT EXISTS idx_books_path ON books(path);
-        """)
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS timereads (
-            id INTEGER PRIMARY KEY,
-            md5 TEXT NOT NULL,
-            name TEXT NOT NULL,
-            chap_n TEXT NOT NULL,
-            way INTEGER NOT NULL DEFAULT 0,
-            dt TEXT NOT NULL,              -- ISO datetime string
-            day INTEGER NOT NULL,
-            week INTEGER NOT NULL,
-            month INTEGER NOT NULL,
-            year INTEGER NOT NULL,
-            words INTEGER NOT NULL DEFAULT 0,
-            seconds REAL NOT NULL DEFAULT 0
-        )
-        """)
-
-        cur.execute(
-            "CREATE INDEX IF NOT EXISTS idx_tr_md5_day ON timereads(md5, day)")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_tr_day ON timereads(day)")
-        cur.execute(
-            "CREATE INDEX IF NOT EXISTS idx_tr_month ON timereads(month)")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_tr_year ON timereads(year)")
-
-        # 复合索引，提高统计查询效率
-        cur.execute(
-            "CREATE INDEX IF NOT EXISTS idx_tr_md5_year_month ON timereads(md5, year, month)")
-        cur.execute(
-            "CREATE INDEX IF NOT EXISTS idx_tr_md5_year_week ON timereads(md5, year, week)")
-        cur.execute(
-            "CREATE INDEX IF NOT EXISTS idx_tr_year_month ON timereads(year, month)")
-        cur.execute(
-            "CREATE INDEX IF NOT EXISTS idx_tr_year_week ON timereads(year, week)")
-
-        # 配置
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS configs (
-            key TEXT PRIMARY KEY,         -- 配置名
-            value TEXT NOT NULL,          -- 配置内容（字符串或 JSON）
-            update_time INTEGER NOT NULL  -- 更新时间戳
-        )
-        """)
-
-        cur.execute("""
-        CREATE INDEX IF NOT EXISTS idx_configs_update_time 
-        ON configs(update_time);
-        """)
-
-        self.conn.commit()
-
     # -------------------------
     # Book 操作
     # -------------------------
@@ -258,59 +175,47 @@ class LibraryDB:
         """
         b_ = self.get_book_by_md5(b.md5)
         if b_:
-            b.create_date = b_.create_date
-            b.chap_name = b_.chap_name
-            b.chap_n = b_.chap_n
-            b.chap_txt_pos = b_.chap_txt_pos
-            b.txt_pos = b_.txt_pos
-            b.sort = b_.sort
+            _keep_local_book_fields(b, b_)
 
         cur = self.conn.cursor()
-        cur.execute("""
-        INSERT INTO books(
-            md5, path, name, author, fmt, chap_n, chap_name, chap_all, chap_txt_pos,
-            txt_all, txt_pos, encoding, txt_volume_pattern, txt_chapter_pattern,
-            sort, update_date, create_date
-        )
-        VALUES(
-            :md5, :path, :name, :author, :fmt, :chap_n, :chap_name, :chap_all, :chap_txt_pos,
-            :txt_all, :txt_pos, :encoding, :txt_volume_pattern, :txt_chapter_pattern,
-            :sort, :update_date, :create_date
-        )
-        ON CONFLICT(md5) DO UPDATE SET
-            path=excluded.path,
-            name=excluded.name,
-            author=excluded.author,
-            chap_n=excluded.chap_n,
-            chap_name=excluded.chap_name,
-            chap_all=excluded.chap_all,
-            txt_all=excluded.txt_all,
-            encoding=excluded.encoding,
-            txt_volume_pattern=excluded.txt_volume_pattern,
-            txt_chapter_pattern=excluded.txt_chapter_pattern,
-            sort=excluded.sort,
-            fmt=excluded.fmt,
-            update_date=excluded.update_date,
-            create_date=excluded.create_date
-        """, {
-            "md5": b.md5,
-            "path": b.path,
-            "name": b.name,
-            "author": b.author,
-            "fmt": b.fmt,
-            "chap_n": b.chap_n,
-            "chap_name": b.chap_name,
-            "chap_all": b.chap_all,
-            "chap_txt_pos": b.chap_txt_pos,
-            "txt_all": b.txt_all,
-            "txt_pos": b.txt_pos,
-            "encoding": b.encoding,
-            "txt_volume_pattern": b.txt_volume_pattern,
-            "txt_chapter_pattern": b.txt_chapter_pattern,
-            "sort": b.sort,
-            "update_date": b.update_date,
-            "create_date": b.create_date,
-        })
+        cur.execute(_SAVE_BOOK_SQL, _book2params(b))
+
+    def save_books(self, books: list[Book]) -> list[str]:
+        """批量保存 Book，已存在的书与 save_book 一样保留本地进度、排序和创建时间
+
+        只查询一次已有记录，再用一条 executemany 写入。不单独提交，
+        调用方可以放在 ``with db.conn:`` 中与其他写入组成一个事务。
+
+        Args:
+            books (list[Book]): 待保存的书籍
+
+        Returns:
+            list[str]: 与 books 一一对应，BOOK_SAVE_INSERTED 或 BOOK_SAVE_UPDATED
+        """
+        if not books:
+            return []
+
+        md5s = list({b.md5 for b in books})
+        existing: dict[str, Book] = {}
+        cur = self.conn.cursor()
+        for i in range(0, len(md5s), _SQL_IN_BATCH):
+            batch = md5s[i:i + _SQL_IN_BATCH]
+            marks = ",".join("?" * len(batch))
+            cur.execute(f"SELECT * FROM books WHERE md5 IN ({marks})", batch)
+            existing.update((r["md5"], self._r2book(r)) for r in cur.fetchall())
+
+        status = []
+        seen = set()
+        for b in books:
+            old = existing.get(b.md5)
+            if old is not None:
+                _keep_local_book_fields(b, old)
+            status.append(BOOK_SAVE_UPDATED if old is not None or b.md5 in seen
+                          else BOOK_SAVE_INSERTED)
+            seen.add(b.md5)
+
+        cur.executemany(_SAVE_BOOK_SQL, [_book2params(b) for b in books])
+        return status
 
     def update_book(self, b: Book) -> None:
         """
@@ -370,6 +275,7 @@ class LibraryDB:
         """
         cur = self.conn.cursor()
         cur.execute("DELETE FROM books WHERE md5 = ?", (md5,))
+        cur.execute("DELETE FROM txt_chap_index WHERE md5 = ?", (md5,))
 
     def get_book_by_md5(self, md5: str) -> Optional[Book]:
         """根据md5找某本书
@@ -387,6 +293,24 @@ class LibraryDB:
             return None
         return self._r2book(row)
 
+    def get_existing_md5s(self, md5s: list[str]) -> set[str]:
+        """找出已经在书架中的 md5
+
+        Args:
+            md5s (list[str]): 待检查的 md5 列表
+
+        Returns:
+            set[str]: 其中已存在的 md5
+        """
+        existing = set()
+        cur = self.conn.cursor()
+        for i in range(0, len(md5s), _SQL_IN_BATCH):
+            batch = md5s[i:i + _SQL_IN_BATCH]
+            marks = ",".join("?" * len(batch))
+            cur.execute(f"SELECT md5 FROM books WHERE md5 IN ({marks})", batch)
+            existing.update(r["md5"] for r in cur.fetchall())
+        return existing
+
     def search_books_by_name(self, name_pattern: str, limit: int = 100) -> List[Book]:
         """
         模糊查询 name。name_pattern 支持 SQL 通配符，比如 '%关键字%'.
@@ -443,6 +367,104 @@ class LibraryDB:
         row = cur.fetchone()
         return row["max_sort"] if row and row["max_sort"] is not None else 0.0
 
+    # -------------------------
+    # TxtChapIndex 操作
+    # -------------------------
+    def get_txt_chap_index(self, md5: str) -> Optional[TxtChapIndex]:
+        """读取某本 txt 书籍的章节目录索引
+
+        Args:
+            md5 (str): 书籍 md5
+
+        Returns:
+            Optional[TxtChapIndex]: 章节目录索引，不存在时返回 None
+        """
+        cur = self.conn.cursor()
+        cur.execute("SELECT * FROM txt_chap_index WHERE md5 = ?", (md5,))
+        row = cur.fetchone()
+        if not row:
+            return None
+        try:
+            return TxtChapIndex(
+                md5=row["md5"],
+                file_size=row["file_size"],
+                file_mtime=row["file_mtime"],
+                rules_hash=row["rules_hash"],
+                chap_names=json.loads(row["chap_names"]),
+                chap_ps=json.loads(row["chap_ps"]),
+                chap_bps=json.loads(row["chap_bps"]),
+                update_date=row["update_date"],
+            )
+        except (TypeError, json.JSONDecodeError):
+            return None
+
+    def save_txt_chap_index(self, idx: TxtChapIndex) -> None:
+        """保存 txt 书籍的章节目录索引，md5 已存在时覆盖
+
+        Args:
+            idx (TxtChapIndex): 章节目录索引
+        """
+        cur = self.conn.cursor()
+        cur.execute("""
+        REPLACE INTO txt_chap_index(
+            md5, file_size, file_mtime, rules_hash,
+            chap_names, chap_ps, chap_bps, update_date
+        )
+        VALUES(
+            :md5, :file_size, :file_mtime, :rules_hash,
+            :chap_names, :chap_ps, :chap_bps, :update_date
+        )
+        """, {
+            "md5": idx.md5,
+            "file_size": idx.file_size,
+            "file_mtime": idx.file_mtime,
+            "rules_hash": idx.rules_hash,
+            "chap_names": json.dumps(idx.chap_names, ensure_ascii=False),
+            "chap_ps": json.dumps(idx.chap_ps),
+            "chap_bps": json.dumps(idx.chap_bps),
+            "update_date": idx.update_date,
+        })
+
+    # -------------------------
+    # txt 编码缓存操作
+    # -------------------------
+    def get_txt_encoding(self, md5: str) -> Optional[str]:
+        """读取缓存的 txt 文件编码
+
+        Args:
+            md5 (str): 文件 md5
+
+        Returns:
+            Optional[str]: 编码，没有缓存时返回 None
+        """
+        cur = self.conn.cursor()
+        row = cur.execute("SELECT encoding FROM txt_encodings WHERE md5 = ?",
+                          (md5,)).fetchone()
+        return row["encoding"] if row else None
+
+    def get_txt_encodings(self) -> dict[str, str]:
+        """读取全部缓存的 txt 文件编码
+
+        Returns:
+            dict[str, str]: md5 -> 编码
+        """
+        cur = self.conn.cursor()
+        cur.execute("SELECT md5, encoding FROM txt_encodings")
+        return {r["md5"]: r["encoding"] for r in cur.fetchall()}
+
+    def save_txt_encoding(self, md5: str, encoding: str) -> None:
+        """缓存 txt 文件编码
+
+        Args:
+            md5 (str): 文件 md5
+            encoding (str): 编码
+        """
+        cur = self.conn.cursor()
+        cur.execute(
+            "REPLACE INTO txt_encodings (md5, encoding, update_date) VALUES (?, ?, ?)",
+            (md5, encoding, int(time.time()))
+        )
+
     # -------------------------
     # TimeRead 操作
     # -------------------------
@@ -498,11 +520,19 @@ class LibraryDB:
         return tr
 
     def update_time_read(self, tr: TimeRead) -> TimeRead:
-        """更新或保存，如果id存在更新
+        """更新或保存，如果id存在更新，同时更新汇总表
 
         Args:
             tr (TimeRead): _description_
         """
+        cur = self.conn.cursor()
+        if tr.id is not None:
+            # 先减去旧记录，它可能属于另一天
+            cur.execute("SELECT * FROM timereads WHERE id = ?", (tr.id,))
+            old = cur.fetchone()
+            if old is not None:
+                add_time_read_totals(cur, old, sign=-1)
+
         tr.dt = d = datetime.now()
         iso = d.isoformat(sep=" ")
 
@@ -511,7 +541,20 @@ class LibraryDB:
         week = int(d.strftime("%W"))
         day = d.day
 
-        cur = self.conn.cursor()
+        params = {
+            "id": tr.id,
+            "md5": tr.md5,
+            "name": tr.name,
+            "chap_n": tr.chap_n,
+            "way": tr.way,
+            "dt": iso,
+            "day": day,
+            "week": week,
+            "month": month,
+            "year": year,
+            "words": tr.words,
+            "seconds": tr.seconds,
+        }
         cur.execute("""
         INSERT INTO timereads(
             id, md5, name, chap_n, way, dt, day, week, month, year, words, seconds
@@ -531,111 +574,55 @@ class LibraryDB:
             year=excluded.year,
             words=excluded.words,
             seconds=excluded.seconds
-        """, {
-            "id": tr.id,
-            "md5": tr.md5,
-            "name": tr.name,
-            "chap_n": tr.chap_n,
-            "way": tr.way,
-            "dt": iso,
-            "day": day,
-            "week": week,
-            "month": month,
-            "year": year,
-            "words": tr.words,
-            "seconds": tr.seconds,
-        })
-        tr.id = cur.lastrowid
+        """, params)
+        if tr.id is None:
+            tr.id = cur.lastrowid
+        add_time_read_totals(cur, params)
         return tr
 
-    def _query_time_reads(
-        self,
-        md5: Optional[str] = None,
-        day: Optional[int] = None,
-        week: Optional[int] = None,
-        year: Optional[int] = None,
-        month: Optional[int] = None,
-        way: Optional[int] = None,
-    ) -> List[TimeRead]:
-        """
-        查询 TimeRead 条目，可按书和时间范围（天/月/年/周）过滤。
-        返回按 dt 升序排序。
-        """
-        cur = self.conn.cursor()
-        conditions = []
-        params = []
-
-        if md5 is not None:
-            conditions.append("md5 = ?")
-            params.append(md5)
-        if day is not None:
-            conditions.append("day = ?")
-            params.append(day)
-        if week is not None:
-            conditions.append("week = ?")
-            params.append(week)
-        if month is not None:
-            conditions.append("month = ?")
-            params.append(month)
-        if year is not None:
-            conditions.append("year = ?")
-            params.append(year)
-        if way is not None:
-            conditions.append("way = ?")
-            params.append(way)
-
-        where_clause = " AND ".join(conditions) if conditions else "1"
-        sql = f"SELECT * FROM timereads WHERE {where_clause} ORDER BY dt ASC"
-        cur.execute(sql, params)
-        return [self._r2td(r) for r in cur.fetchall()]
+    def _get_td(
+        self, period: str, pkey: int, md5: Optional[str], way: Optional[int]
+    ) -> str:
+        """从汇总表读取一个周期的阅读时间和字数"""
+        words, seconds = get_time_read_totals(
+            self.conn.cursor(), period, pkey, md5, way)
+        return _totals2str(words, seconds)
 
     def get_td_day(self, md5: Optional[str] = None, way: Optional[int] = None) -> str:
         """今天阅读时间和字数，md5=None 表示全书"""
         today = date.today()
-        trs = self._query_time_reads(md5=md5, day=today.day,
-                                     month=today.month, year=today.year, way=way)
-
-        return _data2str(trs)
+        return self._get_td(TOTALS_DAY, day_key(today.year, today.month, today.day), md5, way)
 
     def get_td_yesterday(self, md5: Optional[str] = None, way: Optional[int] = None) -> str:
         """昨天阅读时间和字数，md5=None 表示全书"""
         target_day = date.today() - timedelta(days=1)
-        trs = self._query_time_reads(
-            md5=md5,
-            day=target_day.day,
-            month=target_day.month,
-            year=target_day.year,
-            way=way,
+        return self._get_td(
+            TOTALS_DAY,
+            day_key(target_day.year, target_day.month, target_day.day),
+            md5,
+            way,
         )
-        return _data2str(trs)
 
     def get_td_all(self, md5: Optional[str] = None, way: Optional[int] = None) -> str:
         """某书所有的时间和字数，md5=None 表示全书"""
-        return _data2str(self._query_time_reads(md5=md5, way=way))
+        return self._get_td(TOTALS_ALL, 0, md5, way)
 
     def get_td_week(self, md5: Optional[str] = None, way: Optional[int] = None) -> str:
-        """本月阅读时间和字数，md5=None 表示全书"""
+        """本周阅读时间和字数，md5=None 表示全书"""
         today = date.today()
         week = int(today.strftime("%W"))
-
-        trs = self._query_time_reads(md5=md5, year=today.year,
-                                     week=week, way=way)
-        return _data2str(trs)
+        return self._get_td(TOTALS_WEEK, week_key(today.year, week), md5, way)
 
     def get_td_last_week(self, md5: Optional[str] = None, way: Optional[int] = None) -> str:
         """上周阅读时间和字数，md5=None 表示全书"""
         target_day = date.today() - timedelta(days=7)
         week = int(target_day.strftime("%W"))
-        trs = self._query_time_reads(md5=md5, year=target_day.year,
-                                     week=week, way=way)
-        return _data2str(trs)
+        return self._get_td(TOTALS_WEEK, week_key(target_day.year, week), md5, way)
 
     def get_td_month(self, md5: Optional[str] = None, way: Optional[int] = None) -> str:
         """本月阅读时间和字数，md5=None 表示全书"""
         today = date.today()
-        trs = self._query_time_reads(md5=md5, year=today.year,
-                                     month=today.month, way=way)
-        return _data2str(trs)
+        return self._get_td(TOTALS_MONTH, month_key(today.year, today.month), md5, way)
 
     def get_td_last_month(self, md5: Optional[str] = None, way: Optional[int] = None) -> str:
         """上月阅读时间和字数，md5=None 表示全书"""
@@ -646,19 +633,20 @@ class LibraryDB:
         else:
             year = today.year
             month = today.month - 1
-        trs = self._query_time_reads(md5=md5, year=year, month=month, way=way)
-        return _data2str(trs)
+        return self._get_td(TOTALS_MONTH, month_key(year, month), md5, way)
 
     def get_td_year(self, md5: Optional[str] = None, way: Optional[int] = None) -> str:
         """本年阅读时间和字数，md5=None 表示全书"""
-        today = date.today()
-        trs = self._query_time_reads(md5=md5, year=today.year, way=way)
-        return _data2str(trs)
+        return self._get_td(TOTALS_YEAR, date.today().year, md5, way)
 
     def get_td_last_year(self, md5: Optional[str] = None, way: Optional[int] = None) -> str:
         """去年阅读时间和字数，md5=None 表示全书"""
-        trs = self._query_time_reads(md5=md5, year=date.today().year - 1, way=way)
-        return _data2str(trs)
+        return self._get_td(TOTALS_YEAR, date.today().year - 1, md5, way)
+
+    def rebuild_time_read_totals(self) -> None:
+        """由 timereads 的原始记录重新计算阅读时间汇总表"""
+        with self.conn:
+            rebuild_time_read_totals(self.conn.cursor())
 
     def delete_tr(self, tr: TimeRead) -> None:
         """
@@ -666,6 +654,11 @@ class LibraryDB:
         :param tr: 数据
         """
         cur = self.conn.cursor()
+        cur.execute("SELECT * FROM timereads WHERE id = ?", (tr.id,))
+        old = cur.fetchone()
+        if old is None:
+            return
+        add_time_read_totals(cur, old, sign=-1)
         cur.execute("DELETE FROM timereads WHERE id = ?", (tr.id,))
 
     def _r2td(self, row: sqlite3.Row) -> TimeRead:
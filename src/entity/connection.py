@@ -0,0 +1,71 @@
+"""进程内共用的 SQLite 连接。"""
+
+import sqlite3
+import threading
+from collections.abc import Callable
+
+
+class DBConnections:
+    """每个线程对每个数据库文件保持一个长连接，表结构初始化每个进程只执行一次
+
+    sqlite3 连接不能跨线程使用，所以按线程保存；线程结束后连接随之释放。
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._ready: set[str] = set()
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        db_path: str,
+        setup: Callable[[sqlite3.Connection], None] | None = None,
+        pragmas: dict[str, str | int] | None = None,
+    ) -> sqlite3.Connection:
+        """获取当前线程的连接，必要时创建
+
+        Args:
+            db_path (str): 数据库文件路径
+            setup (Callable[[sqlite3.Connection], None] | None, optional):
+                建表等初始化操作，每个进程每个数据库只执行一次. Defaults to None.
+            pragmas (dict[str, str | int] | None, optional): 新建连接时设置的 PRAGMA. Defaults to None.
+
+        Returns:
+            sqlite3.Connection: 当前线程的连接
+        """
+        conns: dict[str, sqlite3.Connection] = self._local.__dict__.setdefault("conns", {})
+        conn = conns.get(db_path)
+        if conn is None:
+            conn = sqlite3.connect(db_path, detect_types=sqlite3.PARSE_DECLTYPES)
+            conn.row_factory = sqlite3.Row
+            for key, value in (pragmas or {}).items():
+                # PRAGMA 不支持参数绑定，键和值都来自代码中的常量
+                conn.execute(f"PRAGMA {key} = {value}")
+            conns[db_path] = conn
+
+        if setup is not None and db_path not in self._ready:
+            with self._lock:
+                if db_path not in self._ready:
+                    setup(conn)
+                    self._ready.add(db_path)
+        return conn
+
+    def close_thread(self) -> None:
+        """提交并关闭当前线程的全部连接"""
+        conns: dict[str, sqlite3.Connection] = self._local.__dict__.pop("conns", {})
+        for conn in conns.values():
+            conn.commit()
+            conn.close()
+
+    def reset(self, db_path: str) -> None:
+        """标记数据库需要重新初始化，例如文件被替换之后
+
+        Args:
+            db_path (str): 数据库文件路径
+        """
+        with self._lock:
+            self._ready.discard(db_path)
+
+
+db_connections = DBConnections()
+
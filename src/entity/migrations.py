@@ -0,0 +1,293 @@
+"""基于 PRAGMA user_version 的数据库结构迁移。"""
+
+import sqlite3
+from collections.abc import Callable, Sequence
+from sqlite3 import OperationalError
+
+from .time_read_totals import create_time_read_totals, rebuild_time_read_totals
+
+# (目标版本, 迁移函数)；迁移函数只执行 SQL，不自行提交
+Migration = tuple[int, Callable[[sqlite3.Cursor], None]]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """读取数据库记录的结构版本
+
+    Args:
+        conn (sqlite3.Connection): 数据库连接
+
+    Returns:
+        int: PRAGMA user_version，新建的数据库为 0
+    """
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection, migrations: Sequence[Migration]) -> int:
+    """按版本号顺序执行尚未执行的迁移
+
+    所有迁移在一个写事务中完成，失败时回滚，版本号保持不变。
+    加写锁后会重新读取版本号，多个进程同时启动时只有一个会真正执行迁移。
+    版本已是最新时只执行一次 PRAGMA 查询。
+
+    Args:
+        conn (sqlite3.Connection): 数据库连接
+        migrations (Sequence[Migration]): 迁移列表，版本号递增
+
+    Returns:
+        int: 迁移后的结构版本
+    """
+    latest = migrations[-1][0] if migrations else 0
+    version = get_schema_version(conn)
+    if version >= latest:
+        return version
+
+    conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        version = get_schema_version(conn)
+        cur = conn.cursor()
+        for target, step in migrations:
+            if target > version:
+                step(cur)
+                version = target
+        # PRAGMA 不支持参数绑定，version 一定是整数
+        cur.execute(f"PRAGMA user_version = {int(version)}")
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+    return version
+
+
+def _create_tables(cur: sqlite3.Cursor) -> None:
+    """版本 1：建表和索引"""
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS books (
+        id INTEGER PRIMARY KEY,             -- 自增 ID（rowid）
+        md5 TEXT NOT NULL UNIQUE,           -- 仍保证唯一
+        path TEXT NOT NULL,
+        name TEXT NOT NULL,
+        author TEXT NOT NULL,
+        fmt INTEGER NOT NULL DEFAULT 0,
+        chap_n INTEGER NOT NULL DEFAULT 0,
+        chap_name INTEGER NOT NULL DEFAULT '',
+        chap_all INTEGER NOT NULL DEFAULT 0,
+        chap_txt_pos INTEGER NOT NULL DEFAULT 0,
+        txt_pos INTEGER NOT NULL DEFAULT 0,
+        txt_all INTEGER NOT NULL DEFAULT 0,
+        sort REAL NOT NULL DEFAULT 0,
+        encoding TEXT,
+        txt_volume_pattern TEXT NOT NULL DEFAULT '',
+        txt_chapter_pattern TEXT NOT NULL DEFAULT '',
+        update_date INTEGER NOT NULL,
+        create_date INTEGER NOT NULL
+    )
+    """)
+    cur.execute("""
+    CREATE INDEX IF NOT EXISTS idx_books_name ON books(name);
+    """)
+    cur.execute("""
+    CREATE INDEX IF NOT EXISTS idx_books_update_date ON books(update_date);
+    """)
+    cur.execute("""
+    CREATE INDEX IF NOT EXISTS idx_books_path ON books(path);
+    """)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS timereads (
+        id INTEGER PRIMARY KEY,
+        md5 TEXT NOT NULL,
+        name TEXT NOT NULL,
+        chap_n TEXT NOT NULL,
+        way INTEGER NOT NULL DEFAULT 0,
+        dt TEXT NOT NULL,              -- ISO datetime string
+        day INTEGER NOT NULL,
+        week INTEGER NOT NULL,
+        month INTEGER NOT NULL,
+        year INTEGER NOT NULL,
+        words INTEGER NOT NULL DEFAULT 0,
+        seconds REAL NOT NULL DEFAULT 0
+    )
+    """)
+
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tr_md5_day ON timereads(md5, day)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_tr_day ON timereads(day)")
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tr_month ON timereads(month)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_tr_year ON timereads(year)")
+
+    # 复合索引，提高统计查询效率
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tr_md5_year_month ON timereads(md5, year, month)")
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tr_md5_year_week ON timereads(md5, year, week)")
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tr_year_month ON timereads(year, month)")
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tr_year_week ON timereads(year, week)")
+
+    # 配置
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS configs (
+        key TEXT PRIMARY KEY,         -- 配置名
+        value TEXT NOT NULL,          -- 配置内容（字符串或 JSON）
+        update_time INTEGER NOT NULL  -- 更新时间戳
+    )
+    """)
+
+    cur.execute("""
+    CREATE INDEX IF NOT EXISTS idx_configs_update_time 
+    ON configs(update_time);
+    """)
+
+    # txt 章节目录索引
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS txt_chap_index (
+        md5 TEXT PRIMARY KEY,
+        file_size INTEGER NOT NULL,
+        file_mtime INTEGER NOT NULL,    -- 纳秒
+        rules_hash TEXT NOT NULL,
+        chap_names TEXT NOT NULL,       -- JSON 数组
+        chap_ps TEXT NOT NULL,          -- JSON 数组，字符偏移
+        chap_bps TEXT NOT NULL DEFAULT '[]',  -- JSON 数组，字节偏移
+        update_date INTEGER NOT NULL
+    )
+    """)
+
+    # txt 编码探测结果缓存，删除书籍后保留，重新导入时复用
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS txt_encodings (
+        md5 TEXT PRIMARY KEY,
+        encoding TEXT NOT NULL,
+        update_date INTEGER NOT NULL
+    )
+    """)
+
+
+def _ensure_columns_and_renames(cur: sqlite3.Cursor) -> None:
+    """
+    版本 2：检查并添加缺失列，同时尝试把旧列重命名为新列：
+      books.type -> books.fmt
+      timereads.type -> timereads.way
+    兼容旧版 SQLite（退化为 ADD COLUMN + COPY）。
+    可重复执行且安全。
+    """
+
+    # 常规列检查（你原先的需要列）
+    cur.execute("PRAGMA table_info(books)")
+    book_cols = {r["name"] for r in cur.fetchall()}
+
+    # 保证存在 chap_all, author 等（同你之前的逻辑）
+    stmts = []
+    if "chap_name" not in book_cols:
+        stmts.append(
+            "ALTER TABLE books ADD COLUMN chap_name TEXT NOT NULL DEFAULT ''")
+    if "create_date" not in book_cols:
+        stmts.append(
+            "ALTER TABLE books ADD COLUMN create_date INTEGER NOT NULL DEFAULT 0")
+    if "sort" not in book_cols:
+        stmts.append(
+            "ALTER TABLE books ADD COLUMN sort REAL NOT NULL DEFAULT 0")
+    if "chap_all" not in book_cols:
+        stmts.append(
+            "ALTER TABLE books ADD COLUMN chap_all INTEGER NOT NULL DEFAULT 0")
+    if "author" not in book_cols:
+        stmts.append(
+            "ALTER TABLE books ADD COLUMN author TEXT NOT NULL DEFAULT ''")
+    for s in stmts:
+        cur.execute(s)
+
+    # 常规列检查（你原先的需要列）
+    cur.execute("PRAGMA table_info(timereads)")
+    td_cols = {r["name"] for r in cur.fetchall()}
+    if "chap_n" not in td_cols:
+        cur.execute(
+            "ALTER TABLE timereads ADD COLUMN chap_n INTEGER NOT NULL DEFAULT 0")
+
+    # 尝试重命名列的通用函数
+
+    def rename_column_if_needed(table: str, old: str, new: str):
+        cur.execute(f"PRAGMA table_info({table})")
+        cols = {r["name"] for r in cur.fetchall()}
+        if new in cols:
+            return  # 已存在目标列，跳过
+        if old not in cols:
+            return  # 旧列不存在，也跳过
+
+        # 检查 sqlite 版本是否支持 RENAME COLUMN
+        ver = tuple(int(x) for x in sqlite3.sqlite_version.split("."))
+        # SQLite >= 3.25.0 支持 RENAME COLUMN
+        supports_rename = ver >= (3, 25, 0)
+
+        if supports_rename:
+            try:
+                cur.execute(
+                    f"ALTER TABLE {table} RENAME COLUMN {old} TO {new}")
+                return
+            except OperationalError:
+                # 回退到 add+copy
+                pass
+
+        # 退化方案：新增目标列，然后把旧列的数据复制过去
+        # 目标列以 TEXT 类型和默认值添加；你可按需改类型/默认值
+        cur.execute(
+            f"ALTER TABLE {table} ADD COLUMN {new} INTEGER NOT NULL DEFAULT 0")
+        cur.execute(
+            f"UPDATE {table} SET {new} = {old} WHERE {old} IS NOT NULL")
+        # 此时旧列仍存在。完全移除旧列需要重建表，操作复杂，风险较高，
+        # 因此仅在确实需要时再实现表重建逻辑。
+        return
+
+    # 执行重命名（或复制）
+    rename_column_if_needed("books", "type", "fmt")
+    rename_column_if_needed("timereads", "type", "way")
+
+
+def _ensure_book_txt_parse_columns(cur: sqlite3.Cursor) -> None:
+    """版本 3：确保 books 表存在 txt 解析规则覆盖字段。
+
+    新增列：
+    - txt_volume_pattern
+    - txt_chapter_pattern
+    """
+    cur.execute("PRAGMA table_info(books)")
+    cols = {r["name"] for r in cur.fetchall()}
+
+    stmts = []
+    if "txt_volume_pattern" not in cols:
+        stmts.append(
+            "ALTER TABLE books ADD COLUMN txt_volume_pattern TEXT NOT NULL DEFAULT ''"
+        )
+    if "txt_chapter_pattern" not in cols:
+        stmts.append(
+            "ALTER TABLE books ADD COLUMN txt_chapter_pattern TEXT NOT NULL DEFAULT ''"
+        )
+
+    for stmt in stmts:
+        cur.execute(stmt)
+
+
+def _ensure_txt_chap_index_columns(cur: sqlite3.Cursor) -> None:
+    """版本 4：确保 txt_chap_index 表存在字节偏移列。"""
+    cur.execute("PRAGMA table_info(txt_chap_index)")
+    cols = {r["name"] for r in cur.fetchall()}
+    if "chap_bps" not in cols:
+        cur.execute(
+            "ALTER TABLE txt_chap_index ADD COLUMN chap_bps TEXT NOT NULL DEFAULT '[]'")
+
+
+def _create_time_read_totals(cur: sqlite3.Cursor) -> None:
+    """版本 5：建立阅读时间汇总表，并由已有的 timereads 计算初始值。"""
+    create_time_read_totals(cur)
+    rebuild_time_read_totals(cur)
+
+
+# heartale.db 的迁移步骤。每一步都可以在任意旧版本的数据库上重复执行；
+# 修改表结构时在末尾追加新的步骤，不要修改已发布的步骤。
+LIBRARY_MIGRATIONS: list[Migration] = [
+    (1, _create_tables),
+    (2, _ensure_columns_and_renames),
+    (3, _ensure_book_txt_parse_columns),
+    (4, _ensure_txt_chap_index_columns),
+    (5, _create_time_read_totals),
+]
@@ -0,0 +1,153 @@
+"""阅读时间的按日/周/月/年汇总表。
+
+timereads 每行在写入时同时累加到 timeread_totals，统计查询只需按主键读取一行。
+每条记录会累加到 4 个维度：该书该方式、该书全部方式、全部书该方式、全部书全部方式。
+"""
+
+import sqlite3
+
+TOTALS_DAY = "day"
+TOTALS_WEEK = "week"
+TOTALS_MONTH = "month"
+TOTALS_YEAR = "year"
+TOTALS_ALL = "all"
+
+# md5 为该值表示全部书籍
+TOTALS_ANY_MD5 = ""
+# way 为该值表示全部阅读方式
+TOTALS_ANY_WAY = -1
+
+# 各汇总周期的键，由 timereads 中的 year/month/week/day 列计算
+_PERIOD_KEY_SQL = {
+    TOTALS_DAY: "year * 10000 + month * 100 + day",
+    TOTALS_WEEK: "year * 100 + week",
+    TOTALS_MONTH: "year * 100 + month",
+    TOTALS_YEAR: "year",
+    TOTALS_ALL: "0",
+}
+
+_ADD_TOTALS_SQL = """
+INSERT INTO timeread_totals(period, pkey, md5, way, words, seconds)
+VALUES(:period, :pkey, :md5, :way, :words, :seconds)
+ON CONFLICT(period, pkey, md5, way) DO UPDATE SET
+    words = words + excluded.words,
+    seconds = seconds + excluded.seconds
+"""
+
+
+def day_key(year: int, month: int, day: int) -> int:
+    """日汇总的键"""
+    return year * 10000 + month * 100 + day
+
+
+def week_key(year: int, week: int) -> int:
+    """周汇总的键，week 为 %W 周数"""
+    return year * 100 + week
+
+
+def month_key(year: int, month: int) -> int:
+    """月汇总的键"""
+    return year * 100 + month
+
+
+def create_time_read_totals(cur: sqlite3.Cursor) -> None:
+    """建立汇总表
+
+    Args:
+        cur (sqlite3.Cursor): 数据库游标
+    """
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS timeread_totals (
+        period TEXT NOT NULL,           -- day/week/month/year/all
+        pkey INTEGER NOT NULL,          -- 周期键，如 20250131、202505、2025
+        md5 TEXT NOT NULL,              -- '' 表示全部书籍
+        way INTEGER NOT NULL,           -- -1 表示全部方式
+        words INTEGER NOT NULL DEFAULT 0,
+        seconds REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (period, pkey, md5, way)
+    ) WITHOUT ROWID
+    """)
+
+
+def rebuild_time_read_totals(cur: sqlite3.Cursor) -> None:
+    """由 timereads 的原始记录重新计算全部汇总，不自行提交
+
+    Args:
+        cur (sqlite3.Cursor): 数据库游标
+    """
+    cur.execute("DELETE FROM timeread_totals")
+    for period, key_sql in _PERIOD_KEY_SQL.items():
+        for md5_sql in ("md5", f"'{TOTALS_ANY_MD5}'"):
+            for way_sql in ("way", str(TOTALS_ANY_WAY)):
+                cur.execute(f"""
+                INSERT INTO timeread_totals(period, pkey, md5, way, words, seconds)
+                SELECT ?, {key_sql}, {md5_sql}, {way_sql}, SUM(words), SUM(seconds)
+                FROM timereads
+                GROUP BY 2, 3, 4
+                """, (period,))
+
+
+def add_time_read_totals(
+    cur: sqlite3.Cursor,
+    row: dict | sqlite3.Row,
+    sign: int = 1,
+) -> None:
+    """把一条 timereads 记录累加到汇总表，sign=-1 时减去
+
+    Args:
+        cur (sqlite3.Cursor): 数据库游标
+        row (dict | sqlite3.Row): 含 md5/way/year/month/week/day/words/seconds 的记录
+        sign (int, optional): 1 为累加，-1 为减去. Defaults to 1.
+    """
+    year, month, week, day = row["year"], row["month"], row["week"], row["day"]
+    keys = {
+        TOTALS_DAY: day_key(year, month, day),
+        TOTALS_WEEK: week_key(year, week),
+        TOTALS_MONTH: month_key(year, month),
+        TOTALS_YEAR: year,
+        TOTALS_ALL: 0,
+    }
+    words = sign * row["words"]
+    seconds = sign * row["seconds"]
+    cur.executemany(_ADD_TOTALS_SQL, [
+        {"period": period, "pkey": pkey, "md5": md5, "way": way,
+         "words": words, "seconds": seconds}
+        for period, pkey in keys.items()
+        for md5 in (row["md5"], TOTALS_ANY_MD5)
+        for way in (row["way"], TOTALS_ANY_WAY)
+    ])
+
+
+def get_time_read_totals(
+    cur: sqlite3.Cursor,
+    period: str,
+    pkey: int,
+    md5: str | None = None,
+    way: int | None = None,
+) -> tuple[int, float]:
+    """读取一个汇总
+
+    Args:
+        cur (sqlite3.Cursor): 数据库游标
+        period (str): 汇总周期，TOTALS_*
+        pkey (int): 周期键
+        md5 (str | None, optional): 书籍，None 表示全部. Defaults to None.
+        way (int | None, optional): 阅读方式，None 表示全部. Defaults to None.
+
+    Returns:
+        tuple[int, float]: (字数, 秒数)
+    """
+    cur.execute(
+        "SELECT words, seconds FROM timeread_totals "
+        "WHERE period = ? AND pkey = ? AND md5 = ? AND way = ?",
+        (
+            period,
+            pkey,
+            TOTALS_ANY_MD5 if md5 is None else md5,
+            TOTALS_ANY_WAY if way is None else way,
+        ),
+    )
+    row = cur.fetchone()
+    if row is None:
+        return 0, 0.0
+    return row[0], row[1]
@@ -0,0 +1,41 @@
+"""txt 书籍章节目录索引实体类"""
+from dataclasses import dataclass, field
+from datetime import datetime
+
+
+@dataclass
+class TxtChapIndex:
+    """txt 书籍持久化的章节目录索引
+    """
+    md5: str
+    # 建立索引时的文件大小，字节
+    file_size: int
+    # 建立索引时的文件修改时间，纳秒
+    file_mtime: int
+    # 生效解析规则（含编码）的摘要
+    rules_hash: str
+    # 章节标题
+    chap_names: list[str] = field(default_factory=list)
+    # 章节在解码后全文中的字符偏移
+    chap_ps: list[int] = field(default_factory=list)
+    # 章节在文件中的字节偏移
+    chap_bps: list[int] = field(default_factory=list)
+    update_date: int = field(
+        default_factory=lambda: int(datetime.now().timestamp()))
+
+    def is_valid_for(self, file_size: int, file_mtime: int, rules_hash: str) -> bool:
+        """判断索引是否仍与文件和解析规则一致
+
+        Args:
+            file_size (int): 当前文件大小
+            file_mtime (int): 当前文件修改时间，纳秒
+            rules_hash (str): 当前生效解析规则摘要
+
+        Returns:
+            bool: 索引是否可以直接复用
+        """
+        return (
+            self.file_size == file_size
+            and self.file_mtime == file_mtime
+            and self.rules_hash == rules_hash
+        )
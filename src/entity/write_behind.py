@@ -0,0 +1,169 @@
+"""高频数据库写入的合并与延迟提交。"""
+
+import atexit
+import copy
+import threading
+from pathlib import Path
+
+from ..utils.debug import get_logger
+from . import LibraryDB
+from .book import Book
+from .time_read import TimeRead
+
+# 两次提交的最大间隔，秒
+WRITE_BEHIND_INTERVAL = 2.0
+# 待写入的条目超过该数量时提前提交
+WRITE_BEHIND_MAX_PENDING = 200
+
+
+class LibraryWriteBehind:
+    """把阅读过程中每段一次的进度与阅读时间写入合并后定期批量提交
+
+    - 同一本书只保留最新的 Book
+    - 同一天同一章节同一方式的 TimeRead 先在内存中累加
+    - 后台线程按间隔在一个事务中写入，flush() 可立即写入
+    """
+
+    def __init__(
+        self,
+        db_path: Path | None = None,
+        interval: float = WRITE_BEHIND_INTERVAL,
+        max_pending: int = WRITE_BEHIND_MAX_PENDING,
+    ):
+        """初始化写入缓冲
+
+        Args:
+            db_path (Path | None, optional): 数据库路径，None 时使用默认数据库. Defaults to None.
+            interval (float, optional): 两次提交的最大间隔. Defaults to WRITE_BEHIND_INTERVAL.
+            max_pending (int, optional): 提前提交的条目数. Defaults to WRITE_BEHIND_MAX_PENDING.
+        """
+        self.db_path = db_path
+        self.interval = max(0.0, float(interval))
+        self.max_pending = max(1, int(max_pending))
+        self._cond = threading.Condition()
+        # 保证同一时刻只有一次写入，flush() 返回时之前提交的内容都已写入
+        self._flush_lock = threading.Lock()
+        self._books: dict[str, Book] = {}
+        self._trs: dict[tuple, TimeRead] = {}
+        self._thread: threading.Thread | None = None
+        self._closed = False
+
+    def update_book(self, b: Book) -> None:
+        """缓冲一次 LibraryDB.update_book
+
+        Args:
+            b (Book): 书籍，保存的是调用时的副本
+        """
+        with self._cond:
+            self._books[b.md5] = copy.copy(b)
+            self._notify_locked()
+
+    def save_time_read(self, tr: TimeRead) -> None:
+        """缓冲一次 LibraryDB.save_time_read，同一天同一章节的记录先行累加
+
+        Args:
+            tr (TimeRead): 阅读时间记录
+        """
+        key = (tr.md5, tr.way, tr.chap_n, tr.dt.date())
+        with self._cond:
+            pending = self._trs.get(key)
+            if pending is None:
+                self._trs[key] = copy.copy(tr)
+            else:
+                pending.words += tr.words
+                pending.seconds += tr.seconds
+            self._notify_locked()
+
+    def flush(self) -> None:
+        """立即在当前线程写入全部缓冲内容"""
+        with self._flush_lock:
+            with self._cond:
+                books, self._books = self._books, {}
+                trs, self._trs = self._trs, {}
+            if not books and not trs:
+                return
+
+            db = LibraryDB(self.db_path) if self.db_path else LibraryDB()
+            try:
+                with db:
+                    for b in books.values():
+                        db.update_book(b)
+                    for tr in trs.values():
+                        db.save_time_read(copy.copy(tr))
+            except Exception:
+                self._restore(books, trs)
+                raise
+
+    def _restore(self, books: dict[str, Book], trs: dict[tuple, TimeRead]) -> None:
+        """写入失败时放回缓冲，不覆盖期间产生的更新的内容"""
+        with self._cond:
+            for md5, b in books.items():
+                self._books.setdefault(md5, b)
+            for key, tr in trs.items():
+                pending = self._trs.get(key)
+                if pending is None:
+                    self._trs[key] = tr
+                else:
+                    pending.words += tr.words
+                    pending.seconds += tr.seconds
+
+    def close(self) -> None:
+        """写入剩余内容并停止后台线程"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(self.interval + 1)
+        self.flush()
+
+    def _notify_locked(self) -> None:
+        """在已加锁状态下唤醒或启动后台线程"""
+        if self._thread is None and not self._closed:
+            self._thread = threading.Thread(
+                target=self._run, name="heartale-db-write-behind", daemon=True)
+            self._thread.start()
+        if len(self._books) + len(self._trs) >= self.max_pending:
+            self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if self._closed:
+                    return
+                self._cond.wait(self.interval)
+                if self._closed:
+                    return
+            try:
+                self.flush()
+            except Exception as exc:  # pylint: disable=broad-except
+                get_logger().warning("Failed to write reading progress: %s", exc)
+
+
+_write_behind: LibraryWriteBehind | None = None
+_write_behind_lock = threading.Lock()
+
+
+def get_library_write_behind() -> LibraryWriteBehind:
+    """获取进程内共用的写入缓冲
+
+    Returns:
+        LibraryWriteBehind: 写入默认数据库的缓冲
+    """
+    global _write_behind  # pylint: disable=global-statement
+    with _write_behind_lock:
+        if _write_behind is None:
+            _write_behind = LibraryWriteBehind()
+        return _write_behind
+
+
+def flush_library_writes() -> None:
+    """写入缓冲中的全部内容，读取阅读进度或统计前调用"""
+    if _write_behind is not None:
+        _write_behind.flush()
+
+
+@atexit.register
+def _close_write_behind() -> None:
+    """进程退出前写入缓冲中的内容"""
+    if _write_behind is not None:
+        _write_behind.close()
@@ -2,19 +2,25 @@
 import argparse
 import sys
 from gettext import gettext as _
-from pathlib import Path
 
 from .cli_reader import run_read_book_cli
 from .entity import LibraryDB
 from .entity.book import BOOK_FMT_LEGADO, BOOK_FMT_TXT, Book
-from .servers.legado import (get_legado_sync_book_n, get_legado_sync_config,
-                             get_legado_sync_url, sync_legado_books)
-from .servers.txt import (TXT_PARSE_PRESETS, get_txt_parse_config, path2book,
+from .entity.write_behind import flush_library_writes
+from .servers.legado import (LegadoServer, get_legado_sync_book_n,
+                             get_legado_sync_config, get_legado_sync_url,
+                             sync_legado_books)
+from .servers.legado_download import (LegadoDownloadProgress,
+                                      download_legado_chapters)
+from .servers.txt import (TXT_PARSE_PRESETS, get_txt_parse_config,
                           set_txt_parse_config)
+from .servers.txt_import import (TxtImportResult, get_txt_import_workers,
+                                 import_txt_books, set_txt_import_workers)
 from .tts import THS
 from .tts.backends import (apply_active_tts_overrides,
                            build_active_tts_override_kwargs,
                            create_active_tts_backend)
+from .tts.cache import get_tts_cache_config, set_tts_cache_config
 
 
 def main(version, app_id):
@@ -63,6 +69,24 @@ def main(version, app_id):
         default=0,
         help=_("How many books to sync from Legado; 0 means use saved setting."),
     )
+    parser.add_argument(
+        "--legado-download",
+        type=int,
+        default=0,
+        help=_("Download chapters of the Nth book (1-based index, Legado only) for offline reading."),
+    )
+    parser.add_argument(
+        "--legado-download-chapters",
+        type=int,
+        default=0,
+        help=_("How many chapters to download from the current one; 0 means use saved setting."),
+    )
+    parser.add_argument(
+        "--legado-download-workers",
+        type=int,
+        default=0,
+        help=_("How many chapters to download at the same time; 0 means use saved setting."),
+    )
 
     parser.add_argument(
         "--tts-android-url",
@@ -100,6 +124,32 @@ def main(version, app_id):
             "unless reading is requested."
         ),
     )
+    parser.add_argument(
+        "--tts-cache-mb",
+        type=int,
+        default=None,
+        dest="tts_cache_mb",
+        help=_("Size limit of the persistent TTS audio cache in MB; 0 clears it on every start."),
+    )
+    parser.add_argument(
+        "--tts-prefetch-depth",
+        type=int,
+        default=None,
+        dest="tts_prefetch_depth",
+        help=_("How many upcoming paragraphs to synthesize ahead while reading aloud."),
+    )
+    parser.add_argument(
+        "--tts-chunk-chars",
+        type=int,
+        default=None,
+        dest="tts_chunk_chars",
+        help=_("Target length of each sentence chunk sent to TTS; 0 synthesizes whole paragraphs."),
+    )
+    parser.add_argument(
+        "--rebuild-reading-stats",
+        action="store_true",
+        help=_("Recompute reading statistics totals from raw reading records."),
+    )
     parser.add_argument(
         "--txt-import",
         nargs="+",
@@ -107,6 +157,12 @@ def main(version, app_id):
         default=[],
         help=_("Import one or more TXT files into the local bookshelf."),
     )
+    parser.add_argument(
+        "--txt-import-workers",
+        type=int,
+        default=None,
+        help=_("Save how many processes TXT import uses; 0 picks one per CPU core."),
+    )
     parser.add_argument(
         "--txt-volume-pattern",
         type=str,
@@ -152,11 +208,32 @@ def _run_cli(cli_args) -> int:
     if code != 0:
         return code
 
+    if cli_args.txt_import_workers is not None:
+        try:
+            set_txt_import_workers(cli_args.txt_import_workers)
+        except ValueError as exc:
+            print(exc)
+            return 1
+
+    if (cli_args.tts_cache_mb is not None or cli_args.tts_prefetch_depth is not None
+            or cli_args.tts_chunk_chars is not None):
+        set_tts_cache_config(max_mb=cli_args.tts_cache_mb,
+                             prefetch_depth=cli_args.tts_prefetch_depth,
+                             chunk_chars=cli_args.tts_chunk_chars)
+
     if cli_args.legado_sync:
         code = _run_sync_legado_cli(cli_args)
         if code != 0:
             return code
 
+    if cli_args.legado_download > 0:
+        code = _run_legado_download_cli(cli_args)
+        if code != 0:
+            return code
+
+    if cli_args.rebuild_reading_stats:
+        _rebuild_reading_stats_cli()
+
     if cli_args.txt_import:
         code = _run_import_txt_cli(cli_args.txt_import)
         if code != 0:
@@ -194,6 +271,69 @@ def _run_sync_legado_cli(cli_args) -> int:
     return 0 if sync_ok else 2
 
 
+def _run_legado_download_cli(cli_args) -> int:
+    """下载命令行指定的 Legado 书籍章节，供离线阅读。
+
+    Args:
+        cli_args (argparse.Namespace): 命令行参数对象
+
+    Returns:
+        int: 命令行退出码
+    """
+    idx = cli_args.legado_download
+    db = LibraryDB()
+    try:
+        books = list(db.iter_books())
+        book = None
+        if 1 <= idx <= len(books):
+            book = books[idx - 1]
+    finally:
+        db.close()
+
+    if book is None:
+        print(_("Book index out of range: {index}").format(index=idx))
+        _print_bookshelf_cli()
+        return 1
+    if book.fmt != BOOK_FMT_LEGADO:
+        print(_("Offline download is only available for Legado books"))
+        return 1
+
+    server = LegadoServer()
+    try:
+        server.initialize(book)
+    except Exception as exc:  # pylint: disable=broad-except
+        print(_("Failed to initialize book: {error}").format(error=exc))
+        return 1
+
+    def on_progress(progress: LegadoDownloadProgress):
+        print(f"\r{progress.format()}", end="", flush=True)
+
+    count = cli_args.legado_download_chapters
+    workers = cli_args.legado_download_workers
+    try:
+        progress = download_legado_chapters(
+            server,
+            count if count > 0 else None,
+            workers=workers if workers > 0 else None,
+            on_progress=on_progress,
+        )
+    except KeyboardInterrupt:
+        print()
+        print(_("Download interrupted, run again to resume"))
+        return 1
+    finally:
+        server.close()
+
+    print()
+    print(_("{name}: {downloaded} downloaded, {skipped} already cached, {failed} failed").format(
+        name=book.name,
+        downloaded=progress.downloaded,
+        skipped=progress.skipped,
+        failed=progress.failed,
+    ))
+    return 1 if progress.failed else 0
+
+
 def _print_bookshelf_cli():
     db = LibraryDB()
     try:
@@ -315,7 +455,7 @@ def _persist_txt_parse_overrides_cli(cli_args) -> int:
 
 
 def _run_import_txt_cli(paths: list[str]) -> int:
-    """导入命令行指定的 TXT 文件。
+    """导入命令行指定的 TXT 文件，进程数使用保存的设置。
 
     Args:
         paths (list[str]): 待导入的文件路径列表
@@ -323,26 +463,17 @@ def _run_import_txt_cli(paths: list[str]) -> int:
     Returns:
         int: 命令行退出码
     """
-    books = []
-    errors = []
-    for raw_path in paths:
-        try:
-            books.append(path2book(raw_path))
-        except (FileNotFoundError, OSError, ValueError, IndexError) as exc:
-            errors.append(
-                _("{name}: {error}").format(
-                    name=Path(raw_path).name,
-                    error=exc,
-                )
-            )
+    def on_progress(done: int, total: int, result: TxtImportResult):
+        status = result.error or _("OK")
+        print(f"[{done}/{total}] {result.name}: {status}")
 
-    if books:
-        db = LibraryDB()
-        try:
-            for book in books:
-                db.save_book(book)
-        finally:
-            db.close()
+    results = import_txt_books(paths, on_progress=on_progress)
+
+    errors = [
+        _("{name}: {error}").format(name=r.name, error=r.error)
+        for r in results if r.error
+    ]
+    if len(errors) < len(results):
         print(_("Books imported successfully"))
 
     if errors:
@@ -354,6 +485,19 @@ def _run_import_txt_cli(paths: list[str]) -> int:
     return 0
 
 
+def _rebuild_reading_stats_cli():
+    """由原始阅读记录重新计算阅读统计汇总表"""
+    flush_library_writes()
+    db = LibraryDB()
+    try:
+        db.rebuild_time_read_totals()
+        print(_("Reading statistics rebuilt"))
+        print(_("  today: {value}").format(value=db.get_td_day()))
+        print(_("  all: {value}").format(value=db.get_td_all()))
+    finally:
+        db.close()
+
+
 def _print_settings_cli():
     tts = create_active_tts_backend()
     tts.reload_config()
@@ -373,15 +517,31 @@ def _print_settings_cli():
     print(_("  engine: {value}").format(value=tts_cfg.get("engine", "")))
     print(_("  rate: {value}").format(value=tts_cfg.get("rate", "")))
     print(_("  pitch: {value}").format(value=tts_cfg.get("pitch", "")))
+    tts_cache_cfg = get_tts_cache_config()
+    print(_("  cache: {value} MB").format(value=tts_cache_cfg["max_mb"]))
+    print(_("  prefetch: {depth} paragraphs / {workers} workers / {mb} MB").format(
+        depth=tts_cache_cfg["prefetch_depth"],
+        workers=tts_cache_cfg["prefetch_workers"],
+        mb=tts_cache_cfg["prefetch_mb"]))
+    print(_("  chunk_chars: {value}").format(value=tts_cache_cfg["chunk_chars"]))
     print(_("Legado:"))
     print(_("  url_base: {value}").format(
         value=legado_cfg.get("url_base", "")))
     print(_("  book_n: {value}").format(value=legado_cfg.get("book_n", "")))
+    print(_("  timeout: {connect}s connect / {read}s read").format(
+        connect=legado_cfg.get("connect_timeout", ""),
+        read=legado_cfg.get("read_timeout", "")))
+    print(_("  retries: {value}").format(value=legado_cfg.get("retries", "")))
+    print(_("  download: {chapters} chapters / {workers} workers").format(
+        chapters=legado_cfg.get("download_chapters", ""),
+        workers=legado_cfg.get("download_workers", "")))
     print(_("TXT:"))
     print(_("  volume_pattern: {value}").format(
         value=txt_cfg.get("volume_pattern", "")))
     print(_("  chapter_pattern: {value}").format(
         value=txt_cfg.get("chapter_pattern", "")))
+    print(_("  import_workers: {value}").format(
+        value=get_txt_import_workers()))
     print(_("Reader:"))
     if isinstance(reader_cfg, dict) and reader_cfg:
         print(_("  font_size: {value}").format(
@@ -1,10 +1,7 @@
 """阅读页面。"""
 # pylint: disable=too-many-lines
 
-import shutil
-import subprocess
 import threading
-import time
 from gettext import gettext as _
 
 from gi.repository import Adw, GLib, Gtk  # type: ignore
@@ -12,7 +9,8 @@ from gi.repository import Adw, GLib, Gtk  # type: ignore
 from ..entity.time_read import TIME_READ_WAY_LISTEN, TIME_READ_WAY_READ
 from ..servers import Server
 from ..tts import THS
-from ..tts.cache import AudioPrefetchSlot
+from ..tts.player import create_audio_player
+from ..tts.prefetch import AudioPrefetchQueue
 from ..tts.read_runner import (TtsReadContext, TtsReadRunnerHooks,
                                run_tts_read_loop)
 from ..utils.debug import get_logger
@@ -78,11 +76,11 @@ class ReaderPage(ReaderSessionMixin, ReaderSettingsMixin, ReaderTocMixin, Adw.Na
 
         self._tts_thread: threading.Thread = None
         self._tts_stop_event = threading.Event()
-        self._tts_proc: subprocess.Popen = None
-        self._tts_proc_lock = threading.Lock()
+        # 朗读期间常驻的播放器，第一次朗读时创建
+        self._audio_player = None
         self._tts_book_md5 = None
         self._on_tts_state_changed = None
-        self._tts_prefetch_slot: AudioPrefetchSlot | None = None
+        self._tts_prefetch_queue: AudioPrefetchQueue | None = None
 
         self._reader_config = dict(READER_DEFAULT_CONFIG)
         self._suspend_reader_config_save = False
@@ -187,8 +185,10 @@ class ReaderPage(ReaderSessionMixin, ReaderSettingsMixin, ReaderTocMixin, Adw.Na
             self.get_root().toast_msg(_("TTS is not available yet."))
             return
         self.tts.reload_config()
-        if not shutil.which("paplay"):
-            self.get_root().toast_msg(_("paplay is not installed."))
+        if self._audio_player is None:
+            self._audio_player = create_audio_player(prefer_gst=True)
+        if self._audio_player is None:
+            self.get_root().toast_msg(_("No audio player found. Install GStreamer, pacat or paplay."))
             return
         if self._tts_thread and self._tts_thread.is_alive():
             self.get_root().toast_msg(_("Already reading aloud."))
@@ -210,8 +210,8 @@ class ReaderPage(ReaderSessionMixin, ReaderSettingsMixin, ReaderTocMixin, Adw.Na
         """
         chap_txts = self._server.bd.chap_txts
         start_idx = max(0, min(start_idx, len(chap_txts) - 1))
-        if self._tts_prefetch_slot is None:
-            self._tts_prefetch_slot = AudioPrefetchSlot(self.tts)
+        if self._tts_prefetch_queue is None:
+            self._tts_prefetch_queue = AudioPrefetchQueue(self.tts)
 
         self.gb_tts_start.set_visible(False)
         self.btn_tts_stop.set_visible(True)
@@ -229,7 +229,7 @@ class ReaderPage(ReaderSessionMixin, ReaderSettingsMixin, ReaderTocMixin, Adw.Na
                     TtsReadContext(
                         server=self._server,
                         tts=self.tts,
-                        prefetch_slot=self._tts_prefetch_slot,
+                        prefetch_queue=self._tts_prefetch_queue,
                         chap_txts=chap_txts,
                         hooks=TtsReadRunnerHooks(
                             play_audio=self._play_audio,
@@ -296,52 +296,31 @@ class ReaderPage(ReaderSessionMixin, ReaderSettingsMixin, ReaderTocMixin, Adw.Na
     def _stop_tts_playback(self):
         """停止当前 TTS 播放并清理预取状态"""
         self._tts_stop_event.set()
-        with self._tts_proc_lock:
-            if self._tts_proc and self._tts_proc.poll() is None:
-                self._tts_proc.terminate()
-        self._tts_proc = None
+        if self._audio_player is not None:
+            self._audio_player.stop()
         self._tts_book_md5 = None
         self._clear_prefetched_tts_audio()
         GLib.idle_add(self._emit_tts_state, False,
                       priority=GLib.PRIORITY_DEFAULT)
 
     def _play_audio(self, audio_path):
-        """播放单个音频文件直到结束或被中断
+        """播放单个音频文件，在快要结束时返回以便无缝接上下一段
 
         Args:
             audio_path (Path | str): 音频文件路径
 
         Returns:
-            bool: 是否播放成功结束
+            bool: 是否播放成功
         """
-        with subprocess.Popen(["paplay", str(audio_path)]) as proc:
-            with self._tts_proc_lock:
-                self._tts_proc = proc
-
-            while True:
-                if self._tts_stop_event.is_set():
-                    with self._tts_proc_lock:
-                        if self._tts_proc and self._tts_proc.poll() is None:
-                            self._tts_proc.terminate()
-                        self._tts_proc = None
-                    return False
-
-                with self._tts_proc_lock:
-                    if not self._tts_proc:
-                        return False
-                    code = self._tts_proc.poll()
-
-                if code is not None:
-                    with self._tts_proc_lock:
-                        self._tts_proc = None
-                    return code == 0
-                time.sleep(0.1)
+        if self._tts_stop_event.is_set() or self._audio_player is None:
+            return False
+        return self._audio_player.play(audio_path)
 
     def _clear_prefetched_tts_audio(self):
-        """清空并释放预取槽中的音频"""
-        if self._tts_prefetch_slot is not None:
-            self._tts_prefetch_slot.clear()
-            self._tts_prefetch_slot = None
+        """取消预取并释放预取队列中的音频"""
+        if self._tts_prefetch_queue is not None:
+            self._tts_prefetch_queue.clear()
+            self._tts_prefetch_queue = None
 
     def _on_tts_first_audio_ready(self) -> None:
         """在首条音频就绪后关闭加载状态。"""
@@ -427,6 +406,8 @@ class ReaderPage(ReaderSessionMixin, ReaderSettingsMixin, ReaderTocMixin, Adw.Na
         """停止朗读并重置朗读按钮状态。"""
         self._stop_tts_playback()
         self._set_tts_loading(False)
+        if self._server is not None:
+            self._server.flush_progress()
 
     @Gtk.Template.Callback()
     def _on_cancel_load_book(self, *_args) -> None:
@@ -520,6 +501,11 @@ class ReaderPage(ReaderSessionMixin, ReaderSettingsMixin, ReaderTocMixin, Adw.Na
             parts.append(chap_name)
         if total > 0:
             parts.append(f"{current}/{total}")
+        prefetch_queue = self._tts_prefetch_queue
+        if prefetch_queue is not None:
+            prefetch_status = prefetch_queue.get_status_text()
+            if prefetch_status:
+                parts.append(prefetch_status)
         return " - ".join(parts)
 
     def get_current_read_summary_text(self) -> str:
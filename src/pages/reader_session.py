@@ -9,10 +9,10 @@ from gi.repository import GLib  # type: ignore
 
 from ..entity import LibraryDB
 from ..entity.book import Book
+from ..entity.write_behind import flush_library_writes
 from ..tts.backends import create_active_tts_backend
 from ..utils.debug import get_logger
-from ..utils.reader import (create_reader_server, load_chapter_into_server,
-                            prefetch_next_chapter_async)
+from ..utils.reader import create_reader_server, load_chapter_into_server
 
 
 class ReaderSessionMixin:
@@ -84,6 +84,7 @@ class ReaderSessionMixin:
         Returns:
             Book | None: 数据库中的最新书籍对象
         """
+        flush_library_writes()
         db = LibraryDB()
         try:
             return db.get_book_by_md5(md5)
@@ -157,7 +158,10 @@ class ReaderSessionMixin:
             self.tts = create_active_tts_backend()
             loaded_book = self._load_book_from_db(book.md5)
 
+            old_server = self._server
             self._server = create_reader_server(loaded_book)
+            if old_server is not None:
+                old_server.close()
             self._wait_minimum_loading_time()
             GLib.idle_add(self._on_data_ready, book,
                           priority=GLib.PRIORITY_DEFAULT)
@@ -267,7 +271,7 @@ class ReaderSessionMixin:
             chap_txt_pos=self._server.book.chap_txt_pos,
             save_progress=chap_n > 0,
         )
-        prefetch_next_chapter_async(self._server)
+        self._server.schedule_read_ahead()
         GLib.idle_add(self._update_chapter_ui, chap_name,
                       priority=GLib.PRIORITY_DEFAULT)
 
@@ -2,15 +2,15 @@
 
 import threading
 from gettext import gettext as _
-from pathlib import Path
 
 from gi.repository import Adw, Gdk, Gio, GLib, GObject, Gtk  # type: ignore
 
 from ..entity import LibraryDB
 from ..entity.book import Book, BookObject
+from ..entity.write_behind import flush_library_writes
 from ..servers.legado import (get_legado_sync_book_n, get_legado_sync_url,
                               sync_legado_books)
-from ..servers.txt import path2book
+from ..servers.txt_import import TxtImportResult, import_txt_books
 from ..utils.debug import get_logger
 # 必须导入，否则模板无法识别
 from ..widgets.properties_view import \
@@ -85,6 +85,7 @@ class ShelfPage(Adw.NavigationPage):
         self.refresh_header_subtitle()
 
         def worker():
+            flush_library_writes()
             db = LibraryDB()
             books = list(db.iter_books())
 
@@ -186,6 +187,8 @@ class ShelfPage(Adw.NavigationPage):
         self.hpv_book.set_data(book)
 
     def _on_shelfrow_top(self, book: Book):
+        # 先写入朗读中缓冲的进度，避免之后覆盖置顶状态
+        flush_library_writes()
         db = LibraryDB()
 
         if book.sort > 0:
@@ -217,6 +220,7 @@ class ShelfPage(Adw.NavigationPage):
 
         # （可选）先同步数据库
         try:
+            flush_library_writes()
             db = LibraryDB()
             db.delete_book_by_md5(book.md5)  # 按你的接口调整
             db.close()
@@ -283,38 +287,52 @@ class ShelfPage(Adw.NavigationPage):
         paths = []
         for f in files:
             paths.append(f.get_path())
-        books: list[Book] = []
-        s_error = ""
-        for path in paths:
-            try:
-                book = path2book(path)
-            except (FileNotFoundError, ValueError) as e:
-                get_logger().error("Failed to import book: %s", e)
-                s_error += f"{Path(path).name}: {e}\n"
-                continue
-            books.append(book)
-
-        if s_error:
-            edlg = Adw.MessageDialog.new(self.get_root(),
-                                         _("Import partially failed"), s_error)
-            edlg.add_response("ok", _("OK"))
-            edlg.set_default_response("ok")
-            edlg.set_close_response("ok")
-            edlg.present()
+        if not paths:
             return
 
-        if len(books) == 0:
-            return
+        def on_progress(done: int, total: int, result: TxtImportResult):
+            GLib.idle_add(update_progress, done, total, result.name,
+                          priority=GLib.PRIORITY_DEFAULT)
 
-        db = LibraryDB()
-        for b in books:
-            db.save_book(b)
+        def update_progress(done: int, total: int, name: str):
+            self.window_title.set_subtitle(
+                _("Importing {done}/{total}: {name}").format(
+                    done=done, total=total, name=name))
 
-        books_ = list(db.iter_books())
-        db.close()
-        self.build_bookshel(books_)
+        def worker():
+            results = import_txt_books(paths, on_progress=on_progress)
+            db = LibraryDB()
+            books_ = list(db.iter_books())
+            db.close()
+            GLib.idle_add(update_ui, results, books_,
+                          priority=GLib.PRIORITY_DEFAULT)
 
-        self.get_root().toast_msg(_("Books imported successfully"))
+        def update_ui(results: list[TxtImportResult], books_: list[Book]):
+            self.spinner_sync.set_visible(False)
+            self.spinner_sync.stop()
+            self.refresh_header_subtitle()
+
+            s_error = ""
+            for r in results:
+                if r.error:
+                    s_error += f"{r.name}: {r.error}\n"
+            if any(r.book is not None for r in results):
+                self.build_bookshel(books_)
+
+            if s_error:
+                edlg = Adw.MessageDialog.new(self.get_root(),
+                                             _("Import partially failed"), s_error)
+                edlg.add_response("ok", _("OK"))
+                edlg.set_default_response("ok")
+                edlg.set_close_response("ok")
+                edlg.present()
+                return
+
+            self.get_root().toast_msg(_("Books imported successfully"))
+
+        self.spinner_sync.set_visible(True)
+        self.spinner_sync.start()
+        threading.Thread(target=worker, daemon=True).start()
 
     def _apply_search(self, *_args):
         self._search_debounce_id = 0
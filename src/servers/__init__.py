@@ -6,10 +6,13 @@ from datetime import datetime
 
 from gettext import gettext as _
 
-from ..entity import LibraryDB
 from ..entity.book import Book
 from ..entity.time_read import TIME_READ_WAY_READ, TimeRead
+from ..entity.write_behind import (flush_library_writes,
+                                   get_library_write_behind)
 from ..utils.text import split_text
+from .cache import CHAP_TXT_CACHE_LOCAL_CHARS, ChapTxtCache
+from .read_ahead import ChapReadAhead
 
 
 class BookData:
@@ -66,6 +69,9 @@ class Server:
     """获取待阅读文本的基础类
     """
 
+    # 章节缓存的总字符数上限，远程书源的子类可以调大
+    chap_txt_cache_chars = CHAP_TXT_CACHE_LOCAL_CHARS
+
     def __init__(self, key: str):
         """初始化阅读服务基类
 
@@ -80,8 +86,11 @@ class Server:
 
         self.chap_names = []
         self.read_time = time.time()
-        self._chap_txt_cache = {}
-        self._chap_txt_cache_lock = threading.Lock()
+        self._chap_txt_cache = ChapTxtCache(self.chap_txt_cache_chars)
+        # 正在获取的章节 -> 获取完成事件，同一章节只请求一次
+        self._chap_loading: dict[int, threading.Event] = {}
+        self._chap_loading_lock = threading.Lock()
+        self.read_ahead = ChapReadAhead(self)
 
     def initialize(self, book: Book):
         """子类需要自定义异步初始化一些操作
@@ -132,15 +141,63 @@ class Server:
         if chap_n < 0:
             return self.get_chap_txt(chap_n)
 
-        with self._chap_txt_cache_lock:
-            cached = self._chap_txt_cache.get(chap_n)
+        self._chap_txt_cache.pin(self._get_pinned_chap_ns(chap_n))
+        cached = self._chap_txt_cache.get(chap_n)
         if cached is not None:
             return cached
 
-        chap_txt = self.get_chap_txt(chap_n)
-        self._store_chap_txt_cache(chap_n, chap_txt)
+        with self._chap_loading_lock:
+            event = self._chap_loading.get(chap_n)
+            owner = event is None
+            if owner:
+                event = threading.Event()
+                self._chap_loading[chap_n] = event
+        if not owner:
+            # 其他线程（通常是预读）正在获取同一章节，等待其结果
+            event.wait()
+            cached = self._chap_txt_cache.get(chap_n)
+            if cached is not None:
+                return cached
+
+        try:
+            chap_txt = self.get_chap_txt(chap_n)
+            self._store_chap_txt_cache(chap_n, chap_txt)
+        finally:
+            if owner:
+                with self._chap_loading_lock:
+                    self._chap_loading.pop(chap_n, None)
+                event.set()
         return chap_txt
 
+    def has_chap_txt_cached(self, chap_n: int) -> bool:
+        """章节正文是否已经在缓存中
+
+        Args:
+            chap_n (int): 章节索引
+
+        Returns:
+            bool: 是否已缓存
+        """
+        return chap_n in self._chap_txt_cache
+
+    def schedule_read_ahead(self, chap_n=-1):
+        """在后台预读当前章节前后的章节
+
+        Args:
+            chap_n (int, optional): 当前章节索引. Defaults to -1.
+        """
+        if chap_n < 0:
+            chap_n = self.book.chap_n
+        self.read_ahead.schedule(chap_n)
+
+    def flush_progress(self):
+        """立即同步尚未上传的阅读进度，本地书籍无需同步"""
+
+    def close(self):
+        """不再使用该阅读服务时调用，取消排队中的预读并写入阅读进度"""
+        self.read_ahead.cancel()
+        flush_library_writes()
+
     def prefetch_chap_txt(self, chap_n: int):
         """预取指定章节正文到缓存
 
@@ -174,32 +231,39 @@ class Server:
             keep (set[int] | None, optional): 需要保留的章节索引集合. Defaults to None.
         """
         keep_set = {i for i in (keep or set()) if isinstance(i, int) and i >= 0}
-        with self._chap_txt_cache_lock:
-            self._prune_chap_txt_cache_locked(keep_set)
+        self._chap_txt_cache.retain_only(keep_set)
+
+    def get_chap_txt_cache_stats(self) -> dict:
+        """获取章节缓存的命中、未命中和淘汰统计
+
+        Returns:
+            dict: 缓存统计信息
+        """
+        return self._chap_txt_cache.stats()
 
     def _store_chap_txt_cache(self, chap_n: int, chap_txt: str):
-        """写入章节缓存，并按窗口策略裁剪缓存
+        """写入章节缓存，超出上限时按 LRU 淘汰
 
         Args:
             chap_n (int): 章节索引
             chap_txt (str): 章节正文
         """
-        keep = {chap_n}
-        if chap_n + 1 < len(self.chap_names):
-            keep.add(chap_n + 1)
-        with self._chap_txt_cache_lock:
-            self._chap_txt_cache[chap_n] = chap_txt
-            self._prune_chap_txt_cache_locked(keep)
+        self._chap_txt_cache.put(chap_n, chap_txt)
 
-    def _prune_chap_txt_cache_locked(self, keep):
-        """在已加锁状态下裁剪章节缓存
+    def _get_pinned_chap_ns(self, chap_n: int) -> set[int]:
+        """当前章节和下一章节始终保留在缓存中
 
         Args:
-            keep (set[int]): 需要保留的章节索引集合
+            chap_n (int): 正在加载的章节索引，尚未打开书籍时视为当前章节
+
+        Returns:
+            set[int]: 需要固定的章节索引集合
         """
-        for chap_n in list(self._chap_txt_cache.keys()):
-            if chap_n not in keep:
-                self._chap_txt_cache.pop(chap_n, None)
+        cur = self.book.chap_n if self.book is not None else chap_n
+        pinned = {cur}
+        if cur + 1 < len(self.chap_names):
+            pinned.add(cur + 1)
+        return pinned
 
     # --------  基础方法   -------- #
 
@@ -270,7 +334,8 @@ class Server:
         self.book.chap_txt_pos = chap_txt_pos
         self.book.update_date = int(datetime.now().timestamp())
 
-        db = LibraryDB()
+        # 每段都会调用，合并后由后台线程批量写入
+        writes = get_library_write_behind()
         if way is not None:
             w = len(self.bd.chap_txts[self.bd.chap_txt_n])
             if seconds_override is None:
@@ -281,12 +346,11 @@ class Server:
             self.book.txt_pos += w
             td = TimeRead(md5=self.book.md5, name=self.book.name,
                           chap_n=chap_n, way=way, words=w, seconds=sec)
-            db.update_book(self.book)
-            db.save_time_read(td)
+            writes.update_book(self.book)
+            writes.save_time_read(td)
             self.read_time = time.time()
         else:
-            db.update_book(self.book)
-        db.close()
+            writes.update_book(self.book)
 
     def get_paragraph_anchor_pos(self, chap_txt_n: int) -> int:
         """返回指定段落内部的一个稳定锚点位置。
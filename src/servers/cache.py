@@ -0,0 +1,125 @@
+"""章节正文的内存缓存。"""
+
+import threading
+from collections import OrderedDict
+
+# 本地 txt 重新读取很快，缓存可以小一些，单位：字符
+CHAP_TXT_CACHE_LOCAL_CHARS = 500_000
+# 远程书源（Legado）每次获取都要走网络，缓存大一些，单位：字符
+CHAP_TXT_CACHE_REMOTE_CHARS = 3_000_000
+
+
+class ChapTxtCache:
+    """按总字符数限制大小的 LRU 章节缓存
+
+    被固定（pin）的章节不会被淘汰，即使总大小因此超过上限。
+    """
+
+    def __init__(self, max_chars: int):
+        """初始化章节缓存
+
+        Args:
+            max_chars (int): 缓存正文的总字符数上限
+        """
+        self.max_chars = max(0, int(max_chars))
+        self._items: OrderedDict[int, str] = OrderedDict()
+        self._chars = 0
+        self._pinned: set[int] = set()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, chap_n: int) -> str | None:
+        """读取章节正文，并标记为最近使用
+
+        Args:
+            chap_n (int): 章节索引
+
+        Returns:
+            str | None: 章节正文，未缓存时返回 None
+        """
+        with self._lock:
+            chap_txt = self._items.get(chap_n)
+            if chap_txt is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(chap_n)
+            self.hits += 1
+            return chap_txt
+
+    def __contains__(self, chap_n: int) -> bool:
+        with self._lock:
+            return chap_n in self._items
+
+    def put(self, chap_n: int, chap_txt: str):
+        """写入章节正文，超出上限时淘汰最久未使用的章节
+
+        Args:
+            chap_n (int): 章节索引
+            chap_txt (str): 章节正文
+        """
+        with self._lock:
+            old = self._items.pop(chap_n, None)
+            if old is not None:
+                self._chars -= len(old)
+            self._items[chap_n] = chap_txt
+            self._chars += len(chap_txt)
+            self._evict_locked()
+
+    def pin(self, chap_ns):
+        """设置不会被淘汰的章节，替换之前的设置
+
+        Args:
+            chap_ns (Iterable[int]): 章节索引
+        """
+        with self._lock:
+            self._pinned = set(chap_ns)
+            self._evict_locked()
+
+    def retain_only(self, keep):
+        """移除 keep 以外的全部章节
+
+        Args:
+            keep (set[int]): 需要保留的章节索引集合
+        """
+        with self._lock:
+            for chap_n in list(self._items):
+                if chap_n not in keep:
+                    self._chars -= len(self._items.pop(chap_n))
+                    self.evictions += 1
+
+    def clear(self):
+        """清空缓存，计数器保持不变"""
+        with self._lock:
+            self._items.clear()
+            self._chars = 0
+
+    def stats(self) -> dict:
+        """返回缓存统计信息
+
+        Returns:
+            dict: 命中、未命中、淘汰次数，以及当前章节数和字符数
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._items),
+                "chars": self._chars,
+                "max_chars": self.max_chars,
+            }
+
+    def _evict_locked(self):
+        """在已加锁状态下按 LRU 顺序淘汰未固定的章节"""
+        if self._chars <= self.max_chars:
+            return
+        for chap_n in list(self._items):
+            if self._chars <= self.max_chars:
+                break
+            if chap_n in self._pinned:
+                continue
+            self._chars -= len(self._items.pop(chap_n))
+            self.evictions += 1
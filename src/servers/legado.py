@@ -2,16 +2,25 @@
 import datetime
 import hashlib
 import json
+import sqlite3
+import threading
 import time
 from gettext import gettext as _
-from urllib.parse import quote
+from urllib.parse import quote, urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from ..entity import LibraryDB
 from ..entity.book import BOOK_FMT_LEGADO, Book
 from ..entity.time_read import TIME_READ_WAY_READ
+from ..utils.debug import get_logger
 from . import Server
+from .cache import CHAP_TXT_CACHE_REMOTE_CHARS
+from .legado_cache import (LegadoBookCache, LegadoShelfChanges,
+                           LegadoShelfIndex)
+from .progress_sync import ProgressSync
 
 # 常量定义
 CHAP_POS = "durChapterPos"
@@ -19,7 +28,31 @@ CHAP_INDEX = "durChapterIndex"
 CHAP_TITLE = "durChapterTitle"
 CHAP_TXT_N = "durChapterTxtN"
 LEGADO_SYNC_CONFIG_KEY = "legado_sync"
-LEGADO_SYNC_DEFAULT_CONFIG = {"url_base": "http://10.8.0.6:1122", "book_n": 5}
+LEGADO_SYNC_DEFAULT_CONFIG = {
+    "url_base": "http://10.8.0.6:1122",
+    "book_n": 5,
+    # 连接与读取超时，秒
+    "connect_timeout": 3.0,
+    "read_timeout": 10.0,
+    # 连接失败或 5xx 时的重试次数与退避系数
+    "retries": 2,
+    "backoff": 0.5,
+    # 同一章节内同步阅读进度的间隔，秒
+    "progress_interval": 5.0,
+    # 书架索引的有效期，秒；期间打开书籍不再请求整个书架，0 表示每次都请求
+    "shelf_ttl": 300.0,
+    # 离线下载时默认下载的章节数与并发数
+    "download_chapters": 100,
+    "download_workers": 4,
+}
+# 每个 Legado 地址保持的连接数
+LEGADO_POOL_MAXSIZE = 4
+# 可以安全重试的 5xx 状态码
+LEGADO_RETRY_STATUS = (500, 502, 503, 504)
+
+# scheme://host:port -> (Session, (连接超时, 读取超时))
+_sessions: dict[str, tuple[requests.Session, tuple[float, float]]] = {}
+_sessions_lock = threading.Lock()
 
 
 def bu(book_data: dict):
@@ -60,6 +93,15 @@ def get_legado_sync_config() -> dict:
         merged["book_n"] = max(1, int(merged.get("book_n", 5)))
     except (TypeError, ValueError):
         merged["book_n"] = LEGADO_SYNC_DEFAULT_CONFIG["book_n"]
+    for key, cast in (("connect_timeout", float), ("read_timeout", float),
+                      ("retries", int), ("backoff", float),
+                      ("progress_interval", float), ("shelf_ttl", float),
+                      ("download_chapters", int), ("download_workers", int)):
+        try:
+            merged[key] = max(0, cast(merged.get(key)))
+        except (TypeError, ValueError):
+            merged[key] = LEGADO_SYNC_DEFAULT_CONFIG[key]
+    merged["download_workers"] = max(1, merged["download_workers"])
     return merged
 
 
@@ -81,6 +123,8 @@ def set_legado_sync_url(url_base: str) -> str:
     db = LibraryDB()
     db.set_config(LEGADO_SYNC_CONFIG_KEY, cfg)
     db.close()
+    # 旧地址的空闲连接不再需要
+    reset_legado_sessions()
     return url
 
 
@@ -111,6 +155,8 @@ def set_legado_sync_book_n(book_n: int) -> int:
 class LegadoServer(Server):
     """阅读app相关的webapi"""
 
+    chap_txt_cache_chars = CHAP_TXT_CACHE_REMOTE_CHARS
+
     def __init__(self):
         """初始化应用API
 
@@ -123,6 +169,10 @@ class LegadoServer(Server):
         self.url_base = ""
         # 刚开始读取进度,但是不能保存云端
         self.init = True
+        # 在后台合并并上传阅读进度
+        self._progress_sync: ProgressSync | None = None
+        # 章节目录和正文的本地缓存，离线时也能阅读已下载的章节
+        self._cache: LegadoBookCache | None = None
         super().__init__("legado")
 
     def initialize(self, book: Book):
@@ -139,14 +189,15 @@ class LegadoServer(Server):
         #  同步手机端阅读进度
         # self.book.path: http://192.168.x.x:xxxx
         self.url_base = self.book.path
+        if self._progress_sync is None:
+            self._progress_sync = ProgressSync(
+                self._save_book_progress,
+                interval=get_legado_sync_config()["progress_interval"],
+                name="legado-progress-sync",
+            )
 
-        bs = get_book_shelf(self.url_base)
-        for b in bs:
-            if b["name"] == self.book.name and b["author"] == self.book.author:
-                self.book_data = b
-                break
-        if not self.book_data:
-            raise ValueError(_("Failed to fetch Legado book information."))
+        self.book_data = self._find_book_data()
+        self._cache.save_book_data(self.book_data)
 
         self.book.name = self.book_data["name"]
         self.book.author = self.book_data["author"]
@@ -170,6 +221,45 @@ class LegadoServer(Server):
 
         return f"{self.book.name} {self.get_chap_name()}"
 
+    def _find_book_data(self) -> dict:
+        """查找书籍信息，书架索引未过期时不请求书架
+
+        Returns:
+            dict: Legado 书架中该书的信息
+        """
+        name, author = self.book.name, self.book.author
+        index = LegadoShelfIndex(self.url_base)
+        book_data = None
+        if index.is_fresh(get_legado_sync_config()["shelf_ttl"]):
+            book_data = index.get(name, author)
+        # 书架索引比本地进度旧时，本地进度更新（它已经同步给远端）
+        use_local_progress = self.book.update_date > int(index.update_date)
+
+        if book_data is None:
+            try:
+                index, _changes = refresh_legado_shelf(self.url_base, index)
+            except (requests.RequestException, ValueError) as exc:
+                # 连不上手机时使用上次缓存的书籍信息离线阅读
+                book_data = index.get(name, author)
+                if book_data is None:
+                    cache = LegadoBookCache.find(name, author)
+                    book_data = cache.get_book_data() if cache else None
+                if book_data is None:
+                    raise
+                get_logger().warning("Legado is unreachable, reading offline: %s", exc)
+                use_local_progress = True
+            else:
+                book_data = index.get(name, author)
+                use_local_progress = False
+
+        if not book_data:
+            raise ValueError(_("Failed to fetch Legado book information."))
+        self._cache = LegadoBookCache(book_data["bookUrl"])
+        if use_local_progress:
+            book_data[CHAP_INDEX] = self.book.chap_n
+            book_data[CHAP_POS] = self.book.chap_txt_pos
+        return book_data
+
     def next(self):
         """下一步
 
@@ -190,7 +280,7 @@ class LegadoServer(Server):
 
         txt = self.bd.chap_txts[self.bd.chap_txt_n]
 
-        self._save_book_progress(
+        self._progress_sync.submit(
             self.get_chap_n(),
             self.get_chap_txt_pos(),
             self.get_chap_name(),
@@ -203,24 +293,55 @@ class LegadoServer(Server):
         if chap_n < 0:
             return super().get_chap_txt(chap_n)
 
+        title = self.chap_names[chap_n] if chap_n < len(self.chap_names) else None
+        chap_txt = self._cache.get_chap_txt(chap_n, title)
+        if chap_txt is not None:
+            return chap_txt
+
         url = f"{self.url_base}/getBookContent"
         params = f"{bu(self.book_data)}&index={chap_n}"
 
-        resp = _requests_get(f"{url}?{params}", timeout=10)
-        return resp.json()["data"]
+        resp = legado_get(f"{url}?{params}")
+        chap_txt = resp.json()["data"]
+        self._cache.save_chap_txt(chap_n, title or "", chap_txt)
+        return chap_txt
 
-    def _get_chap_names(self):
-        """异步获取书章节目录
+    def is_chap_txt_downloaded(self, chap_n: int) -> bool:
+        """章节正文是否已经下载到本地磁盘缓存
 
         Args:
-            book_data (dict): 书籍信息
+            chap_n (int): 章节索引
 
         Returns:
-            list: 章节目录，包含title等
+            bool: 是否已下载且与当前目录标题一致
         """
+        if not 0 <= chap_n < len(self.chap_names):
+            return False
+        return self._cache.has_chap_txt(chap_n, self.chap_names[chap_n])
+
+    def _get_chap_names(self):
+        """获取书章节目录，totalChapterNum 未变化时直接使用本地缓存
+
+        Returns:
+            list: 章节标题
+        """
+        total = self.book_data.get("totalChapterNum")
+        chap_names = self._cache.get_chap_names(total)
+        if chap_names is not None:
+            return chap_names
+
         url = f"{self.url_base}/getChapterList?{bu(self.book_data)}"
-        resp = _requests_get(url, timeout=10)
-        return [d["title"] for d in resp.json()["data"]]
+        try:
+            resp = legado_get(url)
+        except requests.RequestException:
+            # 离线时退回可能已经过期的目录
+            chap_names = self._cache.get_chap_names()
+            if chap_names is None:
+                raise
+            return chap_names
+        chap_names = [d["title"] for d in resp.json()["data"]]
+        self._cache.save_chap_names(chap_names, total)
+        return chap_names
 
     def save_read_progress(
         self,
@@ -241,8 +362,8 @@ class LegadoServer(Server):
             self.book_data[CHAP_INDEX] = chap_n
             self.book_data[CHAP_POS] = chap_txt_pos
             self.book_data[CHAP_TITLE] = self.get_chap_name(chap_n)
-        if not self.init and self.book_data:
-            self._save_book_progress(
+        if not self.init and self.book_data and self._progress_sync:
+            self._progress_sync.submit(
                 chap_n,
                 chap_txt_pos,
                 self.get_chap_name(chap_n),
@@ -254,13 +375,24 @@ class LegadoServer(Server):
             seconds_override=seconds_override,
         )
 
+    def flush_progress(self):
+        """立即在后台上传尚未同步的阅读进度"""
+        if self._progress_sync is not None:
+            self._progress_sync.flush()
+
+    def close(self):
+        """取消预读，并在退出前上传最后的阅读进度"""
+        super().close()
+        if self._progress_sync is not None:
+            self._progress_sync.stop()
+
     def _save_book_progress(
         self,
         chap_n: int,
         chap_txt_pos: int,
         chap_title: str,
     ) -> None:
-        """将指定阅读进度同步到 Legado 远端。
+        """将指定阅读进度同步到 Legado 远端，在进度同步线程中调用。
 
         Args:
             chap_n (int): 当前章节索引
@@ -286,11 +418,10 @@ class LegadoServer(Server):
         json_data = json.dumps(data)
         headers = {'Content-Type': 'application/json'}
 
-        resp = _requests_post(
+        resp = legado_post(
             f"{self.url_base}/saveBookProgress",
             data=json_data,
             headers=headers,
-            timeout=10,
         )
         resp_json = resp.json()
 
@@ -308,7 +439,7 @@ def get_book_shelf(url):
     Returns:
         dict: 书籍信息
     """
-    resp = _requests_get(f"{url}/getBookshelf", timeout=10)
+    resp = legado_get(f"{url}/getBookshelf")
     if resp.status_code != 200:
         raise ValueError(
             _(
@@ -319,21 +450,89 @@ def get_book_shelf(url):
     return resp.json()["data"]
 
 
-def _requests_get(url: str, timeout: int = 10):
-    """发起 GET 请求。
+def refresh_legado_shelf(
+    url_base: str,
+    index: LegadoShelfIndex | None = None,
+) -> tuple[LegadoShelfIndex, LegadoShelfChanges]:
+    """重新获取书架并合并到本地书架索引
+
+    Args:
+        url_base (str): Legado 地址
+        index (LegadoShelfIndex | None, optional): 已加载的索引. Defaults to None.
+
+    Returns:
+        tuple[LegadoShelfIndex, LegadoShelfChanges]: 更新后的索引和相对上次的变化
+    """
+    if index is None:
+        index = LegadoShelfIndex(url_base)
+    changes = index.merge(get_book_shelf(url_base))
+    return index, changes
+
+
+def get_legado_session(url: str) -> tuple[requests.Session, tuple[float, float]]:
+    """获取某个 Legado 地址共用的会话，复用 keep-alive 连接
+
+    Args:
+        url (str): Legado 地址或其下的任意接口地址
+
+    Returns:
+        tuple[requests.Session, tuple[float, float]]: 会话和 (连接超时, 读取超时)
+    """
+    parts = urlsplit(url)
+    key = f"{parts.scheme}://{parts.netloc}"
+    with _sessions_lock:
+        item = _sessions.get(key)
+        if item is not None:
+            return item
+
+        cfg = get_legado_sync_config()
+        retry = Retry(
+            total=cfg["retries"],
+            connect=cfg["retries"],
+            read=cfg["retries"],
+            status=cfg["retries"],
+            backoff_factor=cfg["backoff"],
+            status_forcelist=LEGADO_RETRY_STATUS,
+            # saveBookProgress 只是覆盖进度，重复提交无副作用
+            allowed_methods=frozenset({"GET", "POST"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1,
+                              pool_maxsize=LEGADO_POOL_MAXSIZE,
+                              max_retries=retry)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        item = (session, (cfg["connect_timeout"], cfg["read_timeout"]))
+        _sessions[key] = item
+        return item
+
+
+def reset_legado_sessions() -> None:
+    """关闭全部会话，下次请求时按最新配置重新创建"""
+    with _sessions_lock:
+        for session, _timeout in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+def legado_get(url: str, timeout=None):
+    """通过共用会话发起 GET 请求。
 
     Args:
         url (str): 请求地址
-        timeout (int, optional): 超时时间. Defaults to 10.
+        timeout (float | tuple[float, float] | None, optional): 超时时间，
+            None 时使用配置的连接与读取超时. Defaults to None.
 
     Returns:
         requests.Response: 响应对象
     """
-    return requests.get(url, timeout=timeout)
+    session, default_timeout = get_legado_session(url)
+    return session.get(url, timeout=timeout or default_timeout)
 
 
-def _requests_post(url: str, **kwargs):
-    """发起 POST 请求。
+def legado_post(url: str, **kwargs):
+    """通过共用会话发起 POST 请求。
 
     Args:
         url (str): 请求地址
@@ -342,8 +541,9 @@ def _requests_post(url: str, **kwargs):
     Returns:
         requests.Response: 响应对象
     """
-    timeout = kwargs.pop("timeout", 10)
-    return requests.post(url, timeout=timeout, **kwargs)
+    session, default_timeout = get_legado_session(url)
+    timeout = kwargs.pop("timeout", None) or default_timeout
+    return session.post(url, timeout=timeout, **kwargs)
 
 
 def get_txt_all(b):
@@ -372,6 +572,48 @@ def get_txt_all(b):
     return int(word_count)
 
 
+def _legado_md5(name: str, author: str) -> str:
+    """Legado 书籍在本地书架中的 md5"""
+    return hashlib.md5(f"legado-{name}-{author}".encode("utf-8")).hexdigest()
+
+
+def _refresh_legado_chap_lists(
+    url_base: str, lbs: list[dict]
+) -> tuple[dict[tuple[str, str], tuple[int, int]], str]:
+    """并行重新获取目录缓存缺失或过期的书的章节目录
+
+    Args:
+        url_base (str): Legado 地址
+        lbs (list[dict]): 书架中选中的书
+
+    Returns:
+        tuple[dict[tuple[str, str], tuple[int, int]], str]:
+            (书名, 作者) -> (章节数, 字数)，以及失败信息
+    """
+    # 避免与 legado_async 循环导入
+    # pylint: disable=import-outside-toplevel
+    from .legado_async import fetch_legado_chap_lists, get_chap_list_txt_all
+
+    stale = [
+        b for b in lbs
+        if b.get("bookUrl") and LegadoBookCache(b["bookUrl"]).get_chap_names(
+            b.get("totalChapterNum")) is None
+    ]
+    refreshed = {}
+    s_error = ""
+    for b, chaps in zip(stale, fetch_legado_chap_lists(url_base, stale)):
+        if isinstance(chaps, Exception):
+            s_error += _("Failed to fetch chapters of {name}: {error}\n").format(
+                name=b["name"], error=chaps)
+            continue
+        total = b.get("totalChapterNum")
+        LegadoBookCache(b["bookUrl"]).save_chap_names(
+            [c["title"] for c in chaps], total)
+        refreshed[(b["name"], b["author"])] = (
+            len(chaps), get_chap_list_txt_all(chaps, b))
+    return refreshed, s_error
+
+
 def sync_legado_books(book_n=5, url_base="http://10.8.0.6:1122") -> dict:
     """导入Legado书籍信息，网络请求
 
@@ -385,35 +627,59 @@ def sync_legado_books(book_n=5, url_base="http://10.8.0.6:1122") -> dict:
     sync = True
     s_error = ""
     try:
-        lbs = get_book_shelf(url_base)
+        index, changes = refresh_legado_shelf(url_base)
     except Exception as e:  # pylint: disable=broad-except
         sync = False
         s_error += _("Failed to fetch Legado book\n\n{error}").format(error=e)
         print(e)
         return sync, s_error
 
+    lbs = index.books()[:book_n]
+    md5s = [_legado_md5(b["name"], b["author"]) for b in lbs]
+    changed = {(b["name"], b["author"]) for b in changes.changed}
+    refreshed, refresh_error = _refresh_legado_chap_lists(url_base, lbs)
+    s_error += refresh_error
+
     db = LibraryDB()
-    book_n = min(book_n, len(lbs))
-    for i, b in enumerate(lbs[:book_n]):
-        s_error += f"\n----- {i} -----\n"
-        try:
-            name = b["name"]
-            author = b["author"]
-            s_error += _("Synced Legado book: {name} Author: {author}\n").format(
-                name=name, author=author)
-
-            md5 = hashlib.md5(f"legado-{name}-{author}"
-                              .encode("utf-8")).hexdigest()
-            book = Book(url_base, name, author, b["durChapterIndex"],
-                        b["durChapterTitle"], b["totalChapterNum"],
-                        b["durChapterPos"], 0,
-                        get_txt_all(b), "utf-8", md5)
-            book.fmt = BOOK_FMT_LEGADO
-            db.save_book(book)
-
-        except Exception as e:  # pylint: disable=broad-except
-            sync = False
-            s_error += _("Parsing error: {error}\n").format(error=e)
+    try:
+        existing = db.get_existing_md5s(md5s)
+        books, book_datas = [], []
+        for i, (b, md5) in enumerate(zip(lbs, md5s)):
+            s_error += f"\n----- {i} -----\n"
+            try:
+                name = b["name"]
+                author = b["author"]
+                s_error += _("Synced Legado book: {name} Author: {author}\n").format(
+                    name=name, author=author)
+                # 书架信息和目录都没变且已在本地书架中，无需再写
+                if (md5 in existing and (name, author) not in changed
+                        and (name, author) not in refreshed):
+                    continue
+
+                chap_all, txt_all = refreshed.get(
+                    (name, author), (b["totalChapterNum"], get_txt_all(b)))
+                book = Book(url_base, name, author, b["durChapterIndex"],
+                            b["durChapterTitle"], chap_all,
+                            b["durChapterPos"], 0,
+                            txt_all, "utf-8", md5)
+                book.fmt = BOOK_FMT_LEGADO
+                books.append(book)
+                book_datas.append(b)
+            except Exception as e:  # pylint: disable=broad-except
+                sync = False
+                s_error += _("Parsing error: {error}\n").format(error=e)
+
+        # 一次查询、一条 executemany、一个事务写入全部书籍
+        with db.conn:
+            db.save_books(books)
+    except sqlite3.Error as e:
+        sync = False
+        s_error += _("Failed to save Legado books: {error}\n").format(error=e)
+        return sync, s_error
+    finally:
+        db.close()
 
-    db.close()
+    for b in book_datas:
+        if b.get("bookUrl"):
+            LegadoBookCache(b["bookUrl"]).save_book_data(b)
     return sync, s_error
@@ -0,0 +1,161 @@
+"""Legado web 接口的 asyncio 客户端，用于并行获取多本书的信息。
+
+这不是原生的 asyncio HTTP 客户端：每个请求都用 asyncio.to_thread 在线程中调用
+同步的 legado_get / legado_post，与同步代码共用同一个 requests 会话。
+"""
+
+import asyncio
+import json
+from gettext import gettext as _
+
+from .legado import (LEGADO_POOL_MAXSIZE, bu, get_txt_all, legado_get,
+                     legado_post)
+
+
+class AsyncLegadoClient:
+    """并发访问同一个 Legado 地址
+
+    请求仍由共用的 requests 会话在线程中完成，与同步代码共享同一个连接池，
+    信号量限制同时进行的请求数不超过连接池大小。
+    """
+
+    def __init__(self, url_base: str, limit: int = LEGADO_POOL_MAXSIZE):
+        """初始化客户端
+
+        Args:
+            url_base (str): Legado 地址
+            limit (int, optional): 同时进行的请求数. Defaults to LEGADO_POOL_MAXSIZE.
+        """
+        self.url_base = url_base
+        self._sem = asyncio.Semaphore(max(1, int(limit)))
+
+    async def _get_data(self, path: str):
+        """GET 请求并返回响应中的 data 字段
+
+        Args:
+            path (str): 接口路径及查询参数
+
+        Returns:
+            Any: 响应中的 data
+        """
+        url = f"{self.url_base}{path}"
+        async with self._sem:
+            resp = await asyncio.to_thread(legado_get, url)
+        if resp.status_code != 200:
+            raise ValueError(
+                _(
+                    "The website you entered is most likely incorrect. "
+                    "The current URL is: {}"
+                ).format(self.url_base)
+            )
+        return resp.json()["data"]
+
+    async def get_book_shelf(self) -> list[dict]:
+        """获取书架
+
+        Returns:
+            list[dict]: 书架中的书籍信息
+        """
+        return await self._get_data("/getBookshelf")
+
+    async def get_chap_list(self, book_data: dict) -> list[dict]:
+        """获取章节目录
+
+        Args:
+            book_data (dict): 书架中该书的信息
+
+        Returns:
+            list[dict]: 章节信息，至少包含 title
+        """
+        return await self._get_data(f"/getChapterList?{bu(book_data)}")
+
+    async def get_book_content(self, book_data: dict, chap_n: int) -> str:
+        """获取章节正文
+
+        Args:
+            book_data (dict): 书架中该书的信息
+            chap_n (int): 章节索引
+
+        Returns:
+            str: 章节正文
+        """
+        return await self._get_data(f"/getBookContent?{bu(book_data)}&index={chap_n}")
+
+    async def save_book_progress(self, progress: dict) -> None:
+        """上传阅读进度
+
+        Args:
+            progress (dict): 与 saveBookProgress 接口一致的进度数据
+
+        Raises:
+            ValueError: 保存失败时抛出
+        """
+        async with self._sem:
+            resp = await asyncio.to_thread(
+                legado_post,
+                f"{self.url_base}/saveBookProgress",
+                data=json.dumps(progress),
+                headers={"Content-Type": "application/json"},
+            )
+        resp_json = resp.json()
+        if not resp_json["isSuccess"]:
+            raise ValueError(_("Failed to save reading progress!\n{error}").format(
+                error=resp_json["errorMsg"]))
+
+    async def get_chap_lists(
+        self, book_datas: list[dict]
+    ) -> list[list[dict] | Exception]:
+        """并行获取多本书的章节目录
+
+        Args:
+            book_datas (list[dict]): 书架中的书籍信息
+
+        Returns:
+            list[list[dict] | Exception]: 与 book_datas 一一对应，失败的位置为异常
+        """
+        return await asyncio.gather(
+            *(self.get_chap_list(b) for b in book_datas),
+            return_exceptions=True,
+        )
+
+
+def fetch_legado_chap_lists(
+    url_base: str,
+    book_datas: list[dict],
+    limit: int = LEGADO_POOL_MAXSIZE,
+) -> list[list[dict] | Exception]:
+    """在同步代码中并行获取多本书的章节目录
+
+    Args:
+        url_base (str): Legado 地址
+        book_datas (list[dict]): 书架中的书籍信息
+        limit (int, optional): 同时进行的请求数. Defaults to LEGADO_POOL_MAXSIZE.
+
+    Returns:
+        list[list[dict] | Exception]: 与 book_datas 一一对应，失败的位置为异常
+    """
+    if not book_datas:
+        return []
+
+    async def run():
+        return await AsyncLegadoClient(url_base, limit).get_chap_lists(book_datas)
+
+    return asyncio.run(run())
+
+
+def get_chap_list_txt_all(chaps: list[dict], book_data: dict) -> int:
+    """由章节目录统计字数，目录中没有字数时使用书架中的字数
+
+    Args:
+        chaps (list[dict]): 章节目录
+        book_data (dict): 书架中该书的信息
+
+    Returns:
+        int: 字数
+    """
+    try:
+        txt_all = sum(get_txt_all(c) for c in chaps)
+    except (TypeError, ValueError):
+        txt_all = 0
+    return txt_all or get_txt_all(book_data)
+
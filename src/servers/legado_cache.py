@@ -0,0 +1,267 @@
+"""Legado 书籍的本地磁盘缓存。"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .. import PATH_TEMP_LEGADO
+
+
+class LegadoBookCache:
+    """按 bookUrl 保存书架信息、章节目录和章节正文
+
+    目录结构::
+
+        <sha1(bookUrl)>/book.json       书架中该书的信息
+        <sha1(bookUrl)>/chapters.json   章节目录及生成时的 totalChapterNum
+        <sha1(bookUrl)>/chap/<n>.json   第 n 章的标题和正文
+
+    章节正文带有标题，目录变化导致下标错位时不会被误用。
+    """
+
+    def __init__(self, book_url: str, cache_dir: Path | None = None):
+        """初始化某本书的缓存
+
+        Args:
+            book_url (str): Legado 中书籍的 bookUrl
+            cache_dir (Path | None, optional): 缓存根目录. Defaults to None.
+        """
+        key = hashlib.sha1(book_url.encode("utf-8")).hexdigest()
+        self.book_url = book_url
+        self.path = (cache_dir or PATH_TEMP_LEGADO) / key
+        self._chap_dir = self.path / "chap"
+
+    @classmethod
+    def find(cls, name: str, author: str, cache_dir: Path | None = None):
+        """按书名和作者查找已缓存的书，用于离线打开
+
+        Args:
+            name (str): 书名
+            author (str): 作者
+            cache_dir (Path | None, optional): 缓存根目录. Defaults to None.
+
+        Returns:
+            LegadoBookCache | None: 找到的缓存，没有时返回 None
+        """
+        for path in (cache_dir or PATH_TEMP_LEGADO).glob("*/book.json"):
+            data = _read_json(path)
+            if (isinstance(data, dict) and data.get("bookUrl")
+                    and data.get("name") == name and data.get("author") == author):
+                return cls(data["bookUrl"], cache_dir)
+        return None
+
+    def get_book_data(self) -> dict | None:
+        """读取缓存的书架信息
+
+        Returns:
+            dict | None: 书架信息，没有缓存时返回 None
+        """
+        return _read_json(self.path / "book.json")
+
+    def save_book_data(self, book_data: dict) -> None:
+        """保存书架信息
+
+        Args:
+            book_data (dict): Legado 书架中该书的信息
+        """
+        _write_json(self.path / "book.json", book_data)
+
+    def get_chap_names(self, total_chapter_num: int | None = None) -> list[str] | None:
+        """读取缓存的章节目录
+
+        Args:
+            total_chapter_num (int | None, optional): 书架中最新的 totalChapterNum，
+                与缓存时不一致说明目录已更新. None 表示不校验. Defaults to None.
+
+        Returns:
+            list[str] | None: 章节标题列表，没有缓存或已过期时返回 None
+        """
+        data = _read_json(self.path / "chapters.json")
+        if not isinstance(data, dict) or not isinstance(data.get("titles"), list):
+            return None
+        if total_chapter_num is not None and data.get("total") != total_chapter_num:
+            return None
+        return data["titles"]
+
+    def save_chap_names(self, chap_names: list[str], total_chapter_num: int) -> None:
+        """保存章节目录
+
+        Args:
+            chap_names (list[str]): 章节标题列表
+            total_chapter_num (int): 书架中的 totalChapterNum
+        """
+        _write_json(self.path / "chapters.json", {
+            "total": total_chapter_num,
+            "titles": chap_names,
+            "update_date": int(time.time()),
+        })
+
+    def get_chap_txt(self, chap_n: int, title: str | None = None) -> str | None:
+        """读取缓存的章节正文
+
+        Args:
+            chap_n (int): 章节索引
+            title (str | None, optional): 当前目录中的章节标题，不一致时视为未缓存. Defaults to None.
+
+        Returns:
+            str | None: 章节正文，没有缓存时返回 None
+        """
+        data = _read_json(self._chap_dir / f"{chap_n}.json")
+        if not isinstance(data, dict) or not isinstance(data.get("content"), str):
+            return None
+        if title is not None and data.get("title") != title:
+            return None
+        return data["content"]
+
+    def has_chap_txt(self, chap_n: int, title: str | None = None) -> bool:
+        """章节正文是否已经缓存
+
+        Args:
+            chap_n (int): 章节索引
+            title (str | None, optional): 当前目录中的章节标题. Defaults to None.
+
+        Returns:
+            bool: 是否已缓存
+        """
+        return self.get_chap_txt(chap_n, title) is not None
+
+    def save_chap_txt(self, chap_n: int, title: str, content: str) -> None:
+        """保存章节正文
+
+        Args:
+            chap_n (int): 章节索引
+            title (str): 章节标题
+            content (str): 章节正文
+        """
+        _write_json(self._chap_dir / f"{chap_n}.json", {
+            "title": title,
+            "content": content,
+        })
+
+
+@dataclass(slots=True)
+class LegadoShelfChanges:
+    """一次书架刷新相对上次的变化"""
+
+    # 新增或信息有变化的书，保持书架顺序
+    added: list[dict] = field(default_factory=list)
+    updated: list[dict] = field(default_factory=list)
+    # 已从书架移除的书的 (书名, 作者)
+    removed: list[tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def changed(self) -> list[dict]:
+        """新增和有变化的书"""
+        return self.added + self.updated
+
+
+class LegadoShelfIndex:
+    """某个 Legado 地址的书架索引，按 (书名, 作者) 查找
+
+    保存最近一次获取的完整书架和获取时间，未过期时打开书籍不必再请求书架。
+    """
+
+    def __init__(self, url_base: str, cache_dir: Path | None = None):
+        """初始化书架索引
+
+        Args:
+            url_base (str): Legado 地址
+            cache_dir (Path | None, optional): 缓存根目录. Defaults to None.
+        """
+        key = hashlib.sha1(url_base.encode("utf-8")).hexdigest()
+        self.url_base = url_base
+        self.path = (cache_dir or PATH_TEMP_LEGADO) / f"shelf-{key}.json"
+        self.update_date = 0.0
+        self._books: dict[tuple[str, str], dict] = {}
+        self._load()
+
+    def _load(self) -> None:
+        data = _read_json(self.path)
+        if not isinstance(data, dict) or not isinstance(data.get("books"), list):
+            return
+        self.update_date = float(data.get("update_date") or 0)
+        for b in data["books"]:
+            if isinstance(b, dict) and "name" in b and "author" in b:
+                self._books[(b["name"], b["author"])] = b
+
+    def __len__(self) -> int:
+        return len(self._books)
+
+    def is_fresh(self, ttl: float) -> bool:
+        """索引是否在有效期内
+
+        Args:
+            ttl (float): 有效期，秒
+
+        Returns:
+            bool: 未过期返回 True
+        """
+        return bool(self._books) and time.time() - self.update_date < ttl
+
+    def get(self, name: str, author: str) -> dict | None:
+        """按书名和作者查找书架中的书
+
+        Args:
+            name (str): 书名
+            author (str): 作者
+
+        Returns:
+            dict | None: 书籍信息的副本，不在书架中时返回 None
+        """
+        b = self._books.get((name, author))
+        return dict(b) if b is not None else None
+
+    def books(self) -> list[dict]:
+        """按书架顺序返回全部书籍信息"""
+        return list(self._books.values())
+
+    def merge(self, shelf: list[dict]) -> LegadoShelfChanges:
+        """用新获取的书架更新索引并保存，只返回有变化的部分
+
+        Args:
+            shelf (list[dict]): getBookshelf 返回的书架
+
+        Returns:
+            LegadoShelfChanges: 新增、变化和移除的书
+        """
+        changes = LegadoShelfChanges()
+        books: dict[tuple[str, str], dict] = {}
+        for b in shelf:
+            key = (b["name"], b["author"])
+            old = self._books.get(key)
+            if old is None:
+                changes.added.append(b)
+            elif old != b:
+                changes.updated.append(b)
+            books[key] = b
+        changes.removed = [key for key in self._books if key not in books]
+
+        self._books = books
+        self.update_date = time.time()
+        _write_json(self.path, {
+            "update_date": self.update_date,
+            "books": shelf,
+        })
+        return changes
+
+
+def _read_json(path: Path):
+    """读取 json 文件，不存在或损坏时返回 None"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path: Path, data) -> None:
+    """先写临时文件再替换，避免中断时留下半个文件"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.part")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
@@ -0,0 +1,144 @@
+"""批量下载 Legado 书籍章节，供离线阅读。"""
+
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from gettext import gettext as _
+
+from requests import RequestException
+
+from ..utils import sec2str
+from ..utils.debug import get_logger
+from .legado import LegadoServer, get_legado_sync_config
+
+
+@dataclass(slots=True)
+class LegadoDownloadProgress:
+    """批量下载的进度与速度"""
+
+    total: int
+    # 已处理的章节数，含跳过和失败
+    done: int = 0
+    # 之前已经下载过而跳过的章节数
+    skipped: int = 0
+    failed: int = 0
+    # 本次实际下载的字符数
+    chars: int = 0
+    stopped: bool = False
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def downloaded(self) -> int:
+        """本次实际下载成功的章节数"""
+        return self.done - self.skipped - self.failed
+
+    @property
+    def elapsed(self) -> float:
+        """已用时间，秒"""
+        return max(1e-6, time.monotonic() - self.started)
+
+    @property
+    def rate(self) -> float:
+        """下载速度，章/秒"""
+        return self.downloaded / self.elapsed
+
+    @property
+    def eta(self) -> float | None:
+        """预计剩余时间，秒；还没有下载完成的章节时无法估计"""
+        if self.done >= self.total:
+            return 0.0
+        if self.downloaded <= 0:
+            return None
+        return (self.total - self.done) / self.rate
+
+    def format(self) -> str:
+        """生成界面与命令行共用的进度文本
+
+        Returns:
+            str: 进度文本
+        """
+        eta = self.eta
+        return _("{done}/{total} chapters · {rate:.1f} ch/s · {speed:.0f}k chars/s · ETA {eta}").format(
+            done=self.done,
+            total=self.total,
+            rate=self.rate,
+            speed=self.chars / self.elapsed / 1000,
+            eta="-" if eta is None else sec2str(eta),
+        )
+
+
+def download_legado_chapters(
+    server: LegadoServer,
+    count: int | None = None,
+    start: int = -1,
+    workers: int | None = None,
+    on_progress: Callable[[LegadoDownloadProgress], None] | None = None,
+    should_stop: Callable[[], bool] | None = None,
+) -> LegadoDownloadProgress:
+    """并发下载从 start 开始的 count 个章节到本地缓存
+
+    已经缓存且标题一致的章节直接跳过，中断后再次执行即可续传。
+
+    Args:
+        server (LegadoServer): 已初始化的 Legado 阅读服务
+        count (int | None, optional): 下载的章节数，None 时读取配置. Defaults to None.
+        start (int, optional): 起始章节，小于 0 时从当前章节开始. Defaults to -1.
+        workers (int | None, optional): 同时下载的章节数，None 时读取配置. Defaults to None.
+        on_progress (Callable[[LegadoDownloadProgress], None] | None, optional):
+            每处理完一章调用一次，在下载线程中执行. Defaults to None.
+        should_stop (Callable[[], bool] | None, optional): 返回 True 时停止下载. Defaults to None.
+
+    Returns:
+        LegadoDownloadProgress: 最终进度
+    """
+    if count is None or workers is None:
+        cfg = get_legado_sync_config()
+        count = cfg["download_chapters"] if count is None else count
+        workers = cfg["download_workers"] if workers is None else workers
+    if start < 0:
+        start = server.get_chap_n()
+    chap_ns = list(range(start, min(start + max(0, count), len(server.chap_names))))
+
+    progress = LegadoDownloadProgress(total=len(chap_ns))
+    lock = threading.Lock()
+
+    def _stopped() -> bool:
+        return should_stop is not None and should_stop()
+
+    def _download(chap_n: int) -> None:
+        if _stopped():
+            return
+        if server.is_chap_txt_downloaded(chap_n):
+            with lock:
+                progress.skipped += 1
+                progress.done += 1
+            return
+        try:
+            chap_txt = server.get_chap_txt(chap_n)
+        except (OSError, ValueError, KeyError, RequestException) as exc:
+            get_logger().warning("Download chapter %s failed: %s", chap_n, exc)
+            with lock:
+                progress.failed += 1
+                progress.done += 1
+            return
+        with lock:
+            progress.chars += len(chap_txt)
+            progress.done += 1
+
+    pool = ThreadPoolExecutor(max_workers=max(1, workers),
+                              thread_name_prefix="heartale-download")
+    try:
+        futures = [pool.submit(_download, chap_n) for chap_n in chap_ns]
+        for future in as_completed(futures):
+            future.result()
+            if _stopped():
+                progress.stopped = True
+                break
+            if on_progress is not None:
+                on_progress(progress)
+    finally:
+        # 停止或中断（如 Ctrl+C）时丢弃排队中的章节，只等待正在下载的几章
+        pool.shutdown(wait=True, cancel_futures=True)
+    return progress
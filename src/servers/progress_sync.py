@@ -0,0 +1,157 @@
+"""在后台合并并同步阅读进度。"""
+
+import atexit
+import threading
+import time
+from collections.abc import Callable
+
+from ..utils.debug import get_logger
+
+# 同一章节内两次同步的最小间隔，秒
+PROGRESS_SYNC_INTERVAL = 5.0
+# 同步失败后的重试间隔，秒；每次失败翻倍直到上限
+PROGRESS_SYNC_RETRY_MIN = 2.0
+PROGRESS_SYNC_RETRY_MAX = 60.0
+# 停止或退出时等待最后一次同步的时间，秒
+PROGRESS_SYNC_STOP_TIMEOUT = 3.0
+
+_active_syncs: set["ProgressSync"] = set()
+_active_syncs_lock = threading.Lock()
+
+
+class ProgressSync:
+    """只保留最新的阅读进度，由后台线程按间隔发送
+
+    - 同一章节内的多次更新在间隔内合并为一次发送
+    - 章节变化时立即发送
+    - 发送失败时保留进度并退避重试，新的进度会覆盖旧的
+    """
+
+    def __init__(
+        self,
+        send: Callable[[int, int, str], None],
+        interval: float = PROGRESS_SYNC_INTERVAL,
+        name: str = "progress-sync",
+    ):
+        """初始化进度同步器
+
+        Args:
+            send (Callable[[int, int, str], None]): 实际发送进度的函数，
+                参数为 (章节索引, 章节内位置, 章节标题)，失败时抛出异常
+            interval (float, optional): 同一章节内的同步间隔. Defaults to PROGRESS_SYNC_INTERVAL.
+            name (str, optional): 后台线程名. Defaults to "progress-sync".
+        """
+        self._send = send
+        self.interval = max(0.0, float(interval))
+        self._cond = threading.Condition()
+        self._pending: tuple[int, int, str] | None = None
+        self._sent: tuple[int, int, str] | None = None
+        self._flush_now = False
+        self._stopping = False
+        self._idle = threading.Event()
+        self._idle.set()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        with _active_syncs_lock:
+            _active_syncs.add(self)
+
+    def submit(self, chap_n: int, chap_txt_pos: int, chap_title: str) -> None:
+        """提交最新进度，立即返回
+
+        Args:
+            chap_n (int): 章节索引
+            chap_txt_pos (int): 章节内字符位置
+            chap_title (str): 章节标题
+        """
+        progress = (chap_n, chap_txt_pos, chap_title)
+        with self._cond:
+            if self._stopping or progress == (self._pending or self._sent):
+                return
+            last = self._pending or self._sent
+            self._pending = progress
+            self._idle.clear()
+            if last is None or last[0] != chap_n:
+                self._flush_now = True
+            self._cond.notify()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """立即发送尚未同步的进度
+
+        Args:
+            timeout (float | None, optional): 等待发送完成的秒数，None 表示不等待. Defaults to None.
+
+        Returns:
+            bool: 等待结束时是否已经没有待同步的进度
+        """
+        with self._cond:
+            self._flush_now = True
+            self._cond.notify()
+        if timeout is None:
+            return self._idle.is_set()
+        return self._idle.wait(timeout)
+
+    def stop(self, timeout: float = PROGRESS_SYNC_STOP_TIMEOUT) -> None:
+        """发送最后的进度并停止后台线程
+
+        Args:
+            timeout (float, optional): 最多等待的秒数. Defaults to PROGRESS_SYNC_STOP_TIMEOUT.
+        """
+        with self._cond:
+            self._stopping = True
+            self._flush_now = True
+            self._cond.notify()
+        self._thread.join(timeout)
+        with _active_syncs_lock:
+            _active_syncs.discard(self)
+
+    def _run(self) -> None:
+        retry_delay = PROGRESS_SYNC_RETRY_MIN
+        # 同步间隔或失败退避期间不发送
+        not_before = 0.0
+        in_backoff = False
+        while True:
+            with self._cond:
+                while True:
+                    if self._pending is None:
+                        self._idle.set()
+                        if self._stopping:
+                            return
+                        self._cond.wait()
+                        continue
+                    wait = not_before - time.monotonic()
+                    if self._stopping or wait <= 0 or (self._flush_now and not in_backoff):
+                        break
+                    self._cond.wait(wait)
+                progress = self._pending
+                self._flush_now = False
+
+            try:
+                self._send(*progress)
+            except Exception as exc:  # pylint: disable=broad-except
+                get_logger().warning("Failed to sync reading progress: %s", exc)
+                with self._cond:
+                    if self._stopping:
+                        # 退出时不再重试，避免阻塞关闭
+                        self._pending = None
+                        continue
+                not_before = time.monotonic() + retry_delay
+                retry_delay = min(retry_delay * 2, PROGRESS_SYNC_RETRY_MAX)
+                in_backoff = True
+                continue
+
+            retry_delay = PROGRESS_SYNC_RETRY_MIN
+            not_before = time.monotonic() + self.interval
+            in_backoff = False
+            with self._cond:
+                self._sent = progress
+                if self._pending == progress:
+                    self._pending = None
+
+
+@atexit.register
+def _stop_active_syncs() -> None:
+    """进程退出前尽量把各同步器中的最新进度发出去"""
+    with _active_syncs_lock:
+        syncs = list(_active_syncs)
+    for sync in syncs:
+        sync.stop()
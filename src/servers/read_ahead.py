@@ -0,0 +1,127 @@
+"""章节正文预读调度。"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from requests import RequestException
+
+from ..entity import LibraryDB
+from ..utils.debug import get_logger
+
+READ_AHEAD_CONFIG_KEY = "read_ahead"
+# ahead: 向后预读的章节数；behind: 向前保留的章节数
+READ_AHEAD_DEFAULT_CONFIG = {"ahead": 2, "behind": 1}
+# 所有阅读服务共用的预读线程数
+READ_AHEAD_WORKERS = 2
+
+_pool: ThreadPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def get_read_ahead_config() -> dict:
+    """读取章节预读配置。"""
+    db = LibraryDB()
+    cfg = db.get_config(READ_AHEAD_CONFIG_KEY, READ_AHEAD_DEFAULT_CONFIG)
+    db.close()
+
+    if not isinstance(cfg, dict):
+        cfg = {}
+    merged = dict(READ_AHEAD_DEFAULT_CONFIG)
+    merged.update(cfg)
+    for key, default in READ_AHEAD_DEFAULT_CONFIG.items():
+        try:
+            merged[key] = max(0, int(merged.get(key, default)))
+        except (TypeError, ValueError):
+            merged[key] = default
+    return merged
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    """获取进程内共享的预读线程池，首次使用时创建"""
+    global _pool  # pylint: disable=global-statement
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=READ_AHEAD_WORKERS,
+                thread_name_prefix="heartale-read-ahead",
+            )
+        return _pool
+
+
+class ChapReadAhead:
+    """围绕当前章节预读前后若干章，重复的请求合并，跳章后取消过期请求"""
+
+    def __init__(self, server, ahead: int | None = None, behind: int | None = None):
+        """初始化预读调度器
+
+        Args:
+            server (Server): 阅读服务实例
+            ahead (int | None, optional): 向后预读章节数，None 时读取配置. Defaults to None.
+            behind (int | None, optional): 向前预读章节数，None 时读取配置. Defaults to None.
+        """
+        if ahead is None or behind is None:
+            cfg = get_read_ahead_config()
+            ahead = cfg["ahead"] if ahead is None else ahead
+            behind = cfg["behind"] if behind is None else behind
+        self.ahead = max(0, int(ahead))
+        self.behind = max(0, int(behind))
+        self._server = server
+        self._lock = threading.Lock()
+        self._futures: dict[int, Future] = {}
+        self._closed = False
+
+    def get_wanted_chap_ns(self, chap_n: int) -> list[int]:
+        """按优先级列出需要预读的章节
+
+        Args:
+            chap_n (int): 当前章节索引
+
+        Returns:
+            list[int]: 章节索引，越靠前越先获取
+        """
+        chap_all = len(self._server.chap_names)
+        wanted = [chap_n + i for i in range(1, self.ahead + 1)]
+        wanted += [chap_n - i for i in range(1, self.behind + 1)]
+        return [n for n in wanted if 0 <= n < chap_all]
+
+    def schedule(self, chap_n: int) -> None:
+        """以 chap_n 为当前章节重新安排预读
+
+        Args:
+            chap_n (int): 当前章节索引
+        """
+        wanted = self.get_wanted_chap_ns(chap_n)
+        with self._lock:
+            if self._closed:
+                return
+            for n, future in list(self._futures.items()):
+                # 已经开始的请求无法取消，完成后会自行移除
+                if n not in wanted and future.cancel():
+                    self._futures.pop(n, None)
+            for n in wanted:
+                if n in self._futures or self._server.has_chap_txt_cached(n):
+                    continue
+                future = _get_pool().submit(self._fetch, n)
+                self._futures[n] = future
+
+    def cancel(self) -> None:
+        """取消全部尚未开始的预读，并停止接受新请求"""
+        with self._lock:
+            self._closed = True
+            for future in self._futures.values():
+                future.cancel()
+            self._futures.clear()
+
+    def _fetch(self, chap_n: int) -> None:
+        """在线程池中获取一章正文
+
+        Args:
+            chap_n (int): 章节索引
+        """
+        try:
+            self._server.prefetch_chap_txt(chap_n)
+        except (OSError, RuntimeError, ValueError, RequestException) as exc:
+            get_logger().warning("Read-ahead chapter %s failed: %s", chap_n, exc)
+        finally:
+            with self._lock:
+                self._futures.pop(chap_n, None)
@@ -1,17 +1,20 @@
 """阅读本地txt文件"""
 import hashlib
+import json
 import os
 import re
-import shutil
+from collections.abc import Iterable, Iterator
 from gettext import gettext as _
 from pathlib import Path
 
 from .. import PATH_CONFIG_BOOKS
 from ..entity import LibraryDB
 from ..entity.book import Book
-from ..utils.debug import get_logger
+from ..entity.txt_index import TxtChapIndex
 from ..utils.i18n import is_english_language
 from . import Server
+from .txt_encoding import detect_encoding, detect_encoding_bytes
+from .txt_file import TxtLineSplitter, TxtMmapReader
 
 
 class TxtServer(Server):
@@ -24,13 +27,15 @@ class TxtServer(Server):
             conf (dict): 配置 conf["legado"]
         """
         self.chap_p2s = []
+        # 章节在文件中的字节偏移，与 chap_p2s 一一对应
+        self.chap_bps = []
         super().__init__("txt")
 
     def initialize(self, book: Book):
         """异步初始化"""
         self.book = book
 
-        self.chap_names, self.chap_p2s = self._get_chap_names()
+        self.chap_names, self.chap_p2s, self.chap_bps = self._get_chap_names()
         self.bd.update_chap_txts(
             self.load_chap_txt(self.book.chap_n),
             self.book.chap_txt_pos
@@ -72,6 +77,10 @@ class TxtServer(Server):
         if chap_n < 0:
             return super().get_chap_txt(chap_n)
 
+        if len(self.chap_bps) == len(self.chap_p2s):
+            return self._strip_leading_chap_name(self._read_chap_mmap(chap_n), chap_n)
+
+        # 没有字节偏移时回退到整本解码
         with open(self.book.path, "r", encoding=self.book.encoding, errors="ignore") as f:
             if chap_n + 1 == len(self.chap_p2s):
                 chap_txt = f.read()[self.chap_p2s[chap_n]:]
@@ -81,20 +90,33 @@ class TxtServer(Server):
 
         return self._strip_leading_chap_name(chap_txt, chap_n)
 
+    def _read_chap_mmap(self, chap_n: int) -> str:
+        """按字节偏移只解码指定章节。
+
+        Args:
+            chap_n (int): 章节索引
+
+        Returns:
+            str: 章节原始正文（换行已统一为 \\n）
+        """
+        end = None
+        if chap_n + 1 < len(self.chap_bps):
+            end = self.chap_bps[chap_n + 1]
+        with TxtMmapReader(self.book.path, self.book.encoding) as reader:
+            return reader.read_range(self.chap_bps[chap_n], end)
+
     def _get_chap_names(self):
         """获取 txt 书籍的章节目录。
 
         Returns:
-            tuple[list[str], list[int]]: 章节标题和对应偏移位置
+            tuple[list[str], list[int], list[int]]: 章节标题、字符偏移和字节偏移
         """
         if not os.path.isfile(self.book.path):
             raise FileNotFoundError(
                 _("File not found: {path}").format(path=self.book.get_path()))
 
-        with open(self.book.path, "r", encoding=self.book.encoding, errors="ignore") as f:
-            text = f.read()
-        rules = get_txt_parse_rules_for_book(self.book)
-        return parse_chap_names_with_rules(text, rules)
+        idx = load_txt_chap_index(self.book)
+        return idx.chap_names, idx.chap_ps, idx.chap_bps
 
     def _strip_leading_chap_name(self, chap_txt: str, chap_n: int) -> str:
         """去掉章节正文开头与目录重复的标题行。
@@ -170,6 +192,10 @@ class TxtServer(Server):
 
 
 TXT_PARSE_CONFIG_KEY = "txt_parse"
+# 章节索引格式版本，解析结果的含义变化时递增以废弃旧索引
+TXT_CHAP_INDEX_VERSION = 2
+# 流式导入时每次读取的字节数
+TXT_IMPORT_CHUNK_SIZE = 1 << 20
 TXT_PARSE_RULES = [
     {
         "volume_pattern": r'第([一二三四五六七八九十\d]+)卷\s*(.*)',
@@ -311,6 +337,77 @@ def get_txt_parse_rules_for_book(book: Book) -> list[dict[str, str]]:
     return [book_primary, *global_rules]
 
 
+def build_txt_parse_rules_hash(rules: list[dict[str, str]], encoding: str) -> str:
+    """计算生效解析规则的摘要，用于判断章节索引是否过期。
+
+    Args:
+        rules (list[dict[str, str]]): 章节解析规则列表（按优先级顺序）
+        encoding (str): 书籍编码
+
+    Returns:
+        str: 解析规则摘要
+    """
+    payload = json.dumps(
+        {
+            "version": TXT_CHAP_INDEX_VERSION,
+            "encoding": encoding,
+            "rules": rules,
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def load_txt_chap_index(
+    book: Book,
+    rules: list[dict[str, str]] | None = None,
+) -> TxtChapIndex:
+    """读取 txt 书籍的章节目录索引，文件或解析规则变化时重新解析。
+
+    索引以书籍 md5 为键，并记录文件大小、修改时间和解析规则摘要，
+    三者任一变化都会触发重建。
+
+    Args:
+        book (Book): 书籍对象
+        rules (list[dict[str, str]] | None, optional): 章节解析规则列表，
+            为 None 时使用该书生效的规则. Defaults to None.
+
+    Returns:
+        TxtChapIndex: 与当前文件和规则一致的章节目录索引
+    """
+    if rules is None:
+        rules = get_txt_parse_rules_for_book(book)
+    st = Path(book.path).stat()
+    rules_hash = build_txt_parse_rules_hash(rules, book.encoding)
+
+    db = LibraryDB()
+    idx = db.get_txt_chap_index(book.md5)
+    db.close()
+    if idx is not None and idx.is_valid_for(st.st_size, st.st_mtime_ns, rules_hash):
+        return idx
+
+    with TxtMmapReader(book.path, book.encoding) as reader:
+        chap_names, chap_ps, chap_bps = _parse_chap_index_with_rules(
+            reader.iter_lines(),
+            rules,
+        )
+
+    idx = TxtChapIndex(
+        md5=book.md5,
+        file_size=st.st_size,
+        file_mtime=st.st_mtime_ns,
+        rules_hash=rules_hash,
+        chap_names=chap_names,
+        chap_ps=chap_ps,
+        chap_bps=chap_bps,
+    )
+    db = LibraryDB()
+    db.save_txt_chap_index(idx)
+    db.close()
+    return idx
+
+
 def set_txt_parse_config(**kwargs) -> dict:
     """保存 txt 章节解析配置。
 
@@ -406,57 +503,176 @@ def parse_chap_names_with_rules(
     Returns:
         tuple[list[str], list[int]]: 章节标题和对应偏移位置
     """
-    expanded_rules = _expand_parse_rules_for_match(rules)
-    for rule in expanded_rules:
-        chap_names, chap_ps = _parse_chap_names_once(
-            file_content,
-            rule["volume_pattern"],
-            rule["chapter_pattern"],
-        )
-        if chap_names:
-            return chap_names, chap_ps
-    return [], []
+    chap_names, chap_ps, _chap_bps = _parse_chap_index_with_rules(
+        _iter_str_lines(file_content),
+        rules,
+    )
+    return chap_names, chap_ps
 
 
-def _parse_chap_names_once(
-    file_content: str,
-    volume_pattern: str,
-    chapter_pattern: str,
-) -> tuple[list[str], list[int]]:
-    """使用一组正则解析一次章节目录。
+def _parse_chap_index_with_rules(
+    lines: Iterable[tuple[str, int, int]],
+    rules: list[dict[str, str]],
+) -> tuple[list[str], list[int], list[int]]:
+    """一次遍历解析章节目录，同时记录字符与字节偏移。
 
     Args:
-        file_content (str): txt 全文内容
-        volume_pattern (str): 卷标题正则
-        chapter_pattern (str): 章节标题正则
+        lines (Iterable[tuple[str, int, int]]): (行文本, 含换行的字符数, 含换行的字节数)
+        rules (list[dict[str, str]]): 章节解析规则列表（按优先级顺序）
 
     Returns:
-        tuple[list[str], list[int]]: 章节标题和对应偏移位置
+        tuple[list[str], list[int], list[int]]: 章节标题、字符偏移和字节偏移
     """
-    current_volume = None
-    chap_names = []
-    chap_ps = []
+    scanner = TxtChapScanner(rules)
+    scanner.feed_lines(lines)
+    return scanner.result()
 
-    words = 0
-    for line in file_content.split("\n"):
-        volume_match = re.search(volume_pattern, line)
+
+class TxtChapScanner:
+    """预编译全部规则，一次遍历同时按每条规则解析章节目录。
+
+    每条规则（含自动补充的 ^ 版本）各自保存解析结果，
+    最终按规则优先级选出第一条解析出章节的结果，与逐条重试的结果一致。
+    """
+
+    def __init__(self, rules: list[dict[str, str]]):
+        """初始化扫描器
+
+        Args:
+            rules (list[dict[str, str]]): 章节解析规则列表（按优先级顺序）
+        """
+        # 按优先级排列的全部规则：(卷正则, 章节正则)
+        patterns = []
+        # 不带 ^ 的规则下标 -> 依赖它的 ^ 版本规则下标
+        dependents = {}
+        seen = {}
+        for rule in rules:
+            base_key = (rule["volume_pattern"], rule["chapter_pattern"])
+            for candidate in (rule, _with_line_start_anchor(rule)):
+                key = (candidate["volume_pattern"],
+                       candidate["chapter_pattern"])
+                if key in seen:
+                    continue
+                try:
+                    compiled = (
+                        re.compile(candidate["volume_pattern"]),
+                        re.compile(candidate["chapter_pattern"]),
+                    )
+                except re.error:
+                    # 原规则本身无效时照常报错，只跳过无法编译的 ^ 版本
+                    if key == base_key:
+                        raise
+                    continue
+                seen[key] = len(patterns)
+                if key != base_key:
+                    dependents.setdefault(seen[base_key], []).append(seen[key])
+                patterns.append(compiled)
+
+        dependent_ids = {i for ids in dependents.values() for i in ids}
+        # 每行只直接执行不依赖其他规则的正则：(规则下标, 卷正则, 章节正则, ^ 版本列表)
+        self._groups = [
+            (i, volume_re, chapter_re, [
+                (j, *patterns[j]) for j in dependents.get(i, [])
+            ])
+            for i, (volume_re, chapter_re) in enumerate(patterns)
+            if i not in dependent_ids
+        ]
+        self._volumes = [None] * len(patterns)
+        self._results = [([], [], []) for _ in patterns]
+        # 当前行的字符偏移和字节偏移
+        self.words = 0
+        self.pos = 0
+
+    def feed(self, line: str, n_chars: int, n_bytes: int) -> None:
+        """处理一行文本
+
+        带 ^ 的规则能匹配时，不带 ^ 的原规则必然也能匹配，
+        因此只在原规则命中的行上再执行其 ^ 版本。
+
+        Args:
+            line (str): 行文本，不含换行
+            n_chars (int): 含换行的字符数
+            n_bytes (int): 含换行的字节数
+        """
+        for i, volume_re, chapter_re, anchored in self._groups:
+            if not self._match_line(i, volume_re, chapter_re, line):
+                continue
+            for j, anchored_volume_re, anchored_chapter_re in anchored:
+                self._match_line(j, anchored_volume_re, anchored_chapter_re, line)
+        self.words += n_chars
+        self.pos += n_bytes
+
+    def _match_line(
+        self,
+        i: int,
+        volume_re: re.Pattern,
+        chapter_re: re.Pattern,
+        line: str,
+    ) -> bool:
+        """按第 i 条规则匹配一行，并更新该规则的解析结果
+
+        Args:
+            i (int): 规则下标
+            volume_re (re.Pattern): 卷标题正则
+            chapter_re (re.Pattern): 章节标题正则
+            line (str): 行文本
+
+        Returns:
+            bool: 是否命中卷标题或章节标题
+        """
+        volume_match = volume_re.search(line)
         if volume_match:
-            current_volume = volume_match.group()
-            words += len(line + "\n")
-            continue
-
-        chapter_match = re.search(chapter_pattern, line)
-        if chapter_match:
-            current_chapter = chapter_match.group()
-            if current_volume:
-                chap_names.append(f"{current_volume} {current_chapter}")
-                current_volume = None
-            else:
-                chap_names.append(current_chapter)
-            chap_ps.append(words)
-        words += len(line + "\n")
+            self._volumes[i] = volume_match.group()
+            return True
+
+        chapter_match = chapter_re.search(line)
+        if not chapter_match:
+            return False
+
+        chap_names, chap_ps, chap_bps = self._results[i]
+        current_chapter = chapter_match.group()
+        if self._volumes[i]:
+            chap_names.append(f"{self._volumes[i]} {current_chapter}")
+            self._volumes[i] = None
+        else:
+            chap_names.append(current_chapter)
+        chap_ps.append(self.words)
+        chap_bps.append(self.pos)
+        return True
+
+    def feed_lines(self, lines: Iterable[tuple[str, int, int]]) -> None:
+        """依次处理多行文本
 
-    return chap_names, chap_ps
+        Args:
+            lines (Iterable[tuple[str, int, int]]): (行文本, 含换行的字符数, 含换行的字节数)
+        """
+        feed = self.feed
+        for line, n_chars, n_bytes in lines:
+            feed(line, n_chars, n_bytes)
+
+    def result(self) -> tuple[list[str], list[int], list[int]]:
+        """按规则优先级返回第一条解析出章节的结果
+
+        Returns:
+            tuple[list[str], list[int], list[int]]: 章节标题、字符偏移和字节偏移
+        """
+        for chap_names, chap_ps, chap_bps in self._results:
+            if chap_names:
+                return chap_names, chap_ps, chap_bps
+        return [], [], []
+
+
+def _iter_str_lines(file_content: str) -> Iterator[tuple[str, int, int]]:
+    """按行遍历已解码的全文，字节数未知时记为 0。
+
+    Args:
+        file_content (str): txt 全文内容
+
+    Yields:
+        Iterator[tuple[str, int, int]]: (行文本, 含换行的字符数, 0)
+    """
+    for line in file_content.split("\n"):
+        yield line, len(line) + 1, 0
 
 
 def _build_parse_rule(
@@ -487,31 +703,8 @@ def _build_parse_rule(
     }
 
 
-def _expand_parse_rules_for_match(
-    rules: list[dict[str, str]],
-) -> list[dict[str, str]]:
-    """扩展章节解析规则列表，自动补充带 ^ 的重试版本。
-
-    Args:
-        rules (list[dict[str, str]]): 基础章节解析规则列表
-
-    Returns:
-        list[dict[str, str]]: 实际用于匹配的章节解析规则列表
-    """
-    expanded_rules = []
-    seen = set()
-    for rule in rules:
-        candidates = [rule, _with_line_start_anchor(rule)]
-        for candidate in candidates:
-            key = (
-                candidate["volume_pattern"],
-                candidate["chapter_pattern"],
-            )
-            if key in seen:
-                continue
-            seen.add(key)
-            expanded_rules.append(candidate)
-    return expanded_rules
+# 正则开头的全局标志，如 (?i)、(?ms)，必须位于表达式最前
+_INLINE_FLAGS_RE = re.compile(r"(?:\(\?[aiLmsux]+\))+")
 
 
 def _with_line_start_anchor(rule: dict[str, str]) -> dict[str, str]:
@@ -536,12 +729,14 @@ def _ensure_line_start_anchor(pattern: str) -> str:
         pattern (str): 原始正则
 
     Returns:
-        str: 带行首锚点的正则
+        str: 带行首锚点的正则，开头的 (?i) 等全局标志保持在最前
     """
-    stripped = pattern.lstrip()
-    if stripped.startswith("^"):
+    flags = _INLINE_FLAGS_RE.match(pattern)
+    prefix = flags.group(0) if flags else ""
+    rest = pattern[len(prefix):]
+    if rest.lstrip().startswith("^"):
         return pattern
-    return f"^{pattern}"
+    return f"{prefix}^{rest}"
 
 
 def cal_md5(path: Path, chunk_size: int = 8192) -> str:
@@ -561,37 +756,105 @@ def cal_md5(path: Path, chunk_size: int = 8192) -> str:
     return h.hexdigest()
 
 
-def detect_encoding(path: Path, sample_size: int = 65536) -> str:
-    """探测编码
+def get_cached_txt_encoding(md5: str) -> str | None:
+    """读取之前导入同一文件时确定的编码
 
     Args:
-        path (Path): _description_
-        sample_size (int, optional): _description_. Defaults to 65536.
+        md5 (str): 文件 md5
+
+    Returns:
+        str | None: 编码，没有缓存时返回 None
+    """
+    db = LibraryDB()
+    enc = db.get_txt_encoding(md5)
+    db.close()
+    return enc
+
+
+def import_txt_stream(
+    src_path: Path,
+    dest: Path,
+    rules: list[dict[str, str]],
+    chunk_size: int = TXT_IMPORT_CHUNK_SIZE,
+    cached_encodings: dict[str, str] | None = None,
+) -> tuple[str, str, int, TxtChapIndex]:
+    """只读一遍源文件，同时完成 md5、编码探测、字数统计、章节解析和复制
+
+    先写入 dest 旁的临时文件，解析出章节后才替换为 dest，
+    内存占用只与分块大小有关，与文件大小无关。
+
+    Args:
+        src_path (Path): 源文件
+        dest (Path): 复制到的目标文件
+        rules (list[dict[str, str]]): 章节解析规则列表（按优先级顺序）
+        chunk_size (int, optional): 每次读取的字节数. Defaults to TXT_IMPORT_CHUNK_SIZE.
+        cached_encodings (dict[str, str] | None, optional): 事先读好的编码缓存，
+            md5 -> 编码，给定时不再打开数据库. Defaults to None.
 
     Raises:
-        ValueError: _description_
+        ValueError: 没有解析出章节
 
     Returns:
-        str: _description_
+        tuple[str, str, int, TxtChapIndex]: 编码、md5、总字数和目标文件的章节目录索引
     """
-    print(f"Detected file encoding: {path}")
-    encodings = ["gbk", "gb2312", "utf-8-sig", "utf-8"]
-    raw = path.open("rb").read(sample_size)
-    for enc in encodings:
-        try:
-            raw.decode(enc)
-            return enc
-        except UnicodeDecodeError as e:
-            get_logger().error("尝试用 %s 解码失败: %s", enc, e)
-
-            continue
-    return "utf-8"
-    # raise ValueError(f"Unable to recognize file encoding: {path}")
+    # 同名文件可能被多个进程同时导入，临时文件名带上进程号
+    tmp = dest.with_name(f"{dest.name}.{os.getpid()}.part")
+    h = hashlib.md5()
+    try:
+        with src_path.open("rb") as src, tmp.open("wb") as out:
+            chunk = src.read(chunk_size)
+            # 先按首块探测编码，读完后再用缓存或全文采样校正
+            enc = detect_encoding_bytes(chunk)
+            splitter = TxtLineSplitter(enc)
+            scanner = TxtChapScanner(rules)
+            while chunk:
+                h.update(chunk)
+                out.write(chunk)
+                scanner.feed_lines(splitter.feed(chunk))
+                chunk = src.read(chunk_size)
+            scanner.feed_lines(splitter.flush())
+
+        md5 = h.hexdigest()
+        if cached_encodings is None:
+            new_enc = get_cached_txt_encoding(md5)
+        else:
+            new_enc = cached_encodings.get(md5)
+        if new_enc is None and splitter.errors:
+            # 后文与首块的编码不一致，按整个文件重新探测一次
+            new_enc = detect_encoding(tmp)
+        if new_enc is not None and new_enc != enc:
+            enc = new_enc
+            scanner = TxtChapScanner(rules)
+            with TxtMmapReader(tmp, enc) as reader:
+                scanner.feed_lines(reader.iter_lines())
+
+        chap_names, chap_ps, chap_bps = scanner.result()
+        if not chap_names:
+            raise ValueError(
+                _("No chapters detected. Please check the parsing rules in Preferences."))
+        os.replace(tmp, dest)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+    st = dest.stat()
+    idx = TxtChapIndex(
+        md5=md5,
+        file_size=st.st_size,
+        file_mtime=st.st_mtime_ns,
+        rules_hash=build_txt_parse_rules_hash(rules, enc),
+        chap_names=chap_names,
+        chap_ps=chap_ps,
+        chap_bps=chap_bps,
+    )
+    return enc, md5, scanner.words, idx
 
 
 def path2book(src: str, cfg_dir: Path = PATH_CONFIG_BOOKS) -> Book:
     """根据路径初始化
 
+    源文件只读取一遍，章节目录索引同时写入数据库，首次打开时无需再解析。
+
     Args:
         src (str): _description_
         cfg_dir (Path, optional): _description_. Defaults to None.
@@ -599,26 +862,49 @@ def path2book(src: str, cfg_dir: Path = PATH_CONFIG_BOOKS) -> Book:
     Returns:
         Book: _description_
     """
+    book, idx = import_txt_book(src, cfg_dir, get_txt_parse_rules())
+
+    db = LibraryDB()
+    db.save_txt_chap_index(idx)
+    db.save_txt_encoding(book.md5, book.encoding)
+    db.close()
+    return book
+
+
+def import_txt_book(
+    src: str,
+    cfg_dir: Path,
+    rules: list[dict[str, str]],
+    cached_encodings: dict[str, str] | None = None,
+) -> tuple[Book, TxtChapIndex]:
+    """导入一本 txt 书籍，但不写数据库；给定 cached_encodings 时也不读数据库，
+    可以在子进程中执行
+
+    Args:
+        src (str): 源文件路径
+        cfg_dir (Path): 书籍复制到的目录
+        rules (list[dict[str, str]]): 章节解析规则列表（按优先级顺序）
+        cached_encodings (dict[str, str] | None, optional): 事先读好的编码缓存，
+            None 时按 md5 查询数据库. Defaults to None.
+
+    Raises:
+        FileNotFoundError: 文件不存在
+        ValueError: 文件类型不支持或没有解析出章节
+
+    Returns:
+        tuple[Book, TxtChapIndex]: 书籍和它的章节目录索引
+    """
     src_path = Path(src)
     if not src_path.is_file():
         raise FileNotFoundError(f"File not found: {src}")
     if src_path.suffix.lower() not in [".txt"]:
         raise ValueError(_("Unsupported file type: {suffix}")
                          .format(suffix=src_path.suffix))
-    enc = detect_encoding(src_path)
-
-    with open(src, "r", encoding=enc, errors="ignore") as file:
-        f_txt = file.read()
 
-    chap_names, _chap_ps = parse_chap_names(f_txt, **get_txt_parse_rules()[0])
-    chap_all = len(chap_names)
-
-    dest = cfg_dir / src_path.name
-    shutil.copy(src_path, dest)
-
-    if chap_all == 0:
-        raise ValueError(
-            _("No chapters detected. Please check the parsing rules in Preferences."))
+    dest = Path(cfg_dir) / src_path.name
+    enc, md5, txt_all, idx = import_txt_stream(
+        src_path, dest, rules, cached_encodings=cached_encodings)
 
-    return Book(str(dest), dest.stem, "", 0, chap_names[0],
-                chap_all, 0, 0, len(f_txt), enc, cal_md5(dest))
+    book = Book(str(dest), dest.stem, "", 0, idx.chap_names[0],
+                len(idx.chap_names), 0, 0, txt_all, enc, md5)
+    return book, idx
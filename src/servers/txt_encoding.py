@@ -0,0 +1,139 @@
+"""探测本地 txt 文件编码"""
+import codecs
+import os
+from gettext import gettext as _
+from pathlib import Path
+
+# 每个采样位置读取的字节数
+TXT_ENCODING_SAMPLE_SIZE = 65536
+# 双字节字符中尾字节落在 0x40-0x7E 的比例超过该值时判为 Big5：
+# Big5 常用字约四成尾字节在此区间，GBK 只有少见的扩展字会落在这里
+BIG5_LOW_TRAIL_RATIO = 0.1
+
+_UTF16_BOMS = (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)
+
+
+def detect_encoding(path: Path, sample_size: int = TXT_ENCODING_SAMPLE_SIZE) -> str:
+    """探测编码，只读取文件开头、中间和结尾三段样本
+
+    Args:
+        path (Path): 文件路径
+        sample_size (int, optional): 每段样本的字节数. Defaults to TXT_ENCODING_SAMPLE_SIZE.
+
+    Raises:
+        ValueError: 文件是不支持的 UTF-16 编码
+
+    Returns:
+        str: 编码
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        head = f.read(sample_size)
+        if size <= sample_size * 3:
+            return detect_encoding_bytes(head + f.read())
+
+        samples = [head]
+        for offset in (size // 2, size - sample_size):
+            f.seek(offset)
+            samples.append(_align_sample(f.read(sample_size)))
+    return detect_encoding_bytes(*samples)
+
+
+def detect_encoding_bytes(head: bytes, *samples: bytes) -> str:
+    """根据若干段字节样本探测编码
+
+    样本可能在多字节字符中间截断：head 视为文件开头，
+    其余样本应已对齐到行首，末尾残缺的字符会被忽略。
+
+    Args:
+        head (bytes): 文件开头的样本
+        *samples (bytes): 文件其他位置的样本
+
+    Raises:
+        ValueError: 文件是不支持的 UTF-16 编码
+
+    Returns:
+        str: 编码
+    """
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if head.startswith(_UTF16_BOMS):
+        # 按字节切分行的逻辑不适用于 UTF-16
+        raise ValueError(_("Unsupported file encoding: {encoding}")
+                         .format(encoding="UTF-16"))
+
+    parts = [head, *samples]
+    if all(part.isascii() for part in parts):
+        return "utf-8"
+    if all(_is_utf8(part) for part in parts):
+        return "utf-8"
+    # 只统计完整的行，避免截断处残缺的字节影响判断
+    return _guess_cjk_double_byte(b"".join(
+        part[:max(part.rfind(b"\n"), part.rfind(b"\r")) + 1] or part
+        for part in parts))
+
+
+def _align_sample(raw: bytes) -> bytes:
+    """丢掉样本第一行的残余部分，使样本从行首开始
+
+    Args:
+        raw (bytes): 从文件中间读取的样本
+
+    Returns:
+        bytes: 对齐后的样本
+    """
+    ends = [i for i in (raw.find(b"\n"), raw.find(b"\r")) if i >= 0]
+    return raw[min(ends) + 1:] if ends else raw
+
+
+def _is_utf8(raw: bytes) -> bool:
+    """判断样本是否为合法 UTF-8，允许末尾的字符被截断
+
+    Args:
+        raw (bytes): 样本
+
+    Returns:
+        bool: 是否为 UTF-8
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        decoder.decode(raw, final=False)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def _guess_cjk_double_byte(raw: bytes) -> str:
+    """统计双字节字符的尾字节分布，区分 GB18030 与 Big5
+
+    Args:
+        raw (bytes): 非 UTF-8 的样本
+
+    Returns:
+        str: "gb18030" 或 "big5"
+    """
+    pairs = 0
+    low_trail = 0
+    i = 0
+    n = len(raw) - 1
+    while i < n:
+        lead = raw[i]
+        if lead < 0x81:
+            i += 1
+            continue
+        trail = raw[i + 1]
+        if 0x30 <= trail <= 0x39:
+            # GB18030 四字节序列，Big5 中不存在
+            return "gb18030"
+        pairs += 1
+        if 0x40 <= trail <= 0x7E:
+            low_trail += 1
+        i += 2
+
+    if pairs and low_trail / pairs > BIG5_LOW_TRAIL_RATIO:
+        try:
+            codecs.getincrementaldecoder("big5")().decode(raw, final=False)
+            return "big5"
+        except UnicodeDecodeError:
+            pass
+    return "gb18030"
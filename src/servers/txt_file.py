@@ -0,0 +1,241 @@
+"""以内存映射方式读取本地 txt 文件"""
+import mmap
+import re
+from collections.abc import Iterator
+from pathlib import Path
+
+# 行结束符只由 ASCII 字节组成，不会出现在 GBK/Big5/UTF-8 的多字节序列中，
+# 因此可以直接在原始字节上切分行
+RE_TXT_LINE_END = re.compile(rb"\r\n|\n|\r")
+# 扫描时每次解码的字节数，块总是在换行处截断
+TXT_SCAN_BLOCK_SIZE = 1 << 20
+
+
+class TxtMmapReader:
+    """只读映射整个 txt 文件，按需解码其中的片段
+
+    全文不会被读入内存，常驻内存只与当前访问的页面有关，与文件大小无关。
+    """
+
+    def __init__(self, path: Path | str, encoding: str):
+        """打开并映射文件
+
+        Args:
+            path (Path | str): 文件路径
+            encoding (str): 文件编码
+        """
+        self.path = Path(path)
+        self.encoding = encoding
+        self._file = open(self.path, "rb")  # pylint: disable=consider-using-with
+        self._size = self.path.stat().st_size
+        self._mm = None
+        if self._size > 0:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_args):
+        self.close()
+
+    def __len__(self):
+        return self._size
+
+    def close(self):
+        """解除映射并关闭文件"""
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def iter_lines(self) -> Iterator[tuple[str, int, int]]:
+        """顺序扫描映射的字节，按行分块解码
+
+        与文本模式读取一致：\\r\\n、\\r 都视为一个换行，解码错误直接忽略。
+
+        Yields:
+            Iterator[tuple[str, int, int]]: (行文本, 含换行的字符数, 含换行的字节数)
+        """
+        if self._mm is None:
+            return
+        if hasattr(self._mm, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+            self._mm.madvise(mmap.MADV_SEQUENTIAL)
+        yield from iter_bytes_lines(self._mm, self.encoding)
+
+    def count_chars(self) -> int:
+        """统计按文本模式解码后的字符总数
+
+        Returns:
+            int: 字符数
+        """
+        return sum(n_chars for _line, n_chars, _n_bytes in self.iter_lines())
+
+    def read_range(self, start: int, end: int | None = None) -> str:
+        """只解码 [start, end) 范围内的字节
+
+        Args:
+            start (int): 起始字节偏移
+            end (int | None, optional): 结束字节偏移，None 表示到文件末尾. Defaults to None.
+
+        Returns:
+            str: 解码后的文本（换行已统一为 \\n）
+        """
+        if self._mm is None:
+            return ""
+        return decode_txt_bytes(self._mm[start:end], self.encoding)
+
+
+def iter_bytes_lines(
+    data,
+    encoding: str,
+    block_size: int = TXT_SCAN_BLOCK_SIZE,
+) -> Iterator[tuple[str, int, int]]:
+    """按行遍历原始字节，以整行为边界分块解码
+
+    Args:
+        data (bytes | mmap.mmap): 文件原始字节
+        encoding (str): 文件编码
+        block_size (int, optional): 每次解码的字节数下限. Defaults to TXT_SCAN_BLOCK_SIZE.
+
+    Yields:
+        Iterator[tuple[str, int, int]]: (行文本, 含换行的字符数, 含换行的字节数)，
+            没有换行结尾的最后一行只计入实际字符数
+    """
+    size = len(data)
+    start = 0
+    while start < size:
+        end = min(start + block_size, size)
+        if end < size:
+            nl = data.find(b"\n", end - 1)
+            end = size if nl < 0 else nl + 1
+        yield from _iter_block_lines(data[start:end], encoding)
+        start = end
+
+
+class TxtLineSplitter:
+    """把任意切分的字节流整理成整行，边读边解码
+
+    用于只读一遍的流式导入：每次喂入一段原始字节，
+    只解码到最后一个完整行为止，剩余字节留到下一次。
+    """
+
+    def __init__(self, encoding: str):
+        """初始化
+
+        Args:
+            encoding (str): 文件编码
+        """
+        self.encoding = encoding
+        # 严格解码失败的块数，不为 0 说明编码可能判断错误
+        self.errors = 0
+        self._pending = b""
+
+    def feed(self, chunk: bytes) -> Iterator[tuple[str, int, int]]:
+        """喂入一段字节，返回其中已经完整的行
+
+        Args:
+            chunk (bytes): 新读入的字节
+
+        Yields:
+            Iterator[tuple[str, int, int]]: (行文本, 含换行的字符数, 含换行的字节数)
+        """
+        data = self._pending + chunk if self._pending else chunk
+        cut = data.rfind(b"\n") + 1
+        if cut == 0:
+            # 只用 \r 换行的文件；末尾的 \r 可能与下一段开头的 \n 组成一个换行
+            cut = data.rfind(b"\r", 0, len(data) - 1) + 1
+        self._pending = data[cut:]
+        if cut:
+            yield from self._iter_lines(data[:cut])
+
+    def flush(self) -> Iterator[tuple[str, int, int]]:
+        """输出流结束时剩余的最后一行
+
+        Yields:
+            Iterator[tuple[str, int, int]]: (行文本, 含换行的字符数, 含换行的字节数)
+        """
+        data, self._pending = self._pending, b""
+        if data:
+            yield from self._iter_lines(data)
+
+    def _iter_lines(self, raw: bytes) -> Iterator[tuple[str, int, int]]:
+        try:
+            text = raw.decode(self.encoding)
+        except UnicodeDecodeError:
+            self.errors += 1
+            text = raw.decode(self.encoding, errors="ignore")
+        yield from _iter_decoded_block_lines(raw, text, self.encoding)
+
+
+def _iter_block_lines(raw: bytes, encoding: str) -> Iterator[tuple[str, int, int]]:
+    """遍历一个以整行结尾（或位于文件末尾）的字节块
+
+    Args:
+        raw (bytes): 字节块
+        encoding (str): 文件编码
+
+    Yields:
+        Iterator[tuple[str, int, int]]: (行文本, 含换行的字符数, 含换行的字节数)
+    """
+    yield from _iter_decoded_block_lines(
+        raw, raw.decode(encoding, errors="ignore"), encoding)
+
+
+def _iter_decoded_block_lines(
+    raw: bytes,
+    text: str,
+    encoding: str,
+) -> Iterator[tuple[str, int, int]]:
+    """遍历已经整体解码过的字节块
+
+    Args:
+        raw (bytes): 字节块
+        text (str): raw 忽略错误解码后的文本
+        encoding (str): 文件编码
+
+    Yields:
+        Iterator[tuple[str, int, int]]: (行文本, 含换行的字符数, 含换行的字节数)
+    """
+    if b"\r" not in raw:
+        pieces = raw.split(b"\n")
+        lines = text.split("\n")
+        # 解码错误吞掉换行时行数对不上，退回逐行解码
+        if len(lines) == len(pieces):
+            last = len(pieces) - 1
+            for i, (line, piece) in enumerate(zip(lines, pieces)):
+                if i < last:
+                    yield line, len(line) + 1, len(piece) + 1
+                elif piece:
+                    yield line, len(line), len(piece)
+            return
+
+    start = 0
+    for m in RE_TXT_LINE_END.finditer(raw):
+        line = raw[start:m.start()].decode(encoding, errors="ignore")
+        yield line, len(line) + 1, m.end() - start
+        start = m.end()
+    if start < len(raw):
+        line = raw[start:].decode(encoding, errors="ignore")
+        yield line, len(line), len(raw) - start
+
+
+def decode_txt_bytes(raw: bytes, encoding: str) -> str:
+    """解码 txt 文件中的一段字节，换行统一为 \\n
+
+    字节偏移总是落在行首，不会切断 GBK/UTF-8 的多字节字符；
+    对 UTF-8 额外跳过开头残缺的续字节，避免旧索引错位时产生乱码。
+
+    Args:
+        raw (bytes): 原始字节
+        encoding (str): 文件编码
+
+    Returns:
+        str: 解码后的文本
+    """
+    if encoding.lower().replace("_", "-").startswith("utf-8"):
+        skip = 0
+        while skip < min(len(raw), 3) and 0x80 <= raw[skip] <= 0xBF:
+            skip += 1
+        raw = raw[skip:]
+    txt = raw.decode(encoding, errors="ignore")
+    return txt.replace("\r\n", "\n").replace("\r", "\n")
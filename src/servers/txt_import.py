@@ -0,0 +1,208 @@
+"""批量导入本地 txt 书籍"""
+import multiprocessing
+import os
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from gettext import gettext as _
+from pathlib import Path
+
+from .. import PATH_CONFIG_BOOKS
+from ..entity import LibraryDB
+from ..entity.book import Book
+from ..entity.txt_index import TxtChapIndex
+from ..utils.debug import get_logger
+from .txt import get_txt_parse_rules, import_txt_book
+
+TXT_IMPORT_CONFIG_KEY = "txt_import"
+# workers 为 0 表示按 CPU 核数自动选择
+TXT_IMPORT_DEFAULT_CONFIG = {"workers": 0}
+# 导入出错时捕获的异常类型
+TXT_IMPORT_ERRORS = (FileNotFoundError, OSError, ValueError, IndexError)
+
+
+@dataclass(slots=True)
+class TxtImportResult:
+    """单个文件的导入结果"""
+    path: str
+    book: Book | None = None
+    idx: TxtChapIndex | None = None
+    error: str = ""
+
+    @property
+    def name(self) -> str:
+        """文件名"""
+        return Path(self.path).name
+
+
+def get_txt_import_config() -> dict:
+    """读取 txt 批量导入配置。"""
+    db = LibraryDB()
+    cfg = db.get_config(TXT_IMPORT_CONFIG_KEY, TXT_IMPORT_DEFAULT_CONFIG)
+    db.close()
+
+    if not isinstance(cfg, dict):
+        cfg = {}
+    merged = dict(TXT_IMPORT_DEFAULT_CONFIG)
+    merged.update(cfg)
+    try:
+        merged["workers"] = max(0, int(merged.get("workers", 0)))
+    except (TypeError, ValueError):
+        merged["workers"] = TXT_IMPORT_DEFAULT_CONFIG["workers"]
+    return merged
+
+
+def get_txt_import_workers() -> int:
+    """读取批量导入的进程数，0 表示自动。"""
+    return int(get_txt_import_config().get("workers", 0))
+
+
+def set_txt_import_workers(workers: int) -> int:
+    """保存批量导入的进程数。"""
+    try:
+        n = int(workers)
+    except (TypeError, ValueError) as exc:
+        raise ValueError(_("Please enter a valid import worker count.")) from exc
+
+    if n < 0:
+        raise ValueError(_("Please enter a valid import worker count."))
+
+    cfg = get_txt_import_config()
+    cfg["workers"] = n
+
+    db = LibraryDB()
+    db.set_config(TXT_IMPORT_CONFIG_KEY, cfg)
+    db.close()
+    return n
+
+
+def resolve_txt_import_workers(workers: int, n_files: int) -> int:
+    """计算实际使用的进程数
+
+    Args:
+        workers (int): 配置的进程数，0 表示按 CPU 核数
+        n_files (int): 待导入文件数
+
+    Returns:
+        int: 实际进程数，至少为 1
+    """
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return max(1, min(workers, n_files))
+
+
+def import_txt_books(
+    paths: list[str],
+    workers: int | None = None,
+    on_progress: Callable[[int, int, TxtImportResult], None] | None = None,
+    cfg_dir: Path = PATH_CONFIG_BOOKS,
+) -> list[TxtImportResult]:
+    """并行导入多个 txt 文件，并在一个事务中写入书架
+
+    编码探测、章节解析和 md5 计算都在子进程中完成。
+    规则和编码缓存由主进程读好后传入，子进程不打开数据库，
+    主进程负责收集结果和写数据库。
+
+    Args:
+        paths (list[str]): 待导入的文件路径列表
+        workers (int | None, optional): 进程数，None 时读取配置. Defaults to None.
+        on_progress (Callable[[int, int, TxtImportResult], None] | None, optional):
+            每个文件完成时调用 (已完成数, 总数, 结果)，在调用线程中执行. Defaults to None.
+        cfg_dir (Path, optional): 书籍复制到的目录. Defaults to PATH_CONFIG_BOOKS.
+
+    Returns:
+        list[TxtImportResult]: 与 paths 顺序一致的导入结果
+    """
+    if not paths:
+        return []
+    if workers is None:
+        workers = get_txt_import_workers()
+    workers = resolve_txt_import_workers(workers, len(paths))
+    # 规则和编码缓存由主进程读好后传入，子进程不必打开数据库
+    rules = get_txt_parse_rules()
+    db = LibraryDB()
+    try:
+        encodings = db.get_txt_encodings()
+    finally:
+        db.close()
+
+    results: list[TxtImportResult | None] = [None] * len(paths)
+    done = 0
+
+    def _finish(i: int, result: TxtImportResult):
+        nonlocal done
+        done += 1
+        results[i] = result
+        if result.error:
+            get_logger().error("Failed to import book: %s: %s",
+                               result.path, result.error)
+        if on_progress is not None:
+            on_progress(done, len(paths), result)
+
+    if workers == 1:
+        for i, path in enumerate(paths):
+            _finish(i, _import_txt_one(path, cfg_dir, rules, encodings))
+    else:
+        # spawn 不会复制 GTK 主循环等父进程状态
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            futures = {
+                pool.submit(_import_txt_one, path, cfg_dir, rules, encodings): i
+                for i, path in enumerate(paths)
+            }
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    result = future.result()
+                except Exception as exc:  # pylint: disable=broad-except
+                    # 子进程异常退出等，记录为该文件导入失败
+                    result = TxtImportResult(paths[i], error=str(exc))
+                _finish(i, result)
+
+    save_txt_import_results(results)
+    return results
+
+
+def save_txt_import_results(results: list[TxtImportResult]) -> None:
+    """在一个事务中保存导入成功的书籍、章节目录索引和编码
+
+    Args:
+        results (list[TxtImportResult]): 导入结果
+    """
+    ok = [r for r in results if r.book is not None]
+    if not ok:
+        return
+
+    db = LibraryDB()
+    try:
+        with db.conn:
+            db.save_books([r.book for r in ok])
+            for r in ok:
+                db.save_txt_chap_index(r.idx)
+                db.save_txt_encoding(r.book.md5, r.book.encoding)
+    finally:
+        db.close()
+
+
+def _import_txt_one(
+    path: str,
+    cfg_dir: Path,
+    rules: list[dict[str, str]],
+    encodings: dict[str, str],
+) -> TxtImportResult:
+    """在子进程中导入单个文件，错误作为结果返回
+
+    Args:
+        path (str): 文件路径
+        cfg_dir (Path): 书籍复制到的目录
+        rules (list[dict[str, str]]): 章节解析规则列表
+        encodings (dict[str, str]): 编码缓存，md5 -> 编码
+
+    Returns:
+        TxtImportResult: 导入结果
+    """
+    try:
+        book, idx = import_txt_book(path, cfg_dir, rules, cached_encodings=encodings)
+    except TXT_IMPORT_ERRORS as exc:
+        return TxtImportResult(path, error=str(exc))
+    return TxtImportResult(path, book=book, idx=idx)
@@ -1,6 +1,7 @@
 """文字转语音并下载。"""
 
 import mimetypes
+import time
 from pathlib import Path
 
 import requests
@@ -8,6 +9,7 @@ import requests
 from .. import PATH_TEMP_TTS
 from ..entity import LibraryDB
 from .cache import TtsAudioCache
+from .stats import TtsSynthesisStats, get_audio_duration
 
 
 class THS:
@@ -18,6 +20,7 @@ class THS:
         self.key = key
         self.default_config = dict(default_config or {})
         self._audio_cache = TtsAudioCache()
+        self.synthesis_stats = TtsSynthesisStats()
 
         db = LibraryDB()
         self.c = db.get_config(key, self.default_config)
@@ -120,7 +123,7 @@ class THS:
         return cfg
 
     def download_with_cache(self, cache_key: str, loader):
-        """优先从缓存获取音频，不存在时调用加载器生成
+        """优先从缓存获取音频，不存在时调用加载器生成并记录合成耗时
 
         Args:
             cache_key (str): 缓存键
@@ -133,7 +136,13 @@ class THS:
             cached = self._audio_cache.find_cached_file(cache_key)
             if cached is not None:
                 return cached
-            return loader()
+            start = time.perf_counter()
+            path = loader()
+            if path is not None:
+                self.synthesis_stats.record(
+                    time.perf_counter() - start, get_audio_duration(path))
+            self._audio_cache.add_cached_file(cache_key, path)
+            return path
 
     def acquire(self, text, file_name=None):
         """获取音频文件并增加引用计数
@@ -172,7 +181,7 @@ class THS:
         return self._audio_cache.retain(path)
 
     def release(self, path):
-        """释放音频文件，引用归零时删除缓存
+        """释放音频文件，引用归零时删除或交还给持久缓存
 
         Args:
             path (Path | str | None): 音频文件路径
@@ -1,43 +1,170 @@
 """TTS 音频缓存与预取的公共工具。"""
 
+import sqlite3
 import threading
+import time
 from pathlib import Path
 
 from .. import PATH_TEMP_TTS
+from ..entity import LibraryDB
+from ..entity.connection import db_connections
+
+TTS_CACHE_CONFIG_KEY = "tts_cache"
+
+DEFAULT_TTS_CACHE_CONFIG = {
+    # 音频缓存的总大小上限，0 表示不保留，每次启动清空（旧行为）
+    "max_mb": 256,
+    # 朗读时预先合成的最少条数
+    "prefetch_depth": 3,
+    # 按合成耗时自动调整时的最多条数
+    "prefetch_max_depth": 8,
+    # 同时进行的合成请求数
+    "prefetch_workers": 2,
+    # 已合成、等待播放的音频总大小上限
+    "prefetch_mb": 32,
+    # 按句子切分后每次合成的目标字数，0 表示整段合成
+    "chunk_chars": 50,
+}
+
+# 缓存目录中的 LRU 索引
+TTS_CACHE_INDEX_NAME = "index.db"
+# 超过该时间仍未完成的 .part 文件视为异常退出遗留，秒
+TTS_PART_ORPHAN_AGE = 600.0
+
+_INDEX_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+}
+
+
+def get_tts_cache_config() -> dict:
+    """读取 TTS 音频缓存配置。
+
+    Returns:
+        dict: 合并默认值后的配置
+    """
+    db = LibraryDB()
+    try:
+        cfg = db.get_config(TTS_CACHE_CONFIG_KEY, DEFAULT_TTS_CACHE_CONFIG)
+    finally:
+        db.close()
+
+    merged = dict(DEFAULT_TTS_CACHE_CONFIG)
+    if isinstance(cfg, dict):
+        merged.update(cfg)
+    for key, minimum in (("max_mb", 0), ("prefetch_depth", 1), ("prefetch_max_depth", 1),
+                         ("prefetch_workers", 1), ("prefetch_mb", 1), ("chunk_chars", 0)):
+        try:
+            merged[key] = max(minimum, int(merged[key]))
+        except (TypeError, ValueError):
+            merged[key] = DEFAULT_TTS_CACHE_CONFIG[key]
+    merged["prefetch_max_depth"] = max(merged["prefetch_depth"], merged["prefetch_max_depth"])
+    return merged
+
+
+def set_tts_cache_config(
+    max_mb: int | None = None,
+    prefetch_depth: int | None = None,
+    chunk_chars: int | None = None,
+) -> dict:
+    """保存 TTS 音频缓存配置，None 表示不修改。
+
+    Args:
+        max_mb (int | None, optional): 缓存上限，MB，0 表示不保留. Defaults to None.
+        prefetch_depth (int | None, optional): 预先合成的条数. Defaults to None.
+        chunk_chars (int | None, optional): 分句合成的目标字数，0 表示整段. Defaults to None.
+
+    Returns:
+        dict: 保存后的配置
+    """
+    cfg = get_tts_cache_config()
+    if max_mb is not None:
+        cfg["max_mb"] = max(0, int(max_mb))
+    if prefetch_depth is not None:
+        cfg["prefetch_depth"] = max(1, int(prefetch_depth))
+    if chunk_chars is not None:
+        cfg["chunk_chars"] = max(0, int(chunk_chars))
+    db = LibraryDB()
+    try:
+        db.set_config(TTS_CACHE_CONFIG_KEY, cfg)
+    finally:
+        db.close()
+    return cfg
+
+
+def _setup_index(conn: sqlite3.Connection) -> None:
+    """建立音频缓存索引表"""
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS entries (
+        key TEXT PRIMARY KEY,           -- 缓存键
+        file TEXT NOT NULL,             -- 缓存目录中的文件名
+        size INTEGER NOT NULL,          -- 字节数
+        last_used REAL NOT NULL         -- 最近使用的时间戳
+    )
+    """)
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_entries_last_used ON entries(last_used)")
+    conn.commit()
 
 
 class TtsAudioCache:
-    """管理不同 TTS 后端共享的音频缓存。"""
+    """管理不同 TTS 后端共享的音频缓存。
+
+    - 临时模式（max_bytes=0）：启动时清空目录，引用归零即删除
+    - 持久模式：音频按缓存键保留在目录中，由 index.db 记录大小和最近使用时间，
+      总大小超过上限时按最近最少使用淘汰；仍被 retain 的文件不会被淘汰。
+      启动时只删除异常退出遗留的 .part 文件，并让索引与目录内容一致。
+    """
 
     _startup_cleanup_done = False
     _startup_cleanup_lock = threading.Lock()
+    # 引用计数在所有实例间共享，一个后端正在播放的文件不会被另一个实例删除
+    _retain_lock = threading.Lock()
+    _retain_counts: dict[Path, int] = {}
 
-    def __init__(self, cache_dir: Path | None = None):
+    def __init__(self, cache_dir: Path | None = None, max_bytes: int | None = None):
         """初始化音频缓存管理器
 
         Args:
             cache_dir (Path | None, optional): 缓存目录. Defaults to None.
+            max_bytes (int | None, optional): 缓存总大小上限，0 为临时模式，
+                None 时读取 tts_cache 配置. Defaults to None.
         """
         self._cache_dir = cache_dir or PATH_TEMP_TTS
+        if max_bytes is None:
+            max_bytes = get_tts_cache_config()["max_mb"] << 20
+        self.max_bytes = max(0, int(max_bytes))
+        self._index_path = str(self._cache_dir / TTS_CACHE_INDEX_NAME)
         self._download_lock = threading.Lock()
         self._cache_locks = {}
-        self._retain_lock = threading.Lock()
-        self._retain_counts = {}
         self._cleanup_cache_once_per_process()
 
+    @property
+    def persistent(self) -> bool:
+        """是否在重启后保留音频"""
+        return self.max_bytes > 0
+
+    def _index(self) -> sqlite3.Connection:
+        """当前线程的索引连接"""
+        return db_connections.get(self._index_path, _setup_index, _INDEX_PRAGMAS)
+
     def _cleanup_cache_once_per_process(self):
         """在当前进程中只执行一次缓存目录清理。"""
         with self._startup_cleanup_lock:
             if type(self)._startup_cleanup_done:
                 return
-            self._cleanup_cache_dir()
+            if self.persistent:
+                self._recover_cache_dir()
+            else:
+                self._cleanup_cache_dir()
             type(self)._startup_cleanup_done = True
 
     def _cleanup_cache_dir(self):
-        """清理异常退出后遗留在缓存目录中的音频文件。"""
+        """临时模式：清理异常退出后遗留在缓存目录中的音频文件。"""
         try:
             for path in self._cache_dir.iterdir():
-                if not path.is_file():
+                if not path.is_file() or path.name.startswith(TTS_CACHE_INDEX_NAME):
                     continue
                 try:
                     path.unlink()
@@ -48,8 +175,48 @@ class TtsAudioCache:
         except FileNotFoundError:
             pass
 
+    def _recover_cache_dir(self):
+        """持久模式：删除遗留的 .part 文件，补全或清除索引，然后按上限淘汰。"""
+        files = {}
+        now = time.time()
+        try:
+            for path in self._cache_dir.iterdir():
+                if not path.is_file() or path.name.startswith(TTS_CACHE_INDEX_NAME):
+                    continue
+                try:
+                    st = path.stat()
+                    if path.suffix == ".part":
+                        # 其他进程可能正在下载，只删除足够旧的
+                        if now - st.st_mtime > TTS_PART_ORPHAN_AGE:
+                            path.unlink()
+                        continue
+                except OSError:
+                    continue
+                files[path.name] = st
+        except FileNotFoundError:
+            return
+
+        try:
+            conn = self._index()
+            with conn:
+                indexed = {r[0] for r in conn.execute("SELECT file FROM entries")}
+                conn.executemany(
+                    "DELETE FROM entries WHERE file = ?",
+                    [(name,) for name in indexed - files.keys()],
+                )
+                # 写入文件后、登记索引前退出的音频，以修改时间作为最近使用时间
+                conn.executemany(
+                    "INSERT OR REPLACE INTO entries(key, file, size, last_used) "
+                    "VALUES(?, ?, ?, ?)",
+                    [(name.split(".", 1)[0], name, st.st_size, st.st_mtime)
+                     for name, st in files.items() if name not in indexed],
+                )
+        except sqlite3.Error:
+            return
+        self.evict()
+
     def find_cached_file(self, cache_key: str):
-        """根据缓存键查找已存在的音频文件
+        """根据缓存键查找已存在的音频文件，持久模式下同时更新最近使用时间
 
         Args:
             cache_key (str): 缓存键
@@ -57,10 +224,102 @@ class TtsAudioCache:
         Returns:
             Path | None: 已存在的缓存文件路径
         """
-        matches = sorted(self._cache_dir.glob(f"{cache_key}.*"))
-        if matches:
-            return matches[0]
-        return None
+        matches = sorted(p for p in self._cache_dir.glob(f"{cache_key}.*")
+                         if p.suffix != ".part")
+        if not matches:
+            return None
+        if self.persistent:
+            self.add_cached_file(cache_key, matches[0], evict=False)
+        return matches[0]
+
+    def add_cached_file(self, cache_key: str, path: Path | str | None, evict: bool = True):
+        """登记新生成或刚使用的音频文件，临时模式下不做任何事
+
+        登记后的淘汰不会删除这个文件本身，调用方随后才会 retain 它。
+
+        Args:
+            cache_key (str): 缓存键
+            path (Path | str | None): 音频文件路径
+            evict (bool, optional): 登记后是否按上限淘汰. Defaults to True.
+        """
+        if not self.persistent or path is None:
+            return
+        path = Path(path)
+        try:
+            size = path.stat().st_size
+            conn = self._index()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries(key, file, size, last_used) "
+                    "VALUES(?, ?, ?, ?)",
+                    (cache_key, path.name, size, time.time()),
+                )
+        except (OSError, sqlite3.Error):
+            return
+        if evict:
+            self.evict(keep=cache_key)
+
+    def get_cache_size(self) -> int:
+        """持久模式下已登记音频的总字节数
+
+        Returns:
+            int: 字节数，临时模式为 0
+        """
+        if not self.persistent:
+            return 0
+        try:
+            return self._index().execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+    def evict(self, keep: str | None = None) -> int:
+        """按最近最少使用淘汰，直到总大小不超过上限，跳过仍被保留的文件
+
+        Args:
+            keep (str | None, optional): 本次不淘汰的缓存键，用于刚登记、
+                还没来得及 retain 的文件. Defaults to None.
+
+        Returns:
+            int: 删除的文件数
+        """
+        if not self.persistent:
+            return 0
+        try:
+            conn = self._index()
+            total = conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return 0
+            rows = conn.execute(
+                "SELECT key, file, size FROM entries ORDER BY last_used ASC").fetchall()
+        except sqlite3.Error:
+            return 0
+
+        with self._retain_lock:
+            pinned = {p.name for p in self._retain_counts
+                      if p.parent == self._cache_dir}
+        removed = []
+        # 最近使用的一条总是保留，即使它本身就超过上限
+        for key, name, size in rows[:-1]:
+            if total <= self.max_bytes:
+                break
+            if name in pinned or key == keep:
+                continue
+            try:
+                (self._cache_dir / name).unlink()
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue
+            total -= size
+            removed.append((key,))
+        try:
+            with conn:
+                conn.executemany("DELETE FROM entries WHERE key = ?", removed)
+        except sqlite3.Error:
+            pass
+        return len(removed)
 
     def get_cache_lock(self, cache_key: str):
         """获取指定缓存键对应的互斥锁
@@ -96,7 +355,7 @@ class TtsAudioCache:
         return path
 
     def release(self, path):
-        """释放音频文件，引用归零时删除
+        """释放音频文件，引用归零时临时模式删除文件，持久模式保留在缓存中
 
         Args:
             path (Path | str | None): 音频文件路径
@@ -105,16 +364,21 @@ class TtsAudioCache:
             return
 
         path = Path(path)
-        delete_now = False
+        unpinned = False
         with self._retain_lock:
             count = self._retain_counts.get(path, 0)
             if count <= 1:
                 self._retain_counts.pop(path, None)
-                delete_now = True
+                unpinned = True
             else:
                 self._retain_counts[path] = count - 1
 
-        if delete_now:
+        if not unpinned:
+            return
+        if self.persistent:
+            # 保留期间可能超过上限而无法淘汰
+            self.evict()
+        else:
             self.delete_cached_file(path)
 
     def delete_cached_file(self, path: Path):
@@ -134,85 +398,11 @@ class TtsAudioCache:
             return
         except OSError:
             return
+        if self.persistent:
+            try:
+                conn = self._index()
+                with conn:
+                    conn.execute("DELETE FROM entries WHERE file = ?", (path.name,))
+            except sqlite3.Error:
+                pass
 
-
-class AudioPrefetchSlot:
-    """保留一条已预取音频，供下一次播放直接使用。"""
-
-    def __init__(self, tts):
-        """初始化单槽音频预取器
-
-        Args:
-            tts (THS): 具体的 TTS 实例
-        """
-        self._tts = tts
-        self._lock = threading.Lock()
-        self._text = None
-        self._path = None
-
-    def prefetch(self, text: str):
-        """预取下一条待播放的音频
-
-        Args:
-            text (str): 待转语音文本
-
-        Returns:
-            Path | None: 预取后的音频文件路径
-        """
-        text = (text or "").strip()
-        if not text:
-            return None
-
-        with self._lock:
-            if self._text == text and self._path is not None:
-                return self._path
-
-        path = self._tts.acquire(text)
-        if path is None:
-            return None
-
-        old_path = None
-        with self._lock:
-            if self._text == text and self._path is not None:
-                old_path = path
-            else:
-                old_path = self._path
-                self._text = text
-                self._path = path
-
-        if old_path is not None and old_path != path:
-            self._tts.release(old_path)
-        elif old_path == path:
-            self._tts.release(path)
-        return path
-
-    def take(self, text: str):
-        """取出已预取音频，不存在时同步获取
-
-        Args:
-            text (str): 待转语音文本
-
-        Returns:
-            Path | None: 可直接播放的音频文件路径
-        """
-        text = (text or "").strip()
-        if not text:
-            return None
-
-        with self._lock:
-            if self._text == text and self._path is not None:
-                path = self._path
-                self._text = None
-                self._path = None
-                return path
-
-        return self._tts.acquire(text)
-
-    def clear(self):
-        """清空预取槽并释放保留的音频文件"""
-        with self._lock:
-            path = self._path
-            self._text = None
-            self._path = None
-        if path is not None:
-            self._tts.release(path)
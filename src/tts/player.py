@@ -0,0 +1,498 @@
+"""朗读音频的播放器。
+
+每段音频不再单独启动一个 paplay 进程，而是保持一个音频输出：
+
+- GstAudioPlayer：GUI 使用，常驻的 GStreamer playbin，借助 about-to-finish 无缝衔接下一段
+- PacatAudioPlayer：CLI 使用，常驻的 pacat 进程，解码后的 PCM 依次写入其标准输入；
+  wav 直接读取，mp3 等其他格式借助 GStreamer 解码
+- PaplayAudioPlayer：以上都不可用时，每段启动一次 paplay；
+  没有 GStreamer 时非 wav 音频走这条路，段与段之间会有停顿
+
+play() 都会阻塞到这一段快要播放完毕，然后提前返回，让下一段及时排上，避免段间停顿。
+"""
+
+import shutil
+import subprocess
+import threading
+import time
+import wave
+from pathlib import Path
+
+from ..utils.debug import get_logger
+
+# play() 在剩余多少秒时返回，留给调用方准备下一段
+PLAYER_LEAD_SECONDS = 0.3
+# 检查停止和播放进度的间隔，秒
+PLAYER_POLL_SECONDS = 0.05
+# pacat 的目标延迟，越小播放进度与实际声音越接近
+PACAT_LATENCY_MSEC = 100
+# 每次写入 pacat 的字节数
+_PACAT_CHUNK = 64 * 1024
+# 采样宽度对应的 pacat 格式
+_PACAT_FORMATS = {1: "u8", 2: "s16le", 3: "s24le", 4: "s32le"}
+# GStreamer 解码时等待下一块数据的最长时间，秒
+_DECODE_TIMEOUT_SECONDS = 5
+
+
+def _read_wav(audio_path: Path | str) -> tuple[tuple[int, int, int], bytes] | None:
+    """读取 wav 文件的采样参数和 PCM 数据
+
+    Args:
+        audio_path (Path | str): 音频文件路径
+
+    Raises:
+        OSError: 文件无法读取
+
+    Returns:
+        tuple[tuple[int, int, int], bytes] | None: ((采样率, 声道数, 采样宽度), PCM)，
+            不是 wav 时返回 None
+    """
+    try:
+        with wave.open(str(audio_path), "rb") as wav:
+            params = (wav.getframerate(), wav.getnchannels(), wav.getsampwidth())
+            return params, wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError):
+        return None
+
+
+def _decode_with_gst(audio_path: Path | str) -> tuple[tuple[int, int, int], bytes] | None:
+    """用 GStreamer 把 mp3 等格式解码为 16 位 PCM
+
+    Args:
+        audio_path (Path | str): 音频文件路径
+
+    Returns:
+        tuple[tuple[int, int, int], bytes] | None: ((采样率, 声道数, 采样宽度), PCM)，
+            没有 GStreamer 或解码失败时返回 None
+    """
+    # pylint: disable=import-outside-toplevel
+    try:
+        import gi
+        gi.require_version("Gst", "1.0")
+        from gi.repository import Gst  # type: ignore
+    except (ImportError, ValueError):
+        return None
+
+    Gst.init(None)
+    pipeline = Gst.Pipeline.new("heartale-decode")
+    src = Gst.ElementFactory.make("filesrc", None)
+    dec = Gst.ElementFactory.make("decodebin", None)
+    conv = Gst.ElementFactory.make("audioconvert", None)
+    sink = Gst.ElementFactory.make("appsink", None)
+    if None in (pipeline, src, dec, conv, sink):
+        return None
+    src.set_property("location", str(audio_path))
+    sink.set_property("caps", Gst.Caps.from_string(
+        "audio/x-raw,format=S16LE,layout=interleaved"))
+    sink.set_property("sync", False)
+    for element in (src, dec, conv, sink):
+        pipeline.add(element)
+    src.link(dec)
+    conv.link(sink)
+    # decodebin 识别出格式后才创建输出 pad
+    dec.connect("pad-added", lambda _dec, pad: pad.link(conv.get_static_pad("sink")))
+
+    params = None
+    chunks = []
+    pipeline.set_state(Gst.State.PLAYING)
+    try:
+        while True:
+            sample = sink.emit("try-pull-sample", _DECODE_TIMEOUT_SECONDS * Gst.SECOND)
+            if sample is None:
+                break
+            if params is None:
+                caps = sample.get_caps().get_structure(0)
+                params = (caps.get_value("rate"), caps.get_value("channels"), 2)
+            buf = sample.get_buffer()
+            chunks.append(buf.extract_dup(0, buf.get_size()))
+        if pipeline.get_bus().pop_filtered(Gst.MessageType.ERROR) is not None:
+            return None
+    finally:
+        pipeline.set_state(Gst.State.NULL)
+    if params is None:
+        return None
+    return params, b"".join(chunks)
+
+
+class PaplayAudioPlayer:
+    """每段音频启动一个 paplay 进程，作为兜底方案"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._proc: subprocess.Popen | None = None
+        self._generation = 0
+
+    def play(self, audio_path: Path | str) -> bool:
+        """播放一个音频文件直到结束或被停止
+
+        Args:
+            audio_path (Path | str): 音频文件路径
+
+        Returns:
+            bool: 是否完整播放
+        """
+        if not Path(audio_path).exists():
+            return False
+        with self._lock:
+            generation = self._generation
+            proc = subprocess.Popen(["paplay", str(audio_path)])
+            self._proc = proc
+        try:
+            while True:
+                code = proc.poll()
+                if code is not None:
+                    return code == 0 and generation == self._generation
+                if generation != self._generation:
+                    return False
+                time.sleep(PLAYER_POLL_SECONDS)
+        finally:
+            with self._lock:
+                if proc.poll() is None:
+                    proc.terminate()
+                proc.wait()
+                if self._proc is proc:
+                    self._proc = None
+
+    def stop(self) -> None:
+        """立即停止正在播放的音频"""
+        with self._lock:
+            self._generation += 1
+            if self._proc is not None and self._proc.poll() is None:
+                self._proc.terminate()
+
+    def close(self) -> None:
+        """停止播放并释放资源"""
+        self.stop()
+
+
+class PacatAudioPlayer:
+    """常驻一个 pacat 进程，音频解码后连续写入，段与段之间没有停顿
+
+    pacat 只接收固定格式的 PCM，采样参数变化时会重启。wav 直接读取，其他格式
+    用 GStreamer 解码；没有 GStreamer 或解码失败时才交给 paplay，这时不能无缝衔接。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._proc: subprocess.Popen | None = None
+        self._params: tuple[int, int, int] | None = None
+        # 已写入的音频预计播放完毕的时刻，time.monotonic()
+        self._play_until = 0.0
+        self._generation = 0
+        self._fallback = PaplayAudioPlayer()
+
+    def play(self, audio_path: Path | str) -> bool:
+        """把一段音频排到当前音频之后，阻塞到它快要播放完毕
+
+        Args:
+            audio_path (Path | str): 音频文件路径
+
+        Returns:
+            bool: 是否正常播放
+        """
+        with self._lock:
+            generation = self._generation
+        try:
+            decoded = _read_wav(audio_path)
+        except OSError:
+            return False
+        if decoded is None:
+            decoded = _decode_with_gst(audio_path)
+        if decoded is None:
+            return self._play_fallback(audio_path, generation)
+        params, frames = decoded
+        if params[1] <= 0 or params[2] not in _PACAT_FORMATS or params[0] <= 0:
+            return self._play_fallback(audio_path, generation)
+
+        if self._params != params and not self._wait_until(self._play_until, generation):
+            return False
+        duration = len(frames) / (params[0] * params[1] * params[2])
+        with self._lock:
+            if generation != self._generation:
+                return False
+            proc = self._ensure_proc(params)
+            end = max(time.monotonic(), self._play_until) + duration
+            self._play_until = end
+
+        try:
+            view = memoryview(frames)
+            for i in range(0, len(view), _PACAT_CHUNK):
+                if generation != self._generation:
+                    return False
+                # 管道写满时阻塞，直到 pacat 播放掉之前的音频
+                proc.stdin.write(view[i:i + _PACAT_CHUNK])
+            proc.stdin.flush()
+        except (BrokenPipeError, ValueError, OSError):
+            with self._lock:
+                if self._proc is proc:
+                    self._reset_locked()
+            return False
+        return self._wait_until(end - PLAYER_LEAD_SECONDS, generation)
+
+    def stop(self) -> None:
+        """立即停止，丢弃 pacat 中尚未播放的音频"""
+        with self._lock:
+            self._generation += 1
+            self._reset_locked()
+        self._fallback.stop()
+
+    def close(self) -> None:
+        """停止播放并结束 pacat 进程"""
+        self.stop()
+
+    def _ensure_proc(self, params: tuple[int, int, int]) -> subprocess.Popen:
+        """在已加锁状态下获取与采样参数匹配的 pacat 进程"""
+        if self._proc is not None and (self._params != params or self._proc.poll() is not None):
+            self._reset_locked()
+        if self._proc is None:
+            rate, channels, width = params
+            self._proc = subprocess.Popen(
+                [
+                    "pacat", "--playback", "--raw",
+                    f"--rate={rate}",
+                    f"--channels={channels}",
+                    f"--format={_PACAT_FORMATS[width]}",
+                    f"--latency-msec={PACAT_LATENCY_MSEC}",
+                    "--client-name=heartale",
+                    "--stream-name=tts",
+                ],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+            )
+            self._params = params
+        return self._proc
+
+    def _reset_locked(self) -> None:
+        """在已加锁状态下结束 pacat 进程"""
+        proc, self._proc = self._proc, None
+        self._params = None
+        self._play_until = 0.0
+        if proc is None:
+            return
+        if proc.poll() is None:
+            proc.terminate()
+        try:
+            proc.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+        proc.wait()
+
+    def _wait_until(self, deadline: float, generation: int) -> bool:
+        """等待到指定时刻，期间被停止时返回 False"""
+        while time.monotonic() < deadline:
+            if generation != self._generation:
+                return False
+            time.sleep(min(PLAYER_POLL_SECONDS, max(0.0, deadline - time.monotonic())))
+        return generation == self._generation
+
+    def _play_fallback(self, audio_path: Path | str, generation: int) -> bool:
+        """等 pacat 中的音频播放完，再用 paplay 播放不支持的格式"""
+        if not self._wait_until(self._play_until, generation):
+            return False
+        return self._fallback.play(audio_path)
+
+
+class GstAudioPlayer:
+    """常驻的 GStreamer playbin
+
+    每次 play() 分配一个递增的序号，排队、交接和结束都按序号记录，
+    相同文本的相邻两段即使是同一个缓存文件也不会混淆。
+
+    play() 在当前音频快结束时返回；下一段若在 about-to-finish 之前送到，
+    就在 about-to-finish 中直接接在后面，不重建管道，也不会出现停顿。
+    about-to-finish 不等待下一段，以免阻塞 GStreamer 的流线程；它先于下一段
+    触发时记为已排空，下一段会在当前段 EOS 后立即重新开始播放，只有很短的停顿。
+    """
+
+    def __init__(self):
+        """创建 playbin
+
+        Raises:
+            ValueError: 没有安装 GStreamer 的 Python 绑定
+            RuntimeError: 无法创建 playbin
+        """
+        # pylint: disable=import-outside-toplevel
+        import gi
+        gi.require_version("Gst", "1.0")
+        from gi.repository import Gst  # type: ignore
+
+        Gst.init(None)
+        self._gst = Gst
+        self._playbin = Gst.ElementFactory.make("playbin", "heartale-tts")
+        if self._playbin is None:
+            raise RuntimeError("GStreamer playbin is not available")
+        self._bus = self._playbin.get_bus()
+        self._lock = threading.Lock()
+        # 最近一次 play() 分配的序号
+        self._seq = 0
+        # 管道正在输出的段，0 表示空闲
+        self._playing_seq = 0
+        # 已播放完毕的最大序号
+        self._finished_seq = 0
+        # 等待接上的下一段：(序号, uri)
+        self._pending: tuple[int, str] | None = None
+        # 已在 about-to-finish 中交给 playbin、尚未开始输出的段
+        self._handed_seq = 0
+        # 当前段的 about-to-finish 已触发且当时没有下一段，之后只能在 EOS 后重新开始
+        self._drained = False
+        self._generation = 0
+        self._playbin.connect("about-to-finish", self._on_about_to_finish)
+
+    def play(self, audio_path: Path | str) -> bool:
+        """播放一段音频，当前有音频在播放时接在其后
+
+        Args:
+            audio_path (Path | str): 音频文件路径
+
+        Returns:
+            bool: 是否正常播放
+        """
+        path = Path(audio_path)
+        if not path.exists():
+            return False
+        uri = path.resolve().as_uri()
+        gst = self._gst
+
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            generation = self._generation
+        # 处理两次 play() 之间积累的消息，上一段可能已经结束
+        while True:
+            msg = self._bus.pop_filtered(self._message_types())
+            if msg is None:
+                break
+            self._handle_message(msg)
+        with self._lock:
+            idle = self._playing_seq == 0
+            if not idle:
+                self._pending = (seq, uri)
+        if idle:
+            self._restart(seq, uri)
+
+        while True:
+            with self._lock:
+                if generation != self._generation:
+                    return False
+                if self._finished_seq >= seq:
+                    return True
+                playing = self._playing_seq == seq
+            msg = self._bus.timed_pop_filtered(
+                int(PLAYER_POLL_SECONDS * gst.SECOND), self._message_types())
+            if msg is not None and not self._handle_message(msg):
+                return False
+            if playing and self._is_near_end():
+                return True
+
+    def stop(self) -> None:
+        """立即停止播放，丢弃已排队的下一段"""
+        with self._lock:
+            self._generation += 1
+        self._set_idle()
+        # 丢弃停止前积累的 EOS 等消息，以免影响下一次播放
+        self._bus.set_flushing(True)
+        self._bus.set_flushing(False)
+
+    def close(self) -> None:
+        """停止播放并释放管道"""
+        self.stop()
+        self._playbin.set_state(self._gst.State.NULL)
+
+    def _message_types(self):
+        """play() 关心的总线消息类型"""
+        gst = self._gst
+        return gst.MessageType.EOS | gst.MessageType.ERROR | gst.MessageType.STREAM_START
+
+    def _handle_message(self, msg) -> bool:
+        """按总线消息更新各段的状态
+
+        Args:
+            msg (Gst.Message): 总线消息
+
+        Returns:
+            bool: 是否没有出错
+        """
+        gst = self._gst
+        if msg.type == gst.MessageType.ERROR:
+            self._set_idle()
+            return False
+        if msg.type == gst.MessageType.STREAM_START:
+            # about-to-finish 中接上的下一段开始输出，上一段到此播放完毕
+            with self._lock:
+                if self._handed_seq:
+                    self._finished_seq = max(self._finished_seq, self._playing_seq)
+                    self._playing_seq, self._handed_seq = self._handed_seq, 0
+                    self._drained = False
+            return True
+        if msg.type == gst.MessageType.EOS:
+            with self._lock:
+                self._finished_seq = max(self._finished_seq, self._playing_seq)
+                pending, self._pending = self._pending, None
+                drained = self._drained
+            self._set_idle()
+            if pending is not None:
+                if drained:
+                    get_logger().debug(
+                        "TTS segment %d queued after about-to-finish, restarting playback",
+                        pending[0])
+                self._restart(*pending)
+        return True
+
+    def _restart(self, seq: int, uri: str) -> None:
+        """从头开始播放第 seq 段"""
+        self._playbin.set_state(self._gst.State.READY)
+        with self._lock:
+            self._playing_seq = seq
+            self._handed_seq = 0
+            self._drained = False
+        self._playbin.set_property("uri", uri)
+        self._playbin.set_state(self._gst.State.PLAYING)
+
+    def _set_idle(self) -> None:
+        """停止管道，保留以便下次直接使用"""
+        with self._lock:
+            self._playing_seq = 0
+            self._handed_seq = 0
+            self._pending = None
+            self._drained = False
+        self._playbin.set_state(self._gst.State.READY)
+
+    def _is_near_end(self) -> bool:
+        """当前段剩余时间不超过 PLAYER_LEAD_SECONDS"""
+        gst = self._gst
+        ok_pos, pos = self._playbin.query_position(gst.Format.TIME)
+        ok_dur, dur = self._playbin.query_duration(gst.Format.TIME)
+        if not ok_pos or not ok_dur or dur <= 0:
+            return False
+        return dur - pos <= PLAYER_LEAD_SECONDS * gst.SECOND
+
+    def _on_about_to_finish(self, playbin) -> None:
+        """当前音频即将播放完，在 GStreamer 线程中接上已排队的下一段，没有时立即返回"""
+        with self._lock:
+            pending, self._pending = self._pending, None
+            if pending is None:
+                self._drained = True
+                return
+            self._handed_seq = pending[0]
+        playbin.set_property("uri", pending[1])
+
+
+def create_audio_player(prefer_gst: bool = False):
+    """按可用性创建播放器
+
+    Args:
+        prefer_gst (bool, optional): 是否优先使用 GStreamer，GUI 中为 True. Defaults to False.
+
+    Returns:
+        GstAudioPlayer | PacatAudioPlayer | PaplayAudioPlayer | None: 播放器，都不可用时返回 None
+    """
+    if prefer_gst:
+        try:
+            return GstAudioPlayer()
+        except (ImportError, ValueError, RuntimeError):
+            pass
+    if shutil.which("pacat"):
+        return PacatAudioPlayer()
+    if shutil.which("paplay"):
+        return PaplayAudioPlayer()
+    return None
@@ -0,0 +1,240 @@
+"""朗读音频的多段预取队列。"""
+
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from gettext import gettext as _
+from pathlib import Path
+
+from .cache import get_tts_cache_config
+
+
+@dataclass(slots=True, eq=False)
+class _PrefetchEntry:
+    """一条正在合成或已经就绪的预取音频"""
+
+    text: str
+    future: Future
+    path: Path | None = None
+    size: int = 0
+    # 被 take 取走后由调用方负责释放
+    taken: bool = False
+    # 已不在预取窗口中，完成后释放
+    dropped: bool = False
+
+
+class AudioPrefetchQueue:
+    """按朗读顺序在后台预先合成接下来的若干条音频
+
+    - schedule() 传入接下来要朗读的文本，队列只保留前 depth 条，
+      不再需要的条目会被取消或释放
+    - depth 在 min_depth 与 max_depth 之间按 THS.synthesis_stats 自动调整，
+      保证已就绪的音频能覆盖 95 分位的合成耗时
+    - 合成由固定大小的线程池完成，同时进行的请求数不超过 workers
+    - 已就绪音频的总字节数达到 max_bytes 后暂停新的请求，直到有音频被取走
+    - 队列中的音频都经过 THS.acquire 保留，不会被磁盘缓存淘汰
+    """
+
+    def __init__(
+        self,
+        tts,
+        depth: int | None = None,
+        workers: int | None = None,
+        max_bytes: int | None = None,
+        max_depth: int | None = None,
+    ):
+        """初始化预取队列，未指定的参数读取 tts_cache 配置
+
+        Args:
+            tts (THS): 具体的 TTS 实例
+            depth (int | None, optional): 最少预取的条数. Defaults to None.
+            workers (int | None, optional): 同时合成的条数. Defaults to None.
+            max_bytes (int | None, optional): 已就绪音频的总字节数上限. Defaults to None.
+            max_depth (int | None, optional): 自动调整时最多预取的条数. Defaults to None.
+        """
+        if None in (depth, workers, max_bytes, max_depth):
+            cfg = get_tts_cache_config()
+            depth = cfg["prefetch_depth"] if depth is None else depth
+            workers = cfg["prefetch_workers"] if workers is None else workers
+            max_bytes = cfg["prefetch_mb"] << 20 if max_bytes is None else max_bytes
+            max_depth = cfg["prefetch_max_depth"] if max_depth is None else max_depth
+        self._tts = tts
+        self.min_depth = max(1, int(depth))
+        self.max_depth = max(self.min_depth, int(max_depth))
+        self.max_bytes = max(1, int(max_bytes))
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, int(workers)),
+            thread_name_prefix="heartale-tts-prefetch",
+        )
+        # 完成回调可能在持锁的线程中同步执行，所以使用可重入锁
+        self._lock = threading.RLock()
+        self._entries: dict[str, _PrefetchEntry] = {}
+        self._wanted: list[str] = []
+        self._ready_bytes = 0
+        self._on_error: Callable[[Exception], None] | None = None
+        self._closed = False
+
+    @property
+    def depth(self) -> int:
+        """当前的预取条数"""
+        return self._tts.synthesis_stats.suggest_depth(self.min_depth, self.max_depth)
+
+    def schedule(
+        self,
+        texts: list[str],
+        on_error: Callable[[Exception], None] | None = None,
+    ) -> None:
+        """以 texts 作为接下来的朗读顺序重新安排预取
+
+        Args:
+            texts (list[str]): 接下来要朗读的文本，越靠前越先合成
+            on_error (Callable[[Exception], None] | None, optional): 合成失败回调
+        """
+        depth = self.depth
+        wanted = []
+        for text in texts:
+            text = (text or "").strip()
+            if text and text not in wanted:
+                wanted.append(text)
+            if len(wanted) >= depth:
+                break
+
+        with self._lock:
+            if self._closed:
+                return
+            self._on_error = on_error
+            self._wanted = wanted
+            for text in [t for t in self._entries if t not in wanted]:
+                self._drop_locked(self._entries.pop(text))
+            self._fill_locked()
+
+    def take(self, text: str):
+        """取出一条音频，正在合成时等待结果，不在队列中时同步获取
+
+        取出的音频由调用方通过 THS.release 释放。
+
+        Args:
+            text (str): 待朗读文本
+
+        Returns:
+            Path | None: 可直接播放的音频文件路径
+        """
+        text = (text or "").strip()
+        if not text:
+            return None
+
+        with self._lock:
+            if text in self._wanted:
+                self._wanted.remove(text)
+            entry = self._entries.pop(text, None)
+            if entry is not None:
+                entry.taken = True
+                if entry.path is not None:
+                    self._ready_bytes -= entry.size
+                    self._fill_locked()
+                    return entry.path
+                self._fill_locked()
+
+        if entry is not None:
+            try:
+                path = entry.future.result()
+            except Exception:  # pylint: disable=broad-except
+                path = None
+            if path is not None:
+                return path
+        return self._tts.acquire(text)
+
+    def get_ready_count(self) -> int:
+        """已合成完成、等待播放的条数
+
+        Returns:
+            int: 条数
+        """
+        with self._lock:
+            return sum(1 for e in self._entries.values() if e.path is not None)
+
+    def get_status_text(self) -> str:
+        """合成耗时、音频时长和预取进度的简短说明
+
+        Returns:
+            str: 说明文本，还没有合成记录时为空字符串
+        """
+        stats = self._tts.synthesis_stats
+        latency = stats.get_latency_p95()
+        if latency is None:
+            return ""
+        return _("TTS p95 {latency:.1f}s, audio {duration:.1f}s, ready {ready}/{depth}").format(
+            latency=latency,
+            duration=stats.get_short_duration() or 0.0,
+            ready=self.get_ready_count(),
+            depth=self.depth,
+        )
+
+    def cancel(self) -> None:
+        """停止或跳转时调用，取消全部预取并释放已就绪的音频，队列仍可继续使用"""
+        with self._lock:
+            self._wanted = []
+            entries = list(self._entries.values())
+            self._entries.clear()
+            for entry in entries:
+                self._drop_locked(entry)
+
+    def clear(self) -> None:
+        """取消全部预取并关闭线程池，之后不能再使用"""
+        with self._lock:
+            self._closed = True
+        self.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _fill_locked(self) -> None:
+        """在已加锁状态下按顺序为窗口中尚未开始的文本提交合成任务"""
+        if self._closed:
+            return
+        depth = self.depth
+        for text in self._wanted:
+            if len(self._entries) >= depth or self._ready_bytes >= self.max_bytes:
+                return
+            if text in self._entries:
+                continue
+            entry = _PrefetchEntry(text, self._pool.submit(self._tts.acquire, text))
+            self._entries[text] = entry
+            entry.future.add_done_callback(
+                lambda future, entry=entry: self._on_done(entry, future))
+
+    def _drop_locked(self, entry: _PrefetchEntry) -> None:
+        """在已加锁状态下丢弃一条预取，已就绪的立即释放"""
+        entry.dropped = True
+        if entry.path is not None:
+            self._ready_bytes -= entry.size
+            self._tts.release(entry.path)
+            entry.path = None
+        else:
+            entry.future.cancel()
+
+    def _on_done(self, entry: _PrefetchEntry, future: Future) -> None:
+        """合成任务完成后登记结果，或释放已不需要的音频"""
+        if future.cancelled():
+            return
+        exc = future.exception()
+        path = None if exc is not None else future.result()
+        with self._lock:
+            if entry.taken:
+                return
+            if entry.dropped or path is None:
+                if path is not None:
+                    self._tts.release(path)
+                if self._entries.get(entry.text) is entry:
+                    # 合成失败，移出队列，之后 take 时同步重试
+                    self._entries.pop(entry.text)
+            else:
+                entry.path = Path(path)
+                try:
+                    entry.size = entry.path.stat().st_size
+                except OSError:
+                    entry.size = 0
+                self._ready_bytes += entry.size
+            on_error = self._on_error
+        if exc is not None and on_error is not None and not entry.dropped:
+            on_error(exc)
+
@@ -1,6 +1,5 @@
 """CLI 与 GUI 共用的朗读执行器。"""
 
-import threading
 import time
 from collections.abc import Callable
 from dataclasses import dataclass, field
@@ -9,22 +8,27 @@ from pathlib import Path
 from requests import RequestException
 
 from ..servers import Server
+from ..utils.text import split_sentences, split_text
 from . import THS
-from .cache import AudioPrefetchSlot
+from .cache import get_tts_cache_config
+from .prefetch import AudioPrefetchQueue
 
 
-def build_intro_texts(server: Server) -> list[str]:
-    """构建当前章节朗读前的开场文本列表。
+def build_intro_texts(server: Server, chap_n: int | None = None) -> list[str]:
+    """构建章节朗读前的开场文本列表。
 
     Args:
         server (Server): 阅读服务实例
+        chap_n (int | None, optional): 章节索引，None 表示当前章节. Defaults to None.
 
     Returns:
         list[str]: 开场文本列表
     """
+    if chap_n is None:
+        chap_n = server.get_chap_n()
     return [
         (server.book.name or "").strip(),
-        (server.get_chap_name(server.get_chap_n()) or "").strip(),
+        (server.get_chap_name(chap_n) or "").strip(),
     ]
 
 
@@ -78,57 +82,61 @@ def get_start_read_text(server: Server, chap_txts: list[str], start_idx: int) ->
     return get_first_tts_text(chap_txts, start_idx)
 
 
-def get_next_intro_text(
-    intro_texts: list[str],
-    intro_idx: int,
-    start_idx: int,
-    chap_txts: list[str],
-) -> str | None:
-    """获取开场播报之后下一条需要预取的文本。
+def get_next_chapter_tts_texts(server: Server) -> list[str]:
+    """获取下一章的开场文本，以及已在缓存中的下一章正文。
+
+    下一章正文尚未获取时只返回开场文本，不在朗读线程中等待网络。
 
     Args:
-        intro_texts (list[str]): 开场播报文本列表
-        intro_idx (int): 当前播报文本索引
-        start_idx (int): 正文起始索引
-        chap_txts (list[str]): 当前章节段落列表
+        server (Server): 阅读服务实例
 
     Returns:
-        str | None: 下一条需要预取的文本
+        list[str]: 下一章按朗读顺序排列的文本
     """
-    for next_intro in intro_texts[intro_idx + 1:]:
-        next_intro = (next_intro or "").strip()
-        if next_intro:
-            return next_intro
-    return get_first_tts_text(chap_txts, start_idx)
+    next_chap_n = server.get_chap_n() + 1
+    if next_chap_n >= len(server.chap_names):
+        return []
 
+    texts = build_intro_texts(server, next_chap_n)
+    if server.has_chap_txt_cached(next_chap_n):
+        chap_txts, _p2s, _n = split_text(server.load_chap_txt(next_chap_n))
+        texts += chap_txts
+    return [text for text in (t.strip() for t in texts) if text]
 
-def get_next_tts_text(server: Server, idx: int, chap_txts: list[str]) -> str | None:
-    """获取当前段落之后下一条要预取的文本。
+
+def get_upcoming_tts_texts(
+    server: Server,
+    chap_txts: list[str],
+    start_idx: int,
+    limit: int,
+    intro_texts: list[str] | tuple[str, ...] = (),
+) -> list[str]:
+    """按朗读顺序获取接下来的若干条文本，本章不足时接上下一章。
 
     Args:
         server (Server): 阅读服务实例
-        idx (int): 当前段落索引
         chap_txts (list[str]): 当前章节段落列表
+        start_idx (int): 从本章的第几段开始
+        limit (int): 最多返回的条数
+        intro_texts (list[str] | tuple[str, ...], optional): 正文之前尚未播放的开场文本
 
     Returns:
-        str | None: 下一条要预取的文本
+        list[str]: 接下来要朗读的文本
     """
-    next_idx = find_next_tts_idx(chap_txts, idx + 1)
-    if next_idx is not None:
-        return (chap_txts[next_idx] or "").strip()
-
-    next_chap_n = server.get_chap_n() + 1
-    if next_chap_n >= len(server.chap_names):
-        return None
-
-    next_book_title = (server.book.name or "").strip()
-    if next_book_title:
-        return next_book_title
-    return (server.get_chap_name(next_chap_n) or "").strip()
+    texts = [text for text in ((t or "").strip() for t in intro_texts) if text]
+    for idx in range(max(0, start_idx), len(chap_txts)):
+        if len(texts) >= limit:
+            return texts[:limit]
+        text = (chap_txts[idx] or "").strip()
+        if text:
+            texts.append(text)
+    if len(texts) < limit:
+        texts += get_next_chapter_tts_texts(server)
+    return texts[:limit]
 
 
 def ensure_next_chapter_prefetched_for_text(server: Server, text: str) -> None:
-    """在跨章提示音预取时提前加载下一章正文。
+    """在跨章提示音预取时确保下一章已安排预读。
 
     Args:
         server (Server): 阅读服务实例
@@ -139,7 +147,7 @@ def ensure_next_chapter_prefetched_for_text(server: Server, text: str) -> None:
     next_chap_n = server.get_chap_n() + 1
     if next_chap_n >= len(server.chap_names):
         return
-    server.prefetch_chap_txt(next_chap_n)
+    server.schedule_read_ahead()
 
 
 @dataclass(slots=True)
@@ -174,7 +182,7 @@ class TtsReadContext:
 
     server: Server
     tts: THS | None
-    prefetch_slot: AudioPrefetchSlot | None
+    prefetch_queue: AudioPrefetchQueue | None
     chap_txts: list[str]
     hooks: TtsReadRunnerHooks
 
@@ -185,29 +193,31 @@ class _RunnerState:
 
     start_idx: int
     first_audio_ready: bool = False
+    # 分句合成的目标字数，0 表示整段合成
+    chunk_chars: int = 0
 
 
 def take_tts_audio(
     tts: THS | None,
-    prefetch_slot: AudioPrefetchSlot | None,
+    prefetch_queue: AudioPrefetchQueue | None,
     text: str,
 ) -> Path | None:
     """获取一条文本对应的音频文件。
 
     Args:
         tts (THS | None): TTS 服务实例
-        prefetch_slot (AudioPrefetchSlot | None): 音频预取槽
+        prefetch_queue (AudioPrefetchQueue | None): 音频预取队列
         text (str): 待朗读文本
 
     Returns:
         Path | None: 可播放的音频文件路径
     """
     text = (text or "").strip()
-    if not text or not tts or prefetch_slot is None:
+    if not text or not tts or prefetch_queue is None:
         return None
 
     for _ in range(2):
-        path = prefetch_slot.take(text)
+        path = prefetch_queue.take(text)
         if path is None:
             return None
 
@@ -229,60 +239,32 @@ def release_tts_audio(tts: THS | None, audio_path: Path | str | None) -> None:
         tts.release(audio_path)
 
 
-def prefetch_tts_audio(
-    server: Server,
-    prefetch_slot: AudioPrefetchSlot | None,
-    text: str,
-) -> None:
-    """同步预取一条文本对应的音频。
-
-    Args:
-        server (Server): 阅读服务实例
-        prefetch_slot (AudioPrefetchSlot | None): 音频预取槽
-        text (str): 待预取文本
-    """
-    text = (text or "").strip()
-    if not text or prefetch_slot is None:
-        return
-    try:
-        ensure_next_chapter_prefetched_for_text(server, text)
-    except (OSError, RuntimeError, ValueError, RequestException):
-        pass
-    prefetch_slot.prefetch(text)
-
-
 def schedule_tts_prefetch(
     server: Server,
-    prefetch_slot: AudioPrefetchSlot | None,
-    text: str | None,
+    prefetch_queue: AudioPrefetchQueue | None,
+    texts: list[str],
     should_stop: Callable[[], bool] | None = None,
     on_error: Callable[[Exception], None] | None = None,
 ) -> None:
-    """异步预取下一条音频。
+    """在后台预取接下来的若干条音频。
 
     Args:
         server (Server): 阅读服务实例
-        prefetch_slot (AudioPrefetchSlot | None): 音频预取槽
-        text (str | None): 待预取文本
+        prefetch_queue (AudioPrefetchQueue | None): 音频预取队列
+        texts (list[str]): 接下来要朗读的文本
         should_stop (Callable[[], bool] | None, optional): 停止检查回调
         on_error (Callable[[Exception], None] | None, optional): 预取异常回调
     """
-    text = (text or "").strip()
-    if not text or prefetch_slot is None:
+    if prefetch_queue is None:
         return
     if should_stop and should_stop():
         return
-
-    def worker() -> None:
-        if should_stop and should_stop():
-            return
+    for text in texts:
         try:
-            prefetch_tts_audio(server, prefetch_slot, text)
-        except Exception as exc:  # pylint: disable=broad-except
-            if on_error:
-                on_error(exc)
-
-    threading.Thread(target=worker, daemon=True).start()
+            ensure_next_chapter_prefetched_for_text(server, text)
+        except (OSError, RuntimeError, ValueError, RequestException):
+            pass
+    prefetch_queue.schedule(texts, on_error=on_error)
 
 
 def run_tts_read_loop(context: TtsReadContext, start_idx: int) -> TtsReadResult:
@@ -298,8 +280,10 @@ def run_tts_read_loop(context: TtsReadContext, start_idx: int) -> TtsReadResult:
     if not context.chap_txts:
         return TtsReadResult(completed_chapter=True)
 
-    state = _RunnerState(start_idx=_clamp_start_idx(
-        context.chap_txts, start_idx))
+    state = _RunnerState(
+        start_idx=_clamp_start_idx(context.chap_txts, start_idx),
+        chunk_chars=get_tts_cache_config()["chunk_chars"],
+    )
     _prime_first_audio(context, state)
 
     intro_result = _run_intro_texts(context, state)
@@ -326,20 +310,66 @@ def _clamp_start_idx(chap_txts: list[str], start_idx: int) -> int:
     return max(0, min(start_idx, len(chap_txts) - 1))
 
 
+def _get_prefetch_depth(context: TtsReadContext) -> int:
+    """预取队列的深度，没有队列时为 0。
+
+    Args:
+        context (TtsReadContext): 朗读执行上下文
+
+    Returns:
+        int: 预取条数
+    """
+    if context.prefetch_queue is None:
+        return 0
+    return context.prefetch_queue.depth
+
+
+def _split_tts_chunks(texts: list[str], chunk_chars: int, limit: int) -> list[str]:
+    """把按段排列的文本切成分句合成的文字块。
+
+    Args:
+        texts (list[str]): 按朗读顺序排列的文本
+        chunk_chars (int): 每块的目标字数，0 表示不切分
+        limit (int): 最多返回的块数
+
+    Returns:
+        list[str]: 按朗读顺序排列的文字块
+    """
+    chunks = []
+    for text in texts:
+        if len(chunks) >= limit:
+            break
+        chunks += split_sentences(text, chunk_chars)
+    return chunks[:limit]
+
+
 def _prime_first_audio(context: TtsReadContext, state: _RunnerState) -> None:
-    """预热本次朗读的第一条音频。
+    """开始合成本次朗读最先播放的几条音频。
+
+    分句合成时第一块通常只有一句，很快就能开始播放。
 
     Args:
         context (TtsReadContext): 朗读执行上下文
         state (_RunnerState): 执行过程状态
     """
-    start_text = get_start_read_text(
+    depth = _get_prefetch_depth(context)
+    schedule_tts_prefetch(
         context.server,
-        context.chap_txts,
-        state.start_idx,
+        context.prefetch_queue,
+        _split_tts_chunks(
+            get_upcoming_tts_texts(
+                context.server,
+                context.chap_txts,
+                state.start_idx,
+                depth,
+                intro_texts=build_intro_texts(context.server),
+            ),
+            state.chunk_chars,
+            depth,
+        ),
+        should_stop=context.hooks.should_stop,
+        on_error=context.hooks.on_prefetch_error,
     )
-    if start_text:
-        prefetch_tts_audio(context.server, context.prefetch_slot, start_text)
 
 
 def _run_intro_texts(
@@ -362,13 +392,14 @@ def _run_intro_texts(
         if not intro_text:
             continue
 
-        next_text = get_next_intro_text(
-            intro_texts,
-            intro_idx,
-            state.start_idx,
+        upcoming = get_upcoming_tts_texts(
+            context.server,
             context.chap_txts,
+            state.start_idx,
+            _get_prefetch_depth(context),
+            intro_texts=intro_texts[intro_idx + 1:],
         )
-        result = _play_single_text(context, state, intro_text, next_text)
+        result = _play_single_text(context, state, intro_text, upcoming)
         if result is not None:
             return result
     return None
@@ -395,12 +426,17 @@ def _run_paragraph_texts(
         if not text:
             continue
 
-        next_text = get_next_tts_text(context.server, idx, context.chap_txts)
+        upcoming = get_upcoming_tts_texts(
+            context.server,
+            context.chap_txts,
+            idx + 1,
+            _get_prefetch_depth(context),
+        )
         result = _play_single_text(
             context,
             state,
             text,
-            next_text,
+            upcoming,
             idx=idx,
         )
         if result is not None:
@@ -412,53 +448,74 @@ def _play_single_text(
     context: TtsReadContext,
     state: _RunnerState,
     text: str,
-    next_text: str | None,
+    upcoming: list[str],
     idx: int | None = None,
 ) -> TtsReadResult | None:
     """播放单条文本并触发前后回调。
 
+    文本按句切成若干块依次合成和播放，第一块就绪即开始播放；
+    before_paragraph 和 after_paragraph 仍然每段只触发一次，进度按段保存。
+
     Args:
         context (TtsReadContext): 朗读执行上下文
         state (_RunnerState): 执行过程状态
         text (str): 当前文本
-        next_text (str | None): 下一条待预取文本
+        upcoming (list[str]): 之后待预取的文本
         idx (int | None, optional): 当前段落索引. Defaults to None.
 
     Returns:
         TtsReadResult | None: 提前结束时返回结果，否则返回 None
     """
-    audio_path = take_tts_audio(context.tts, context.prefetch_slot, text)
-    if not audio_path:
-        return TtsReadResult(missing_audio=True)
-
-    _ensure_first_audio_ready(context, state)
-    schedule_tts_prefetch(
-        context.server,
-        context.prefetch_slot,
-        next_text,
-        should_stop=context.hooks.should_stop,
-        on_error=context.hooks.on_prefetch_error,
-    )
+    chunks = split_sentences(text, state.chunk_chars)
+    play_seconds = 0.0
+    started = False
+    result = None
+    for chunk_idx, chunk in enumerate(chunks):
+        if chunk_idx > 0 and context.hooks.should_stop():
+            result = TtsReadResult(stopped=True)
+            break
+
+        audio_path = take_tts_audio(context.tts, context.prefetch_queue, chunk)
+        if not audio_path:
+            result = TtsReadResult(missing_audio=True)
+            break
+
+        _ensure_first_audio_ready(context, state)
+        depth = _get_prefetch_depth(context)
+        schedule_tts_prefetch(
+            context.server,
+            context.prefetch_queue,
+            (chunks[chunk_idx + 1:]
+             + _split_tts_chunks(upcoming, state.chunk_chars, depth))[:depth],
+            should_stop=context.hooks.should_stop,
+            on_error=context.hooks.on_prefetch_error,
+        )
 
-    if idx is not None:
-        context.hooks.before_paragraph(idx, text)
+        if idx is not None and not started:
+            context.hooks.before_paragraph(idx, text)
+        started = True
 
-    play_seconds = 0.0
-    try:
-        play_start = time.time()
-        played_ok = context.hooks.play_audio(audio_path)
-        play_seconds = max(0.0, time.time() - play_start)
-    finally:
-        release_tts_audio(context.tts, audio_path)
-
-    if idx is not None:
+        chunk_seconds = 0.0
+        try:
+            play_start = time.time()
+            played_ok = context.hooks.play_audio(audio_path)
+            chunk_seconds = max(0.0, time.time() - play_start)
+        finally:
+            release_tts_audio(context.tts, audio_path)
+        play_seconds += chunk_seconds
+
+        if played_ok and context.tts:
+            context.tts.synthesis_stats.record_playback(chunk_seconds)
+        if not played_ok:
+            if context.hooks.should_stop():
+                result = TtsReadResult(stopped=True)
+            else:
+                result = TtsReadResult(playback_failed=True)
+            break
+
+    if idx is not None and started:
         context.hooks.after_paragraph(idx, play_seconds)
-
-    if played_ok:
-        return None
-    if context.hooks.should_stop():
-        return TtsReadResult(stopped=True)
-    return TtsReadResult(playback_failed=True)
+    return result
 
 
 def _ensure_first_audio_ready(context: TtsReadContext, state: _RunnerState) -> None:
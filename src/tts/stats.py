@@ -0,0 +1,119 @@
+"""TTS 合成耗时与音频时长统计，用于决定预取深度。"""
+
+import math
+import threading
+import wave
+from collections import deque
+from pathlib import Path
+
+# 统计最近多少次请求
+TTS_STATS_WINDOW = 50
+
+
+def get_audio_duration(path: Path | str) -> float | None:
+    """读取音频时长，目前只支持 wav
+
+    Args:
+        path (Path | str): 音频文件路径
+
+    Returns:
+        float | None: 秒数，无法读取时返回 None
+    """
+    if Path(path).suffix.lower() != ".wav":
+        return None
+    try:
+        with wave.open(str(path), "rb") as wav:
+            rate = wav.getframerate()
+            if rate <= 0:
+                return None
+            return wav.getnframes() / rate
+    except (wave.Error, OSError, EOFError):
+        return None
+
+
+def _percentile(values: list[float], q: float) -> float:
+    """最近秩法计算分位数，values 不能为空"""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q * len(ordered)))
+    return ordered[rank - 1]
+
+
+class TtsSynthesisStats:
+    """记录最近若干次合成的耗时和得到的音频时长
+
+    音频时长优先取自文件头；无法解析的格式改用实际播放耗时。
+    """
+
+    def __init__(self, window: int = TTS_STATS_WINDOW):
+        """初始化统计
+
+        Args:
+            window (int, optional): 保留的样本数. Defaults to TTS_STATS_WINDOW.
+        """
+        self._lock = threading.Lock()
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._durations: deque[float] = deque(maxlen=window)
+        self._play_seconds: deque[float] = deque(maxlen=window)
+
+    def record(self, latency: float, duration: float | None = None) -> None:
+        """记录一次合成
+
+        Args:
+            latency (float): 从请求到音频写入完成的秒数
+            duration (float | None, optional): 音频时长，未知时为 None. Defaults to None.
+        """
+        with self._lock:
+            self._latencies.append(max(0.0, latency))
+            if duration is not None and duration > 0:
+                self._durations.append(duration)
+
+    def record_playback(self, seconds: float) -> None:
+        """记录一段音频的实际播放耗时
+
+        Args:
+            seconds (float): 播放秒数
+        """
+        if seconds > 0:
+            with self._lock:
+                self._play_seconds.append(seconds)
+
+    def get_latency_p95(self) -> float | None:
+        """合成耗时的 95 分位数
+
+        Returns:
+            float | None: 秒数，没有样本时返回 None
+        """
+        with self._lock:
+            if not self._latencies:
+                return None
+            return _percentile(list(self._latencies), 0.95)
+
+    def get_short_duration(self) -> float | None:
+        """较短音频的时长（25 分位数），按它估算预取的音频能播放多久
+
+        Returns:
+            float | None: 秒数，没有样本时返回 None
+        """
+        with self._lock:
+            durations = list(self._durations or self._play_seconds)
+        if not durations:
+            return None
+        return _percentile(durations, 0.25)
+
+    def suggest_depth(self, minimum: int, maximum: int) -> int:
+        """估算预取深度，使已就绪的音频足以覆盖 95 分位的合成耗时
+
+        Args:
+            minimum (int): 最小深度
+            maximum (int): 最大深度
+
+        Returns:
+            int: 预取条数
+        """
+        latency = self.get_latency_p95()
+        duration = self.get_short_duration()
+        if latency is None or not duration:
+            return minimum
+        # 正在播放的一条不算在内，再多留一条余量
+        depth = math.ceil(latency / duration) + 1
+        return max(minimum, min(maximum, depth))
@@ -1,14 +1,10 @@
 """GUI 与 CLI 共用的阅读服务辅助函数。"""
 
-import threading
 from gettext import gettext as _
 
-from requests import RequestException
-
 from ..entity.book import BOOK_FMT_LEGADO, BOOK_FMT_TXT, Book
 from ..servers.legado import LegadoServer
 from ..servers.txt import TxtServer
-from .debug import get_logger
 
 
 def create_reader_server(book: Book) -> LegadoServer | TxtServer:
@@ -78,21 +74,3 @@ def advance_to_next_chapter(server: LegadoServer | TxtServer) -> bool:
     server.bd.chap_txt_n = 0
     load_chapter_into_server(server, next_chap_n, chap_txt_pos=0)
     return True
-
-
-def prefetch_next_chapter_async(server: LegadoServer | TxtServer) -> None:
-    """异步预取当前章节的下一章正文。
-
-    Args:
-        server (LegadoServer | TxtServer): 阅读服务实例
-    """
-    def worker() -> None:
-        try:
-            server.prefetch_next_chap_txt(server.get_chap_n())
-        except (OSError, RuntimeError, ValueError, RequestException) as exc:
-            get_logger().warning("Prefetch next chapter failed: %s", exc)
-
-    threading.Thread(
-        target=worker,
-        daemon=True,
-    ).start()
@@ -41,3 +41,86 @@ def split_text(text_all, dcp=0):
     if n_last < 0:
         n_last = len(result) - 1
     return result, p2s, n_last
+
+
+# 句末标点，后面紧跟的引号、括号归入同一句
+_SENTENCE_END_CJK = "。！？；…"
+_SENTENCE_END_LATIN = ".!?;"
+_SENTENCE_CLOSERS = "”’」』）)】》\"'"
+
+
+def _is_latin_sentence_end(text, i):
+    """text[i] 处的英文标点是否为句末"""
+    n = len(text)
+    j = i + 1
+    while j < n and text[j] in _SENTENCE_CLOSERS:
+        j += 1
+    if j >= n:
+        return True
+    if j == i + 1 and not text[j].isspace():
+        return False
+    while j < n and text[j].isspace() and text[j] != "\n":
+        j += 1
+    return j >= n or not text[j].islower()
+
+
+def split_sentences(text, target_chars=50):
+    """把一段文字按句子切分后再合并成长度接近 target_chars 的若干块，用于分句合成语音
+
+    中文句末标点（。！？；…）之后直接断句；英文句末标点（.!?;）之后需要跟空白或结尾，
+    且下一个词不是小写开头，避免把 3.14、e.g. 之类拆开；换行也视为断句。
+    单句超过 target_chars 时保持完整。
+
+    Args:
+        text (str): 一段文字
+        target_chars (int, optional): 每块的目标字数，不大于 0 时不切分. Defaults to 50.
+
+    Returns:
+        list[str]: 去掉首尾空白后的文字块，拼接后与原文只差空白
+    """
+    text = (text or "").strip()
+    if not text:
+        return []
+    if target_chars <= 0 or len(text) <= target_chars:
+        return [text]
+
+    sentences = []
+    start = 0
+    i = 0
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        end = -1
+        if ch == "\n":
+            end = i + 1
+        elif ch in _SENTENCE_END_CJK or (
+            ch in _SENTENCE_END_LATIN and _is_latin_sentence_end(text, i)
+        ):
+            end = i + 1
+            # 连续的句末标点（！？、……）和后面的引号归入当前句
+            while end < n and (text[end] in _SENTENCE_END_CJK
+                               or text[end] in _SENTENCE_END_LATIN
+                               or text[end] in _SENTENCE_CLOSERS):
+                end += 1
+        if end < 0:
+            i += 1
+            continue
+        sentence = text[start:end].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = i = end
+    tail = text[start:].strip()
+    if tail:
+        sentences.append(tail)
+
+    chunks = []
+    chunk = ""
+    for sentence in sentences:
+        if chunk and len(chunk) + len(sentence) > target_chars:
+            chunks.append(chunk)
+            chunk = ""
+        sep = " " if chunk and chunk[-1].isascii() and sentence[0].isascii() else ""
+        chunk += sep + sentence
+    if chunk:
+        chunks.append(chunk)
+    return chunks
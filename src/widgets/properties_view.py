@@ -1,4 +1,5 @@
 """书籍属性侧栏。"""
+import copy
 import threading
 from gettext import gettext as _
 
@@ -7,6 +8,10 @@ from gi.repository import Adw, GLib, Gtk  # type: ignore
 from ..entity import LibraryDB, _format_words_compact
 from ..entity.book import BOOK_FMT_LEGADO, BOOK_FMT_TXT, Book
 from ..entity.time_read import TIME_READ_WAY_LISTEN, TIME_READ_WAY_READ
+from ..entity.write_behind import flush_library_writes
+from ..servers.legado import LegadoServer
+from ..servers.legado_download import (LegadoDownloadProgress,
+                                       download_legado_chapters)
 from ..utils import get_file_size, get_time
 from ..utils.gui import open_folder, open_url
 from .book_txt_parse_dialog import BookTxtParseDialog
@@ -24,6 +29,8 @@ class HPropertiesView(Adw.Bin):
     aar_file_size: Adw.ActionRow = Gtk.Template.Child()
     aar_txt_parse: Adw.ActionRow = Gtk.Template.Child()
     txt_parse_button: Gtk.Button = Gtk.Template.Child()
+    aar_offline_download: Adw.ActionRow = Gtk.Template.Child()
+    offline_download_button: Gtk.Button = Gtk.Template.Child()
     file_created: Adw.ActionRow = Gtk.Template.Child()
     file_modified: Adw.ActionRow = Gtk.Template.Child()
     aar_folder: Adw.ActionRow = Gtk.Template.Child()
@@ -41,6 +48,8 @@ class HPropertiesView(Adw.Bin):
 
     def __init__(self, **kwargs):
         self.book: Book = None
+        # 正在进行的离线下载，设置后下载线程会尽快停止
+        self._download_stop: threading.Event | None = None
         super().__init__(**kwargs)
 
     def set_data(self, book: Book):
@@ -49,10 +58,13 @@ class HPropertiesView(Adw.Bin):
         Args:
             book (Book): 书籍信息
         """
+        if self.book is not None and book is not None and self.book.md5 != book.md5:
+            self._stop_offline_download()
         self.book = book
 
         def worker():
             book_md5 = self.book.md5
+            flush_library_writes()
             db = LibraryDB()
 
             read_time_stats = {
@@ -139,6 +151,7 @@ class HPropertiesView(Adw.Bin):
             self.aar_txt_parse.set_visible(ps["is_txt"])
             if ps["is_txt"]:
                 self.aar_txt_parse.set_subtitle(ps["txt_parse_subtitle"])
+            self.aar_offline_download.set_visible(ps["is_legado"])
 
         threading.Thread(target=worker, daemon=True).start()
 
@@ -253,3 +266,83 @@ class HPropertiesView(Adw.Bin):
             dialog.present(root)
         else:
             dialog.present()
+
+    @Gtk.Template.Callback()
+    def _on_offline_download(self, *_args):
+        """开始或取消当前 Legado 书籍的离线下载。"""
+        if self._download_stop is not None:
+            self._stop_offline_download()
+            return
+        if not self.book or self.book.fmt != BOOK_FMT_LEGADO:
+            return
+
+        # 后台服务会修改并保存书籍进度，使用副本，不影响页面和阅读器持有的对象
+        book = copy.copy(self.book)
+        stop = threading.Event()
+        self._download_stop = stop
+        self._set_offline_download_running(True)
+        self.aar_offline_download.set_subtitle(_("Preparing download…"))
+
+        def on_progress(progress: LegadoDownloadProgress):
+            GLib.idle_add(self._update_offline_download, stop,
+                          progress.format())
+
+        def worker():
+            server = LegadoServer()
+            try:
+                server.initialize(book)
+                progress = download_legado_chapters(
+                    server, on_progress=on_progress, should_stop=stop.is_set)
+                if progress.stopped:
+                    text = _("Download stopped, {done}/{total} chapters").format(
+                        done=progress.done, total=progress.total)
+                else:
+                    text = _("{downloaded} downloaded, {skipped} already cached, {failed} failed").format(
+                        downloaded=progress.downloaded,
+                        skipped=progress.skipped,
+                        failed=progress.failed,
+                    )
+            except Exception as exc:  # pylint: disable=broad-except
+                text = _("Download failed: {error}").format(error=exc)
+            finally:
+                server.close()
+            GLib.idle_add(self._finish_offline_download, stop, text)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _update_offline_download(self, stop: threading.Event, text: str):
+        """在主线程中显示下载进度，已取消或换书的下载不再更新界面。"""
+        if stop is self._download_stop:
+            self.aar_offline_download.set_subtitle(text)
+        return False
+
+    def _finish_offline_download(self, stop: threading.Event, text: str):
+        """在主线程中结束一次离线下载。"""
+        if stop is self._download_stop:
+            self._download_stop = None
+            self._set_offline_download_running(False)
+            self.aar_offline_download.set_subtitle(text)
+        return False
+
+    def _stop_offline_download(self) -> None:
+        """请求停止正在进行的离线下载，已下载的章节保留，再次下载时跳过。"""
+        if self._download_stop is None:
+            return
+        self._download_stop.set()
+        self._download_stop = None
+        self._set_offline_download_running(False)
+        self.aar_offline_download.set_subtitle(
+            _("Download stopped, press again to resume"))
+
+    def _set_offline_download_running(self, running: bool) -> None:
+        """切换下载按钮的图标与提示。
+
+        Args:
+            running (bool): 是否正在下载
+        """
+        if running:
+            self.offline_download_button.set_icon_name("process-stop-symbolic")
+            self.offline_download_button.set_tooltip_text(_("Stop download"))
+            return
+        self.offline_download_button.set_icon_name("folder-download-symbolic")
+        self.offline_download_button.set_tooltip_text(_("Download chapters"))
@@ -0,0 +1,13 @@
+"""测试环境：源码目录在安装后才叫 heartale，这里用软链接模拟，配置写在临时目录"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+TMP = Path(tempfile.mkdtemp(prefix="heartale-test-"))
+(TMP / "heartale").symlink_to(ROOT / "src", target_is_directory=True)
+sys.path.insert(0, str(TMP))
+os.environ["XDG_CONFIG_HOME"] = str(TMP / "config")
+os.environ["XDG_CACHE_HOME"] = str(TMP / "cache")
@@ -0,0 +1,20 @@
+"""txt 章节目录解析"""
+
+from heartale.servers.txt import (_ensure_line_start_anchor,
+                                  parse_chap_names_with_rules)
+
+_TEXT = "CHAPTER 1\ntext\nChapter 2\nmore\n"
+
+
+def test_inline_flags_rule_parses():
+    rules = [{
+        "volume_pattern": r"(?i)volume\s*\d+",
+        "chapter_pattern": r"(?i)chapter\s*(\d+)",
+    }]
+    assert parse_chap_names_with_rules(_TEXT, rules) == (["CHAPTER 1", "Chapter 2"], [0, 15])
+
+
+def test_line_start_anchor_after_inline_flags():
+    assert _ensure_line_start_anchor(r"(?i)chapter") == r"(?i)^chapter"
+    assert _ensure_line_start_anchor(r"(?i)^chapter") == r"(?i)^chapter"
+    assert _ensure_line_start_anchor(r"chapter") == r"^chapter"
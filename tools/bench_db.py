@@ -0,0 +1,100 @@
+"""heartale.db 写入性能对比
+
+模拟朗读时每段保存一次进度和阅读时间，比较三种方式：
+
+- journal: 默认回滚日志，synchronous=FULL，每段提交一次（旧行为）
+- wal: LIBRARY_DB_PRAGMAS（WAL 等），每段提交一次
+- write-behind: LIBRARY_DB_PRAGMAS，并由 LibraryWriteBehind 合并后批量提交
+
+用法::
+
+    python tools/bench_db.py [段落数]
+
+所有数据写在临时目录中，不会影响本机的书架。
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+TMP = Path(tempfile.mkdtemp(prefix="heartale-bench-"))
+# 源码目录在安装后才叫 heartale，这里用软链接模拟
+(TMP / "heartale").symlink_to(ROOT / "src", target_is_directory=True)
+sys.path.insert(0, str(TMP))
+os.environ["XDG_CONFIG_HOME"] = str(TMP / "config")
+os.environ["XDG_CACHE_HOME"] = str(TMP / "cache")
+
+# pylint: disable=wrong-import-position
+from heartale.entity import LibraryDB  # noqa: E402
+from heartale.entity.book import Book  # noqa: E402
+from heartale.entity.time_read import TimeRead  # noqa: E402
+from heartale.entity.write_behind import LibraryWriteBehind  # noqa: E402
+
+
+def _book() -> Book:
+    return Book("bench.txt", "bench", "", 0, "", 100, 0, 0, 0, "utf-8", "bench-md5")
+
+
+def _paragraph(book: Book, i: int) -> TimeRead:
+    book.chap_n = i // 50
+    book.chap_txt_pos = i % 50 * 40
+    book.txt_pos += 40
+    return TimeRead(md5=book.md5, name=book.name, chap_n=book.chap_n,
+                    words=40, seconds=3.0)
+
+
+def bench_direct(db_path: Path, n: int, legacy: bool) -> float:
+    """每段打开、写入并提交一次"""
+    book = _book()
+    t = time.perf_counter()
+    for i in range(n):
+        db = LibraryDB(db_path)
+        if legacy and i == 0:
+            db.conn.execute("PRAGMA journal_mode = DELETE")
+            db.conn.execute("PRAGMA synchronous = FULL")
+        tr = _paragraph(book, i)
+        db.update_book(book)
+        db.save_time_read(tr)
+        db.close()
+    return time.perf_counter() - t
+
+
+def bench_write_behind(db_path: Path, n: int) -> float:
+    """每段写入缓冲，由后台线程批量提交，最后全部落盘"""
+    book = _book()
+    writes = LibraryWriteBehind(db_path)
+    t = time.perf_counter()
+    for i in range(n):
+        tr = _paragraph(book, i)
+        writes.update_book(book)
+        writes.save_time_read(tr)
+    writes.close()
+    return time.perf_counter() - t
+
+
+def _check(db_path: Path, n: int) -> str:
+    db = LibraryDB(db_path)
+    words = db.conn.execute(
+        "SELECT SUM(words) FROM timereads WHERE md5 = ?", ("bench-md5",)).fetchone()[0]
+    db.close()
+    return "ok" if words == n * 40 else f"words mismatch: {words}"
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(f"{n} paragraphs, temp dir {TMP}")
+    for name, func in (
+        ("journal", lambda p: bench_direct(p, n, legacy=True)),
+        ("wal", lambda p: bench_direct(p, n, legacy=False)),
+        ("write-behind", lambda p: bench_write_behind(p, n)),
+    ):
+        db_path = TMP / f"{name}.db"
+        sec = func(db_path)
+        print(f"{name:>12}: {sec:7.3f}s  {n / sec:9.0f} paragraphs/s  {_check(db_path, n)}")
+
+
+if __name__ == "__main__":
+    main()